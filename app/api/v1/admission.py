@@ -0,0 +1,127 @@
+import math
+from starlette.responses import JSONResponse
+from app.core.admission import (
+    PRIORITIES,
+    READ,
+    WRITE,
+    AdmissionQueue,
+    AdmissionRejected,
+    RateLimiter
+)
+from app.core.auth import principal_cache, read_token
+from app.core.config import settings
+from app.core.metrics import admission_queued, admission_rejected, admission_waiting
+
+REASONS = ("rate_limited", "queue_full", "queue_timeout", "evicted")
+
+
+def _waiting(priority: int, delta: int):
+    admission_waiting.labels(PRIORITIES[priority]).inc(delta)
+
+
+# One queue per worker, shared by every router, so a flood of writes on
+# one router cannot crowd out reads on another
+admission_queue = AdmissionQueue(
+    settings.admission_concurrency,
+    settings.admission_queue,
+    settings.admission_timeout,
+    on_wait=_waiting
+) if settings.admission_concurrency > 0 else None
+
+
+# A router's policy: its rate limit (RATE_LIMITS, or given here) and
+# its priority class (by default by method: reads ahead of writes).
+
+class Admission:
+
+    def __init__(self, router: str, rate_limit: tuple = None, priority: int = None):
+        self.router = router
+        rate_limit = rate_limit or settings.rate_limits.get(router)
+        self.limiter = RateLimiter(*rate_limit, max_keys=settings.rate_limit_keys) if rate_limit else None
+        self.priority = priority
+        self.rejected = {reason: admission_rejected.labels(router, reason) for reason in REASONS}
+        self.queued = [admission_queued.labels(router, name) for name in PRIORITIES]
+
+    def priority_of(self, method: str) -> int:
+        if self.priority is not None:
+            return self.priority
+        return READ if method in ("GET", "HEAD") else WRITE
+
+
+# Plain ASGI middleware applying each router's policy as soon as a
+# request arrives: before its body is read, routing runs or the event
+# loop has spent any time on it. Requests over their rate limit get 429
+# and requests the admission queue turns away get 503, both with
+# Retry-After. An admitted request holds its slot until the response is
+# sent, so waiting requests cost nothing but a future. Requests are
+# matched to routers by the first segment of their path.
+
+class AdmissionMiddleware:
+
+    def __init__(self, app, routers: list):
+        # routers: [(APIRouter, Admission), ...]
+        self.app = app
+        self.policies = {}
+        for router, policy in routers:
+            for route in router.routes:
+                self.policies.setdefault(_segment(route.path), policy)
+
+    async def __call__(self, scope, receive, send):
+        policy = self.policies.get(_segment(scope["path"])) if scope["type"] == "http" else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        if policy.limiter is not None:
+            retry_after = policy.limiter.acquire(client_key(scope))
+            if retry_after:
+                policy.rejected["rate_limited"].inc()
+                await _reject(429, "Too many requests", math.ceil(retry_after), scope, receive, send)
+                return
+
+        queue = admission_queue
+        if queue is None:
+            await self.app(scope, receive, send)
+            return
+
+        priority = policy.priority_of(scope["method"])
+        try:
+            if await queue.acquire(priority):
+                policy.queued[priority].inc()
+        except AdmissionRejected as error:
+            policy.rejected[error.reason].inc()
+            await _reject(503, "Server busy, retry later", 1, scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
+
+
+def client_key(scope):
+    # The token's user when it carries a genuine one, otherwise the client
+    # address. Known tokens are resolved from the principal cache; only
+    # new ones pay for the signature check (never for storage access).
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if token and scheme.lower() == "bearer":
+                principal = principal_cache.get(token)
+                if principal is not None:
+                    return principal.user_id
+                claims = read_token(token)
+                if claims is not None:
+                    return claims[0]
+            break
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _segment(path: str) -> str:
+    return path.lstrip("/").split("/", 1)[0]
+
+
+async def _reject(status_code: int, detail: str, retry_after: int, scope, receive, send):
+    response = JSONResponse({"detail": detail}, status_code, headers={"Retry-After": str(retry_after)})
+    await response(scope, receive, send)
@@ -0,0 +1,100 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.core.auth import Principal, authenticate, principal_cache
+from app.core.config import settings
+from app.core.storage import run, users
+from app.schemas.user_schema import TokenRequest, TokenResponse
+from app.services.user_service import AsyncUserService, UserService
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+bearer = HTTPBearer(auto_error=False)
+logger = logging.getLogger(__name__)
+
+
+# Caller identity for protected routes, from an "Authorization: Bearer"
+# token. Cached principals are served without touching storage; a miss
+# verifies the token and looks up its user through storage.run.
+
+async def current_principal(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer)
+) -> Principal:
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+
+    principal = principal_cache.get(credentials.credentials)
+    if principal is None:
+        principal = await run(authenticate, credentials.credentials)
+    if principal is None:
+        raise _unauthorized("Invalid or expired token")
+    return principal
+
+
+async def optional_principal(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer)
+) -> Principal | None:
+    # For routes open to anonymous callers; a token, if sent, must be valid
+    if credentials is None:
+        return None
+    return await current_principal(credentials)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=401,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def ensure_self(principal: Principal, user_id: int):
+    # Student routes act for the caller only; the token, not the body,
+    # decides whose enrollment it is
+    if principal.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Students can only act for themselves")
+
+
+# Responses that carry a token must not be kept by any cache, including
+# the idempotency store (see app.api.v1.idempotency), as RFC 6749 asks
+
+def no_store(response: Response):
+    response.headers["Cache-Control"] = "no-store"
+
+
+# Token Endpoint (admin): a token for any user, e.g. accounts created
+# by import, or one whose token expired
+
+@router.post(
+    "/tokens", response_model=TokenResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(no_store)]
+)
+async def create_token(request: TokenRequest, principal: Principal = Depends(current_principal)):
+    return await AsyncUserService.create_token(request.user_id, principal.role, request.ttl)
+
+
+# Startup: nobody can issue tokens without an admin, so the admin
+# AUTH_BOOTSTRAP_EMAIL is created when it does not exist yet, and a
+# token for it is logged. It is found by its email, a single index
+# lookup, so startup never scans the users (a catalog snapshot stays
+# unread). Without AUTH_SECRET, tokens die with the process, so a token
+# for it is logged on every start.
+
+def bootstrap_admin():
+    if not settings.auth_secret:
+        logger.warning("AUTH_SECRET is not set: tokens are only valid in this process until it exits")
+
+    email = settings.auth_bootstrap_email
+    admin = users.lookup("email", email)
+    if admin is not None and admin["role"] == "admin" and settings.auth_secret:
+        return None
+    if admin is None:
+        try:
+            admin = UserService.create_user("Administrator", email, "admin", caller_role="admin")
+        except HTTPException:
+            # Created by another worker meanwhile
+            admin = users.lookup("email", email)
+    if admin is None or admin["role"] != "admin":
+        raise RuntimeError(f"AUTH_BOOTSTRAP_EMAIL {email} belongs to a non-admin user")
+
+    token = UserService.token_for(admin)["access_token"]
+    logger.warning("Admin token for %s (user %s): %s", admin["email"], admin["id"], token)
+    return token
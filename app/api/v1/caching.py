@@ -0,0 +1,34 @@
+from typing import List
+from fastapi import Request, Response
+from app.api.v1.serialization import adapter, dumps, fast_json_enabled, project
+from app.core.cache import CachedResponse
+
+
+# Serves pre-serialized bodies from a ResponseCache entry, answering
+# conditional requests whose If-None-Match matches with 304.
+
+def cached_response(entry: CachedResponse, request: Request):
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers={"ETag": entry.etag})
+
+    return Response(
+        entry.body,
+        media_type="application/json",
+        headers={"ETag": entry.etag, **entry.headers}
+    )
+
+
+def serialize(model, data) -> bytes:
+    # `data` is one row or a list of rows of the response model
+    if fast_json_enabled():
+        return dumps(project(data, model))
+
+    target = adapter(List[model] if isinstance(data, list) else model)
+    return target.dump_json(target.validate_python(data))
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
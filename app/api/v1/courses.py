@@ -1,54 +1,113 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from typing import List
+from app.api.v1.admission import Admission
+from app.api.v1.auth import current_principal
+from app.api.v1.caching import cached_response, serialize
+from app.api.v1.imports import read_rows, validate_rows
+from app.api.v1.pagination import PageParams
+from app.api.v1.serialization import FastJSONResponse, fast_json_enabled
 from app.schemas.course_schema import (
     CourseCreate,
     CourseUpdate,
-    CourseResponse,
-    RoleRequest
+    CourseImport,
+    CourseResponse
 )
-from app.services.course_service import CourseService
+from app.core.auth import Principal
+from app.core.cache import catalog_cache
+from app.services.course_service import AsyncCourseService
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
+admission = Admission("courses")
 
 
 # Public Access
+# Catalog reads are served as cached JSON bytes with an ETag; the
+# cache is invalidated by CourseService on every catalog write.
 
 @router.get("", response_model=List[CourseResponse], status_code=status.HTTP_200_OK)
-def get_all_courses():
-    return CourseService.get_all_courses()
+async def get_all_courses(
+    request: Request,
+    page: PageParams = Depends(),
+    q: str | None = Query(None, max_length=200)
+):
+    key = (page.limit, page.after, q)
+    entry = catalog_cache.get("courses:list", key)
+
+    if entry is None:
+        version = catalog_cache.version("courses:list", key)
+        rows = await AsyncCourseService.get_all_courses(limit=page.limit + 1, after=page.after, q=q)
+        headers = {}
+        rows = page.finish(rows, headers)
+        entry = catalog_cache.put(
+            "courses:list", key, serialize(CourseResponse, rows), headers, version
+        )
+
+    return cached_response(entry, request)
 
 
 @router.get("/{course_id}", response_model=CourseResponse, status_code=status.HTTP_200_OK)
-def get_course(course_id: int):
-    return CourseService.get_course_by_id(course_id)
+async def get_course(course_id: int, request: Request):
+    entry = catalog_cache.get("courses:item", course_id)
+
+    if entry is None:
+        version = catalog_cache.version("courses:item", course_id)
+        course = await AsyncCourseService.get_course_by_id(course_id)
+        entry = catalog_cache.put(
+            "courses:item", course_id, serialize(CourseResponse, course), {}, version
+        )
+
+    return cached_response(entry, request)
 
 @router.get("/{course_id}/enrollments")
-def get_course_enrollments(course_id: int, role: str):
-    return CourseService.get_course_enrollments(course_id, role)
+async def get_course_enrollments(course_id: int, principal: Principal = Depends(current_principal)):
+    rows = await AsyncCourseService.get_course_enrollments(course_id, principal.role)
+    if fast_json_enabled():
+        return FastJSONResponse(rows)
+    return rows
+
+@router.get("/{course_id}/waitlist")
+async def get_course_waitlist(course_id: int, principal: Principal = Depends(current_principal)):
+    rows = await AsyncCourseService.get_course_waitlist(course_id, principal.role)
+    if fast_json_enabled():
+        return FastJSONResponse(rows)
+    return rows
 
 # Admin Only
 
 @router.post("", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
-def create_course(request: CourseCreate):
-    return CourseService.create_course(
+async def create_course(request: CourseCreate, principal: Principal = Depends(current_principal)):
+    return await AsyncCourseService.create_course(
         title=request.title,
         code=request.code,
-        role=request.role
+        role=principal.role,
+        capacity=request.capacity
     )
 
 
+# Bulk import: JSON array or text/csv body
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def import_courses(request: Request, principal: Principal = Depends(current_principal)):
+    rows = validate_rows(CourseImport, await read_rows(request))
+    return await AsyncCourseService.import_courses(rows, principal.role)
+
+
 @router.put("/{course_id}", response_model=CourseResponse, status_code=status.HTTP_200_OK)
-def update_course(course_id: int, request: CourseUpdate):
-    return CourseService.update_course(
+async def update_course(
+    course_id: int,
+    request: CourseUpdate,
+    principal: Principal = Depends(current_principal)
+):
+    return await AsyncCourseService.update_course(
         course_id=course_id,
         title=request.title,
         code=request.code,
-        role=request.role
+        role=principal.role,
+        capacity=request.capacity
     )
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_200_OK)
-def delete_course(course_id: int, data: RoleRequest):
-    if data.role != "admin":
+async def delete_course(course_id: int, principal: Principal = Depends(current_principal)):
+    if principal.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete courses")
-    return CourseService.delete_course(course_id, role=data.role)
+    return await AsyncCourseService.delete_course(course_id, role=principal.role)
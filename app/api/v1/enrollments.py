@@ -1,8 +1,17 @@
-from fastapi import APIRouter, status
-from pydantic import BaseModel
-from app.services.enrollment_service import EnrollmentService
+from fastapi import APIRouter, Depends, Response, status
+from typing import List
+from pydantic import BaseModel, Field
+from app.api.v1.admission import Admission
+from app.api.v1.auth import current_principal, ensure_self
+from app.api.v1.pagination import PageParams
+from app.api.v1.serialization import FastJSONResponse, fast_json_enabled
+from app.api.v1.streaming import export_response
+from app.core.auth import Principal
+from app.schemas.enrollment_schema import EnrollmentCreate
+from app.services.enrollment_service import AsyncEnrollmentService
 
 router = APIRouter()
+admission = Admission("enrollments")
 
 
 # Request Schemas
@@ -10,32 +19,44 @@ router = APIRouter()
 class EnrollmentRequest(BaseModel):
     user_id: int
     course_id: int
-    role: str
 
 
 class AdminForceDeregisterRequest(BaseModel):
     user_id: int
     course_id: int
-    role: str
+
+
+class BulkEnrollmentRequest(BaseModel):
+    items: List[EnrollmentCreate] = Field(..., min_length=1, max_length=10000)
 
 
 # Student Enrollment Endpoints
 
 @router.post("/enrollments", status_code=status.HTTP_201_CREATED)
-def enroll(request: EnrollmentRequest):
-    return EnrollmentService.enroll(
+async def enroll(
+    request: EnrollmentRequest,
+    response: Response,
+    principal: Principal = Depends(current_principal)
+):
+    ensure_self(principal, request.user_id)
+    result = await AsyncEnrollmentService.enroll(
         user_id=request.user_id,
         course_id=request.course_id,
-        role=request.role
+        role=principal.role
     )
+    # Full course: the student was queued on the waitlist instead
+    if "position" in result:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
 
 
 @router.delete("/enrollments", status_code=status.HTTP_200_OK)
-def deregister(request: EnrollmentRequest):
-    return EnrollmentService.deregister(
+async def deregister(request: EnrollmentRequest, principal: Principal = Depends(current_principal)):
+    ensure_self(principal, request.user_id)
+    return await AsyncEnrollmentService.deregister(
         user_id=request.user_id,
         course_id=request.course_id,
-        role=request.role
+        role=principal.role
     )
 
 
@@ -45,20 +66,58 @@ def deregister(request: EnrollmentRequest):
 
 # Admin Endpoints
 
+@router.post("/enrollments/bulk", status_code=status.HTTP_200_OK)
+async def bulk_enroll(request: BulkEnrollmentRequest, principal: Principal = Depends(current_principal)):
+    return await AsyncEnrollmentService.bulk_enroll(
+        pairs=[(item.user_id, item.course_id) for item in request.items],
+        role=principal.role
+    )
+
+
 @router.get("/enrollments", status_code=status.HTTP_200_OK)
-def get_all_enrollments(role: str):
-    return EnrollmentService.get_all_enrollments(role)
+async def get_all_enrollments(
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Principal = Depends(current_principal)
+):
+    rows = await AsyncEnrollmentService.get_all_enrollments(
+        principal.role,
+        limit=page.limit + 1,
+        after=page.after
+    )
+    if fast_json_enabled():
+        headers = {}
+        return FastJSONResponse(page.finish(rows, headers), headers=headers)
+    return page.finish(rows, response.headers)
+
+
+@router.get("/enrollments/export", status_code=status.HTTP_200_OK)
+async def export_enrollments(
+    format: str = "ndjson",
+    course_id: int | None = None,
+    user_id: int | None = None,
+    principal: Principal = Depends(current_principal)
+):
+    rows = await AsyncEnrollmentService.export_enrollments(
+        principal.role,
+        course_id=course_id,
+        user_id=user_id
+    )
+    return export_response(rows, ("id", "user_id", "course_id"), format, "enrollments")
 
 
 @router.get("enrollments/courses/{course_id}", status_code=status.HTTP_200_OK)
-def get_course_enrollments(course_id: int, role: str):
-    return EnrollmentService.get_course_enrollments(course_id, role)
+async def get_course_enrollments(course_id: int, principal: Principal = Depends(current_principal)):
+    return await AsyncEnrollmentService.get_course_enrollments(course_id, principal.role)
 
 
 @router.delete("/admin/enrollments", status_code=status.HTTP_200_OK)
-def force_deregister(request: AdminForceDeregisterRequest):
-    return EnrollmentService.force_deregister(
+async def force_deregister(
+    request: AdminForceDeregisterRequest,
+    principal: Principal = Depends(current_principal)
+):
+    return await AsyncEnrollmentService.force_deregister(
         user_id=request.user_id,
         course_id=request.course_id,
-        role=request.role
+        role=principal.role
     )
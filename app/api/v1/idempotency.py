@@ -0,0 +1,161 @@
+import hashlib
+from starlette.responses import JSONResponse
+from app.core import idempotency
+from app.core.config import settings
+from app.core.metrics import idempotent_requests
+from app.core.storage import run
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+MAX_KEY_LENGTH = 255
+OUTCOMES = ("stored", "replayed", "in_progress", "mismatch")
+
+
+# Plain ASGI middleware for Idempotency-Key on writes. The first request
+# with a given key runs as usual and its response (status, headers and
+# body) is kept; a retry of it, by the same caller to the same method
+# and path, is answered with that response plus "Idempotent-Replayed:
+# true", without reaching routing, auth or the service layer. A retry
+# that arrives while the first request is still running gets 409; one
+# that reuses the key for a different body gets 422. Responses that
+# should be retried (429, 5xx), are larger than IDEMPOTENCY_MAX_BODY or
+# are marked "Cache-Control: no-store" (those carrying a token, see
+# app.api.v1.auth) are not kept. The caller is its Authorization header,
+# or its address for anonymous requests, so keys never collide across
+# callers; entries are keyed by a digest of caller, key, method and
+# path, so the caller's own token is not stored either.
+
+class IdempotencyMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+        self.outcomes = {outcome: idempotent_requests.labels(outcome) for outcome in OUTCOMES}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        key = caller = None
+        for name, value in scope["headers"]:
+            if name == b"idempotency-key":
+                key = value
+            elif name == b"authorization":
+                caller = value
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _respond(400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters", scope, receive, send)
+            return
+        if caller is None:
+            client = scope.get("client")
+            caller = client[0].encode() if client else b""
+
+        body = await _read_body(receive)
+        if body is None:
+            return
+        # None of the parts holds a newline except the path, which comes last
+        cache_key = hashlib.blake2b(
+            b"\n".join((caller, key, scope["method"].encode(), scope["path"].encode())), digest_size=16
+        ).digest()
+        fingerprint = hashlib.blake2b(body, digest_size=16).digest()
+
+        cache = idempotency.idempotency_cache
+        stored = await run(cache.claim, cache_key, fingerprint)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                self.outcomes["mismatch"].inc()
+                await _respond(422, "Idempotency-Key was used for a different request", scope, receive, send)
+            elif stored.status is None:
+                self.outcomes["in_progress"].inc()
+                await _respond(
+                    409, "A request with this Idempotency-Key is in progress", scope, receive, send,
+                    headers={"Retry-After": "1"}
+                )
+            else:
+                self.outcomes["replayed"].inc()
+                await _replay(stored, scope, send)
+            return
+
+        # First request with this key: run it, keeping what is sent
+        start, chunks, size = None, [], 0
+        received = False
+
+        async def receive_body():
+            nonlocal received
+            if received:
+                return await receive()
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_and_keep(message):
+            nonlocal start, size
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= settings.idempotency_max_body:
+                    chunks.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_keep)
+        finally:
+            status = start["status"] if start is not None else 500
+            # Throttled and failed requests are for the client to retry
+            if (status < 500 and status != 429 and size <= settings.idempotency_max_body
+                    and not _no_store(start)):
+                route = scope.get("route")
+                await run(
+                    cache.complete, cache_key, status, list(start.get("headers", ())), b"".join(chunks),
+                    route.path if route is not None else None
+                )
+                self.outcomes["stored"].inc()
+            else:
+                await run(cache.abandon, cache_key)
+
+
+def _no_store(start) -> bool:
+    for name, value in start.get("headers", ()):
+        if name.lower() == b"cache-control" and b"no-store" in value.lower():
+            return True
+    return False
+
+
+async def _read_body(receive):
+    # The whole request body, or None when the client went away
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+class _ReplayedRoute:
+    # Stands in for the first request's route, so metrics label the
+    # replay alike (replays never reach routing)
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+async def _replay(stored, scope, send):
+    if stored.route is not None:
+        scope["route"] = _ReplayedRoute(stored.route)
+    await send({
+        "type": "http.response.start",
+        "status": stored.status,
+        "headers": stored.headers + [(b"idempotent-replayed", b"true")]
+    })
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+async def _respond(status_code: int, detail: str, scope, receive, send, headers: dict = None):
+    response = JSONResponse({"detail": detail}, status_code, headers=headers)
+    await response(scope, receive, send)
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from typing import List
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from app.api.v1.serialization import adapter
+
+
+# Bulk import bodies: either a JSON array of objects or a CSV document
+# (Content-Type: text/csv) with a header row. The whole batch is
+# validated against the schema in a single pass.
+
+async def read_rows(request: Request) -> list:
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("text/csv"):
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # An empty cell means the field was not given
+            return [{k: v for k, v in row.items() if v != ""} for row in reader]
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="Invalid CSV body")
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array")
+    return rows
+
+
+def validate_rows(schema, rows: list) -> list:
+    if not rows:
+        raise HTTPException(status_code=400, detail="Import must contain at least one row")
+
+    try:
+        items = adapter(List[schema]).validate_python(rows)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=[
+            {"row": error["loc"][0], "field": error["loc"][-1], "detail": error["msg"]}
+            for error in exc.errors()
+        ])
+    return [item.model_dump() for item in items]
@@ -0,0 +1,58 @@
+import time
+from fastapi import APIRouter, Response
+from app.core.metrics import (
+    registry,
+    http_requests,
+    http_request_duration,
+    http_requests_in_flight
+)
+
+router = APIRouter(tags=["Metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Prometheus scrape endpoint
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+# Plain ASGI middleware (no per-request Request object or task) that
+# records latency, status codes and in-flight requests. Routes are
+# labelled by their path template, read from the scope once routing has
+# run, so /courses/1 and /courses/2 share a series; requests that match
+# no route are labelled "unmatched".
+
+class MetricsMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = http_requests_in_flight.labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight.dec()
+
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            http_request_duration.labels(scope["method"], path).observe(elapsed)
+            http_requests.labels(scope["method"], path, str(status_code)).inc()
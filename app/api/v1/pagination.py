@@ -0,0 +1,37 @@
+import base64
+import binascii
+from fastapi import HTTPException, Query
+
+
+# Keyset pagination for list endpoints. The cursor is an opaque token
+# wrapping the last id of the previous page; the next cursor is sent
+# back in the X-Next-Cursor header so response bodies stay plain lists.
+
+class PageParams:
+
+    def __init__(
+        self,
+        limit: int = Query(100, ge=1, le=1000),
+        after: str | None = Query(None)
+    ):
+        self.limit = limit
+        self.after = decode_cursor(after) if after else None
+
+    def finish(self, rows: list, headers):
+        # Rows are fetched with limit + 1 so the last page has no cursor
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1]["id"])
+        return rows
+
+
+def encode_cursor(row_id: int) -> str:
+    return base64.urlsafe_b64encode(str(row_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,76 @@
+import json
+import logging
+from functools import lru_cache
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    if settings.fast_json:
+        logging.getLogger(__name__).warning(
+            "FAST_JSON=1 but orjson is not installed; encoding with the json module instead"
+        )
+
+
+# Fast JSON mode (FAST_JSON=1). Rows read from storage were validated
+# when they were written, so list and item endpoints encode them as
+# they are instead of re-validating every field (EmailStr included)
+# through the response model. Rows are projected onto the model's
+# fields only when the table has other columns; orjson encodes entity
+# rows directly, as the slotted dataclasses they are.
+
+def fast_json_enabled() -> bool:
+    return settings.fast_json
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_mapping)
+    return json.dumps(data, default=_mapping, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def trusted_response(data, model, headers: dict = None, status_code: int = 200):
+    # `data` is one row or a list of rows of `model`
+    return Response(dumps(project(data, model)), status_code, headers, media_type="application/json")
+
+
+def project(data, model):
+    fields = model_fields(model)
+    if isinstance(data, list):
+        if data and tuple(data[0]) != fields:
+            return [{field: row[field] for field in fields} for row in data]
+        return data
+    if tuple(data) != fields:
+        return {field: data[field] for field in fields}
+    return data
+
+
+# Cached schema objects: building a TypeAdapter compiles a validator
+# and serializer, which is far too slow to repeat per request.
+
+@lru_cache(maxsize=None)
+def adapter(type_) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+@lru_cache(maxsize=None)
+def model_fields(model) -> tuple:
+    return tuple(model.model_fields)
+
+
+def _mapping(value):
+    # Storage rows are read-only mappings
+    try:
+        return dict(value)
+    except (TypeError, ValueError):
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query, status
+from app.api.v1.admission import Admission
+from app.api.v1.auth import current_principal
+from app.core.auth import Principal
+from app.services.stats_service import AsyncStatsService
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+admission = Admission("stats")
+
+
+# Admin Endpoints
+# Served from counters maintained on every enrollment write.
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def get_summary(principal: Principal = Depends(current_principal)):
+    return await AsyncStatsService.get_summary(principal.role)
+
+
+@router.get("/courses/top", status_code=status.HTTP_200_OK)
+async def get_top_courses(
+    limit: int = Query(10, ge=1, le=1000),
+    principal: Principal = Depends(current_principal)
+):
+    return await AsyncStatsService.get_top_courses(limit, principal.role)
+
+
+@router.get("/courses/{course_id}", status_code=status.HTTP_200_OK)
+async def get_course_stats(course_id: int, principal: Principal = Depends(current_principal)):
+    return await AsyncStatsService.get_course_stats(course_id, principal.role)
+
+
+@router.get("/users/{user_id}", status_code=status.HTTP_200_OK)
+async def get_user_stats(user_id: int, principal: Principal = Depends(current_principal)):
+    return await AsyncStatsService.get_user_stats(user_id, principal.role)
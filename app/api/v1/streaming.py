@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from app.api.v1.serialization import dumps, fast_json_enabled
+
+
+# Streaming exports: rows are encoded one at a time from a generator,
+# so the first byte goes out immediately and memory stays constant.
+
+def export_response(rows, columns: tuple, fmt: str, filename: str):
+    if fmt == "ndjson":
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+    if fmt == "csv":
+        return StreamingResponse(
+            _csv_lines(rows, columns),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+
+    raise HTTPException(status_code=400, detail="Format must be either 'ndjson' or 'csv'")
+
+
+def _ndjson_lines(rows):
+    if fast_json_enabled():
+        for row in rows:
+            yield dumps(row) + b"\n"
+        return
+
+    for row in rows:
+        yield json.dumps(dict(row), separators=(",", ":")) + "\n"
+
+
+def _csv_lines(rows, columns: tuple):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for row in rows:
+        writer.writerow([row[col] for col in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only, when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,45 +1,96 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from typing import List
-from app.schemas.user_schema import UserCreate, UserResponse
-from app.services.user_service import UserService
-from app.services.enrollment_service import EnrollmentService
+from app.api.v1.admission import Admission
+from app.api.v1.auth import current_principal, no_store, optional_principal
+from app.api.v1.imports import read_rows, validate_rows
+from app.api.v1.pagination import PageParams
+from app.api.v1.serialization import FastJSONResponse, fast_json_enabled, trusted_response
+from app.api.v1.streaming import export_response
+from app.core.auth import Principal, issue_token
+from app.schemas.common import UserRole
+from app.schemas.user_schema import UserCreate, UserCreated, UserImport, UserResponse
+from app.services.user_service import AsyncUserService
+from app.services.enrollment_service import AsyncEnrollmentService
 
 router = APIRouter(prefix="/users", tags=["Users"])
+admission = Admission("users")
 
 
 
 # Create User
 
-@router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(request: UserCreate):
-    return UserService.create_user(
+# Signing up returns a token for the new account (so the response is
+# never stored). Creating an admin takes an admin's token.
+
+@router.post("", response_model=UserCreated, status_code=status.HTTP_201_CREATED, dependencies=[Depends(no_store)])
+async def create_user(request: UserCreate, principal: Principal | None = Depends(optional_principal)):
+    user = await AsyncUserService.create_user(
         name=request.name,
         email=request.email,
-        role=request.role
+        role=request.role,
+        caller_role=principal.role if principal else None
     )
+    return {**user, "access_token": issue_token(user["id"], user["role"])}
+
+
+# Bulk Import Users (admin): JSON array or text/csv body
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def import_users(request: Request, principal: Principal = Depends(current_principal)):
+    rows = validate_rows(UserImport, await read_rows(request))
+    return await AsyncUserService.import_users(rows, principal.role)
 
 
 # Get All Users
+# Filtering by email prefix and/or role returns users in email order.
 
 @router.get("", response_model=List[UserResponse], status_code=status.HTTP_200_OK)
-def get_all_users():
-    return UserService.get_all_users()
+async def get_all_users(
+    response: Response,
+    page: PageParams = Depends(),
+    email_prefix: str | None = Query(None, max_length=254),
+    role: UserRole | None = None
+):
+    rows = await AsyncUserService.get_all_users(
+        limit=page.limit + 1,
+        after=page.after,
+        email_prefix=email_prefix,
+        role=role.value if role else None
+    )
+    if fast_json_enabled():
+        headers = {}
+        return trusted_response(page.finish(rows, headers), UserResponse, headers)
+    return page.finish(rows, response.headers)
+
+
+
+# Export Users (admin)
 
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_users(format: str = "ndjson", principal: Principal = Depends(current_principal)):
+    rows = await AsyncUserService.export_users(principal.role)
+    return export_response(rows, ("id", "name", "email", "role"), format, "users")
 
 
 # Get User by ID
 
 @router.get("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def get_user(user_id: int):
-    return UserService.get_user_by_id(user_id)
+async def get_user(user_id: int):
+    user = await AsyncUserService.get_user_by_id(user_id)
+    if fast_json_enabled():
+        return trusted_response(user, UserResponse)
+    return user
 
 
 @router.get("/{user_id}/enrollments")
-def get_user_enrollments(user_id: int):
-    return UserService.get_user_enrollments(user_id)
+async def get_user_enrollments(user_id: int):
+    rows = await AsyncUserService.get_user_enrollments(user_id)
+    if fast_json_enabled():
+        return FastJSONResponse(rows)
+    return rows
 
 # Student Views of Enrollments
 
 @router.get("/{user_id}/enrollments", status_code=status.HTTP_200_OK)
-def get_student_enrollments(user_id: int):
-    return EnrollmentService.get_student_enrollments(user_id)
\ No newline at end of file
+async def get_student_enrollments(user_id: int):
+    return await AsyncEnrollmentService.get_student_enrollments(user_id)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+# Overload protection for a single worker: per-client token buckets,
+# and an admission queue that bounds the requests being served at once.
+#
+# Priority classes are indexes into PRIORITIES, lower is more urgent.
+# Only the most urgent class is admitted on arrival, while a slot is
+# free. Everything else waits in per-class FIFO queues, and is handed
+# slots, most urgent first, by a dispatch that runs on a later turn of
+# the event loop. Requests that run without ever suspending (as with
+# the in-memory store) would otherwise be served strictly in arrival
+# order; deferring them lets reads that arrived behind a burst of writes
+# go first, and makes the backlog visible, so that it can be bounded.
+# When the queue is full, an arrival displaces the newest waiter of a
+# less urgent class, or is rejected itself: writes are shed, reads kept.
+
+PRIORITIES = ("read", "write")
+READ, WRITE = 0, 1
+
+
+class AdmissionRejected(Exception):
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class RateLimiter:
+
+    # Token bucket per key: `rate` requests per second on average, up to
+    # `burst` at once. Buckets are kept for the `max_keys` most recent
+    # clients; a client that falls out starts again with a full bucket.
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key) -> float:
+        # 0 when the request may proceed, otherwise seconds until it could
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = self.burst
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                self._buckets.move_to_end(key)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class AdmissionQueue:
+
+    # Runs on the worker's event loop; acquire() and release() are only
+    # called from it, so the counters need no lock.
+
+    def __init__(self, concurrency: int, max_queue: int, timeout: float, on_wait=None):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.queued = 0
+        self._queues = [deque() for _ in PRIORITIES]
+        # on_wait(priority, delta) is told about every queue change
+        self._on_wait = on_wait or (lambda priority, delta: None)
+
+    async def acquire(self, priority: int) -> bool:
+        # True when the request had to wait for its slot: it arrived with
+        # every slot taken or spoken for. Being deferred to the dispatch
+        # while slots are free does not count.
+        if priority == 0 and self.active < self.concurrency and not self.queued:
+            self.active += 1
+            return False
+
+        if self.queued >= self.max_queue and not self._evict(priority):
+            raise AdmissionRejected("queue_full")
+        contended = self.active + self.queued >= self.concurrency
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._push(priority, future)
+        loop.call_soon(self._dispatch)
+        try:
+            # The slot handed over by _dispatch() arrives as the result
+            await asyncio.wait_for(future, self.timeout)
+            return contended
+        except asyncio.TimeoutError:
+            self._discard(priority, future)
+            raise AdmissionRejected("queue_timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            else:
+                self._discard(priority, future)
+            raise
+
+    def release(self):
+        self.active -= 1
+        if self.queued:
+            asyncio.get_running_loop().call_soon(self._dispatch)
+
+    def _dispatch(self):
+        # Hands free slots to waiters, most urgent first
+        for priority, queue in enumerate(self._queues):
+            while queue and self.active < self.concurrency:
+                future = queue.popleft()
+                self._waited(priority, -1)
+                if not future.done():
+                    self.active += 1
+                    future.set_result(None)
+
+    def _evict(self, priority: int) -> bool:
+        for lower in range(len(self._queues) - 1, priority, -1):
+            queue = self._queues[lower]
+            while queue:
+                future = queue.pop()
+                self._waited(lower, -1)
+                if not future.done():
+                    future.set_exception(AdmissionRejected("evicted"))
+                    return True
+        return False
+
+    def _push(self, priority: int, future):
+        self._queues[priority].append(future)
+        self._waited(priority, 1)
+
+    def _discard(self, priority: int, future):
+        try:
+            self._queues[priority].remove(future)
+        except ValueError:
+            return
+        self._waited(priority, -1)
+
+    def _waited(self, priority: int, delta: int):
+        self.queued += delta
+        self._on_wait(priority, delta)
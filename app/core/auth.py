@@ -0,0 +1,163 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import secrets
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from app.core.cache import versions
+from app.core.config import settings
+from app.core.storage import users
+
+
+# Bearer tokens: "<payload>.<signature>", both base64url, where the
+# payload is "user_id.role.expires" and the signature is its
+# HMAC-SHA256 under AUTH_SECRET. A token is accepted while it has not
+# expired and its user still exists with the role it was issued for.
+
+_SECRET = settings.auth_secret.encode() or secrets.token_bytes(32)
+
+
+class Principal:
+
+    __slots__ = ("user_id", "role")
+
+    def __init__(self, user_id: int, role: str):
+        self.user_id = user_id
+        self.role = role
+
+
+def issue_token(user_id: int, role: str, ttl: int = None) -> str:
+    expires = int(time.time()) + (ttl or settings.auth_token_ttl)
+    payload = f"{user_id}.{role}.{expires}".encode()
+    return _encode(payload) + "." + _encode(_sign(payload))
+
+
+def read_token(token: str):
+    # (user_id, role, expires) of a genuine, unexpired token, otherwise
+    # None; whether the user still holds the role is up to the caller
+    encoded_payload, _, encoded_signature = token.partition(".")
+    try:
+        payload = _decode(encoded_payload)
+        signature = _decode(encoded_signature)
+    except (ValueError, binascii.Error):
+        return None
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+
+    user_id, role, expires = payload.decode().split(".")
+    if int(expires) <= time.time():
+        return None
+    return int(user_id), role, int(expires)
+
+
+# Verified principals by token, so repeat requests skip the signature
+# check and user lookup. Entries are bounded (LRU), expire after
+# AUTH_CACHE_TTL or with their token, and carry the counter of their
+# user's version slot. UserService invalidates a user, in every process
+# sharing the version file (see app.core.cache), whenever the user
+# behind an id changes.
+
+class PrincipalCache:
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0, versions=versions):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.versions = versions
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, user_id: int) -> int:
+        return self.versions.read(self._slot(user_id))
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires, version = entry
+            if expires <= time.monotonic() or version != self.version(principal.user_id):
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_expires: int, version: int):
+        # Converts the token's wall-clock expiry to the monotonic clock
+        remaining = min(self.ttl, token_expires - time.time())
+        with self._lock:
+            if version == self.version(principal.user_id):
+                self._entries[token] = (principal, time.monotonic() + remaining, version)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        self.versions.bump(self._slot(user_id))
+
+    def invalidate_users(self, user_ids):
+        for slot in {self._slot(user_id) for user_id in user_ids}:
+            self.versions.bump(slot)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _slot(self, user_id: int) -> int:
+        return zlib.crc32(repr(("principal", user_id)).encode()) % self.versions.slots
+
+
+def authenticate(token: str):
+    # Cached principal for the token, or None when it is not valid
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    claims = read_token(token)
+    if claims is None:
+        return None
+    user_id, role, expires = claims
+
+    # Version taken before the lookup, so a change to the user that
+    # lands in between keeps the principal out of the cache
+    version = principal_cache.version(user_id)
+    user = users.get(user_id)
+    if user is None or user["role"] != role:
+        return None
+    principal = Principal(user_id, role)
+    principal_cache.put(token, principal, expires, version)
+    return principal
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_SECRET, payload, hashlib.sha256).digest()
+
+
+def _encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.auth_cache_size,
+    ttl=settings.auth_cache_ttl
+)
+
+
+# Issues a token for an existing user, outside the server:
+#   python -m app.core.auth USER_ID [TTL_SECONDS]
+# Only where this process shares the server's signing key and store;
+# otherwise use POST /auth/tokens, or the admin token logged on startup.
+if __name__ == "__main__":
+    if not settings.auth_secret or settings.storage_backend != "sqlite":
+        sys.exit("Needs the server's AUTH_SECRET and STORAGE_BACKEND=sqlite; use POST /auth/tokens instead")
+    user = users.get(int(sys.argv[1]))
+    if user is None:
+        sys.exit(f"User {sys.argv[1]} not found")
+    print(issue_token(user["id"], user["role"], int(sys.argv[2]) if len(sys.argv) > 2 else None))
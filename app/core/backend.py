@@ -0,0 +1,90 @@
+from app.core.locks import StripedLock
+
+
+# Storage backend interface shared by the in-memory and SQLite stores.
+#
+# A backend exposes one table object per entity (users, courses,
+# enrollments, waitlist). Every table offers the same repository methods:
+#
+#   get(id), lookup(unique_index, key), find(index, key), all(), len()
+#   get_many(ids) -> the rows that exist, in the order of `ids`
+#   first(index, key) -> oldest row in the bucket, count(index, key)
+#   lookup_many(unique_index, keys) -> {key: row} for the keys that exist
+#   page(after_id, limit) -> up to `limit` rows with id > after_id, by id
+#   insert(row), update(id, **changes), delete(id), delete_by(index, key)
+#   insert_many(rows) -> per-row None or DuplicateKeyError, in one batch
+#   insert_all(rows) -> inserts every row or none (raises DuplicateKeyError)
+#   clear(), and an `ids` sequence with next(), reserve(n) and reset()
+#
+# Rows are read-only mappings: dicts from SQLite, compact entity objects
+# from the in-memory store; callers insert plain dicts. Unique index keys are a single value for
+# one-column indexes and a tuple for multi-column ones.
+
+
+class DuplicateKeyError(Exception):
+
+    def __init__(self, index: str):
+        super().__init__(f"Duplicate key for unique index '{index}'")
+        self.index = index
+
+
+# Table layouts: column declarations plus unique and non-unique
+# indexes, each index naming the columns it covers.
+
+SCHEMA = {
+    "users": {
+        "columns": {
+            "name": "TEXT NOT NULL",
+            "email": "TEXT NOT NULL",
+            "role": "TEXT NOT NULL",
+        },
+        "unique": {"email": ("email",)},
+        "multi": {},
+    },
+    "courses": {
+        "columns": {
+            "title": "TEXT NOT NULL",
+            "code": "TEXT NOT NULL",
+            "capacity": "INTEGER",
+        },
+        "unique": {"code": ("code",)},
+        "multi": {},
+    },
+    "enrollments": {
+        "columns": {"user_id": "INTEGER NOT NULL", "course_id": "INTEGER NOT NULL"},
+        "unique": {"user_course": ("user_id", "course_id")},
+        "multi": {"user_id": ("user_id",), "course_id": ("course_id",)},
+    },
+    # FIFO queue per course: the lowest id in a course bucket is next
+    "waitlist": {
+        "columns": {"user_id": "INTEGER NOT NULL", "course_id": "INTEGER NOT NULL"},
+        "unique": {"user_course": ("user_id", "course_id")},
+        "multi": {"user_id": ("user_id",), "course_id": ("course_id",)},
+    },
+}
+
+
+# Base backend. `stats` is None when enrollment counters are kept by the
+# application (app.core.stats); a backend shared between processes sets
+# it to counters maintained inside the store itself. `search` likewise
+# replaces the application's search index (app.core.search).
+
+class StorageBackend:
+
+    stats = None
+    search = None
+
+    def __init__(self, **tables):
+        self.tables = tables
+        for name, table in tables.items():
+            setattr(self, name, table)
+
+    def course_locks(self):
+        # Per-course mutual exclusion for enroll, deregister and delete
+        return StripedLock()
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def close(self):
+        pass
@@ -0,0 +1,155 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+
+
+class CachedResponse:
+
+    __slots__ = ("body", "etag", "headers", "version")
+
+    def __init__(self, body: bytes, headers: dict, version: tuple):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.headers = headers
+        self.version = version
+
+
+# Invalidation counters, one per hash slot. A namespace and each key in
+# it map to a slot; invalidating bumps the slot's counter. LocalVersions
+# lives in this process; SharedVersions lives in a memory-mapped file,
+# so an invalidation in one worker is seen by every worker on the host.
+
+class LocalVersions:
+
+    def __init__(self, slots: int = 4096):
+        self.slots = slots
+        self._counters = array("Q", bytes(8 * slots))
+        self._lock = threading.Lock()
+
+    def read(self, slot: int) -> int:
+        return self._counters[slot]
+
+    def bump(self, slot: int):
+        with self._lock:
+            self._counters[slot] += 1
+
+
+class SharedVersions:
+
+    _COUNTER = struct.Struct("=Q")
+
+    def __init__(self, path: str, slots: int = 4096):
+        import fcntl
+
+        self.slots = slots
+        self._flock = fcntl.flock
+        self._lock_ex, self._unlock = fcntl.LOCK_EX, fcntl.LOCK_UN
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        size = self._COUNTER.size * slots
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def read(self, slot: int) -> int:
+        return self._COUNTER.unpack_from(self._map, slot * self._COUNTER.size)[0]
+
+    def bump(self, slot: int):
+        # Writers serialize on the file lock; readers never lock
+        offset = slot * self._COUNTER.size
+        self._flock(self._fd, self._lock_ex)
+        try:
+            value = self._COUNTER.unpack_from(self._map, offset)[0]
+            self._COUNTER.pack_into(self._map, offset, value + 1)
+        finally:
+            self._flock(self._fd, self._unlock)
+
+
+# Bounded LRU cache of pre-serialized JSON responses, grouped into
+# namespaces so writers can drop a single entry or a whole group.
+#
+# Each entry remembers the counters of its namespace and key slots as
+# they were when its data was read (version()); get() treats an entry
+# whose counters have moved as a miss. A reader takes the version before
+# loading from storage, so a write that lands in between, in this or
+# any other process, keeps the stale body from ever being served.
+
+class ResponseCache:
+
+    def __init__(self, max_entries: int = 1024, versions=None):
+        self.max_entries = max_entries
+        self.versions = versions or LocalVersions()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, namespace: str, key) -> tuple:
+        return (
+            self.versions.read(self._slot(namespace)),
+            self.versions.read(self._slot(namespace, key))
+        )
+
+    def get(self, namespace: str, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            if entry.version != self.version(namespace, key):
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return entry
+
+    def put(self, namespace: str, key, body: bytes, headers: dict, version: tuple):
+        entry = CachedResponse(body, headers, version)
+        with self._lock:
+            if version == self.version(namespace, key):
+                self._entries[(namespace, key)] = entry
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, namespace: str, key=None):
+        if key is None:
+            self.versions.bump(self._slot(namespace))
+        else:
+            self.versions.bump(self._slot(namespace, key))
+
+        # Free local memory now; other processes drop theirs on next get
+        with self._lock:
+            if key is not None:
+                self._entries.pop((namespace, key), None)
+                return
+            for cached in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[cached]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _slot(self, namespace: str, key=None) -> int:
+        # Stable across processes, unlike hash() on strings
+        return zlib.crc32(repr((namespace, key)).encode()) % self.versions.slots
+
+
+def create_versions():
+    # Workers sharing a SQLite database share invalidations through a
+    # file next to it; the in-memory store is private to one process.
+    from app.core.config import settings
+
+    if settings.storage_backend == "sqlite":
+        return SharedVersions(settings.sqlite_path + "-versions")
+    return LocalVersions()
+
+
+# Invalidation counters of this process (or host); shared by the
+# catalog cache and the principal cache (see app.core.auth).
+versions = create_versions()
+
+# Public course catalog: "courses:list" holds list pages keyed by
+# (limit, after, q), "courses:item" holds single courses keyed by id.
+catalog_cache = ResponseCache(versions=versions)
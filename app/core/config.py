@@ -0,0 +1,60 @@
+import os
+
+
+def _rate_limits(value: str) -> dict:
+    # "enrollments=5/10,users=20/40" -> {"enrollments": (5.0, 10), ...}
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        router, _, limit = item.partition("=")
+        rate, _, burst = limit.partition("/")
+        limits[router.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return limits
+
+
+# Runtime configuration, read from environment variables
+
+class Settings:
+    storage_backend = os.getenv("STORAGE_BACKEND", "memory")
+    sqlite_path = os.getenv("SQLITE_PATH", "enrollment.db")
+    sqlite_pool_size = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+
+    # Persistence for the memory backend; disabled when WAL_DIR is empty
+    wal_dir = os.getenv("WAL_DIR", "")
+    wal_sync_interval = float(os.getenv("WAL_SYNC_INTERVAL", "0.01"))
+    snapshot_every = int(os.getenv("SNAPSHOT_EVERY", "1000000"))
+
+    # Memory-mapped users/courses snapshot for the memory backend
+    catalog_snapshot = os.getenv("CATALOG_SNAPSHOT", "")
+
+    # Encode trusted store rows with orjson, skipping response-model
+    # re-validation (see app/api/v1/serialization.py)
+    fast_json = os.getenv("FAST_JSON", "0") == "1"
+
+    # Bearer tokens (see app/core/auth.py). Without AUTH_SECRET each
+    # process signs with a random key, so tokens do not survive a
+    # restart or work across workers: set it in production.
+    auth_secret = os.getenv("AUTH_SECRET", "")
+    auth_token_ttl = int(os.getenv("AUTH_TOKEN_TTL", "3600"))
+    auth_cache_ttl = float(os.getenv("AUTH_CACHE_TTL", "60"))
+    auth_cache_size = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+    # Admin created on startup when the store has none (see app/main.py)
+    auth_bootstrap_email = os.getenv("AUTH_BOOTSTRAP_EMAIL", "admin@example.com")
+
+    # Overload protection (see app/core/admission.py): per-router token
+    # buckets keyed by user or client address, as "router=rate/burst,...";
+    # and, when ADMISSION_CONCURRENCY > 0, a bound on requests served at
+    # once with a priority queue (reads ahead of writes) for the rest.
+    rate_limits = _rate_limits(os.getenv("RATE_LIMITS", ""))
+    rate_limit_keys = int(os.getenv("RATE_LIMIT_KEYS", "100000"))
+    admission_concurrency = int(os.getenv("ADMISSION_CONCURRENCY", "0"))
+    admission_queue = int(os.getenv("ADMISSION_QUEUE", "256"))
+    admission_timeout = float(os.getenv("ADMISSION_TIMEOUT", "2"))
+
+    # Replayed responses for retried writes (see app/core/idempotency.py):
+    # how many are kept, for how long, and the largest body worth keeping.
+    idempotency_cache_size = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    idempotency_ttl = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+    idempotency_max_body = int(os.getenv("IDEMPOTENCY_MAX_BODY", "65536"))
+
+
+settings = Settings()
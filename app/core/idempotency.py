@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+# First responses to requests that carried an Idempotency-Key, so that a
+# retry is answered from here, byte-for-byte, instead of running again.
+#
+# claim() is the only lookup a request makes: it returns the entry
+# already held for the key, or records a new, in-flight one that the
+# caller owns and later either completes with its response or abandons
+# (a failed or retryable response leaves nothing behind). Entries are
+# bounded (LRU) and expire IDEMPOTENCY_TTL seconds after they are made.
+# Workers sharing a SQLite database share the entries through it (see
+# SQLiteIdempotency in app.core.sqlite), with the same interface.
+
+class StoredResponse:
+
+    __slots__ = ("fingerprint", "expires", "status", "headers", "body", "route")
+
+    def __init__(self, fingerprint: bytes, expires: float):
+        # Digest of the request body, to spot a key reused for another request
+        self.fingerprint = fingerprint
+        self.expires = expires
+        # None while the first request is still being served
+        self.status = None
+        self.headers = None
+        self.body = None
+        # Route template of the first request, for the replay's metrics
+        self.route = None
+
+
+class IdempotencyCache:
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key, fingerprint: bytes):
+        # The entry already held for `key`, or None when the caller now owns it
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(key)
+                return entry
+
+            self._entries[key] = StoredResponse(fingerprint, now + self.ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return None
+
+    def complete(self, key, status: int, headers: list, body: bytes, route: str = None):
+        with self._lock:
+            entry = self._entries.get(key)
+            # Gone already when evicted or cleared while the request ran
+            if entry is not None and entry.status is None:
+                entry.status = status
+                entry.headers = headers
+                entry.body = body
+                entry.route = route
+
+    def abandon(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.status is None:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def create_idempotency_cache():
+    # A retry may reach any worker, so SQLite workers keep the entries in
+    # the database they share; the in-memory store is private to one process.
+    if settings.storage_backend == "sqlite":
+        from app.core.sqlite import SQLiteIdempotency
+        from app.core.storage import backend
+        return SQLiteIdempotency(backend.pool, settings.idempotency_cache_size, settings.idempotency_ttl)
+    return IdempotencyCache(settings.idempotency_cache_size, settings.idempotency_ttl)
+
+
+idempotency_cache = create_idempotency_cache()
@@ -0,0 +1,39 @@
+import threading
+
+
+# Monotonic, thread-safe id sequence. Ids are never reused, even after
+# the rows that held them are deleted.
+
+class IdSequence:
+
+    def __init__(self, start: int = 1):
+        self._start = start
+        self._next = start
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            value = self._next
+            self._next += 1
+            return value
+
+    def reserve(self, count: int) -> range:
+        # Preallocate a contiguous block of ids for bulk inserts
+        with self._lock:
+            block = range(self._next, self._next + count)
+            self._next += count
+            return block
+
+    def reset(self):
+        with self._lock:
+            self._next = self._start
+
+    def last(self) -> int:
+        # Highest id handed out so far (start - 1 when none)
+        with self._lock:
+            return self._next - 1
+
+    def advance(self, last: int):
+        # Never hand out `last` or anything below it again
+        with self._lock:
+            self._next = max(self._next, last + 1)
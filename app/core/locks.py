@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+
+
+# Reader-writer lock: any number of concurrent readers, or one writer.
+# Waiting writers block new readers so writes are not starved.
+
+class RWLock:
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+# Fixed pool of mutexes selected by key hash, so operations on
+# different keys rarely contend without allocating a lock per key.
+
+class StripedLock:
+
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def many(self, keys):
+        # Stripes are always taken in index order, so two callers
+        # locking overlapping key sets cannot deadlock.
+        stripes = sorted({hash(key) % len(self._locks) for key in keys})
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
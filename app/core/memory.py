@@ -0,0 +1,302 @@
+from bisect import bisect_right, insort
+from operator import attrgetter, itemgetter
+from app.core.backend import SCHEMA, DuplicateKeyError, StorageBackend
+from app.core.catalog import CATALOG_TABLES, CatalogFile, MappedTable
+from app.core.entities import entity_class
+from app.core.ids import IdSequence
+from app.core.locks import RWLock
+from app.core.wal import WriteAheadLog
+
+
+# In-memory table: rows keyed by id, plus secondary indexes that are
+# kept consistent on insert, update and delete. Every public method
+# holds the table's reader-writer lock, so concurrent reads proceed in
+# parallel while each write is applied atomically to rows and indexes.
+#
+# Ids are also kept in a sorted list for keyset pagination. Deletes
+# leave tombstones there instead of shifting the list; they are
+# skipped by page() and compacted away once they outnumber live rows.
+#
+# With an `entity` class, inserted rows are stored as compact entity
+# objects (see app.core.entities); otherwise the dicts are kept as-is.
+#
+# When `journal` is set (entity tables only), every applied write is
+# also passed to it as (op, arg) while the write lock is still held, so
+# the journal sees each table's writes in the order they were applied.
+
+class Table:
+
+    def __init__(self, unique: dict = None, multi: dict = None, entity=None):
+        self.rows = {}
+        self.entity = entity
+        self.journal = None
+        self._entity = entity.from_row if entity else None
+        self.row_values = attrgetter(*entity._columns) if entity else None
+        self._id = attrgetter("id") if entity else itemgetter("id")
+        self.ids = IdSequence()
+        self.lock = RWLock()
+        self._unique_keys = dict(unique or {})
+        self._multi_keys = dict(multi or {})
+        self._unique = {name: {} for name in self._unique_keys}
+        self._multi = {name: {} for name in self._multi_keys}
+        self._order = []
+        self._tombstones = 0
+
+
+    # Reads
+
+    def get(self, row_id: int):
+        with self.lock.read():
+            return self.rows.get(row_id)
+
+    def get_many(self, row_ids):
+        with self.lock.read():
+            return [row for row in map(self.rows.get, row_ids) if row is not None]
+
+    def lookup(self, index: str, key):
+        with self.lock.read():
+            return self._unique[index].get(key)
+
+    def lookup_many(self, index: str, keys):
+        with self.lock.read():
+            found = self._unique[index]
+            return {key: found[key] for key in keys if key in found}
+
+    def find(self, index: str, key):
+        with self.lock.read():
+            return list(self._multi[index].get(key, {}).values())
+
+    def first(self, index: str, key):
+        # Buckets keep insertion order
+        with self.lock.read():
+            bucket = self._multi[index].get(key)
+            return next(iter(bucket.values())) if bucket else None
+
+    def count(self, index: str, key):
+        bucket = self._multi[index].get(key)
+        return len(bucket) if bucket else 0
+
+    def page(self, after: int = None, limit: int = 100):
+        with self.lock.read():
+            start = 0 if after is None else bisect_right(self._order, after)
+            rows = []
+            for position in range(start, len(self._order)):
+                row = self.rows.get(self._order[position])
+                if row is not None:
+                    rows.append(row)
+                    if len(rows) == limit:
+                        break
+            return rows
+
+    def all(self):
+        with self.lock.read():
+            return list(self.rows.values())
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.all())
+
+
+    # Writes
+
+    def insert(self, row: dict):
+        row = self._convert(row)
+        with self.lock.write():
+            self._check_unique(row)
+            self._store(row)
+            if self.journal:
+                self.journal("i", [self.row_values(row)])
+            return row
+
+    def insert_many(self, rows: list):
+        # One lock acquisition for the whole batch. Rows that collide
+        # on a unique index are skipped; the result holds None for each
+        # inserted row and the DuplicateKeyError for each skipped one.
+        rows = [self._convert(row) for row in rows]
+        with self.lock.write():
+            results = []
+            for row in rows:
+                try:
+                    self._check_unique(row)
+                except DuplicateKeyError as exc:
+                    results.append(exc)
+                    continue
+                self._store(row)
+                results.append(None)
+            if self.journal and None in results:
+                self.journal("i", [
+                    self.row_values(row) for row, error in zip(rows, results) if error is None
+                ])
+            return results
+
+    def insert_all(self, rows: list):
+        # All-or-nothing batch: every row is checked against the table
+        # and the rest of the batch before any of them is stored.
+        rows = [self._convert(row) for row in rows]
+        with self.lock.write():
+            batch_keys = {name: set() for name in self._unique_keys}
+            for row in rows:
+                self._check_unique(row)
+                for name, key_of in self._unique_keys.items():
+                    if key_of(row) in batch_keys[name]:
+                        raise DuplicateKeyError(name)
+                    batch_keys[name].add(key_of(row))
+            for row in rows:
+                self._store(row)
+            if self.journal:
+                self.journal("i", [self.row_values(row) for row in rows])
+            return rows
+
+    def update(self, row_id: int, **changes):
+        with self.lock.write():
+            row = self.rows[row_id]
+            if self._entity and not changes.keys() <= row.keys():
+                raise KeyError(next(iter(changes.keys() - row.keys())))
+            self._check_unique(self._convert({**row, **changes}))
+            self._unindex(row)
+            row.update(changes)
+            self._index(row)
+            if self.journal:
+                self.journal("u", (row_id, changes))
+            return row
+
+    def delete(self, row_id: int):
+        with self.lock.write():
+            row = self.rows.pop(row_id, None)
+            if row is not None:
+                self._unindex(row)
+                self._add_tombstones(1)
+                if self.journal:
+                    self.journal("d", row_id)
+            return row
+
+    def delete_by(self, index: str, key):
+        # Drops the whole bucket at once, so the cost scales with the
+        # number of matching rows rather than the size of the table.
+        with self.lock.write():
+            bucket = self._multi[index].pop(key, {})
+            for row_id, row in bucket.items():
+                del self.rows[row_id]
+                self._unindex(row)
+            self._add_tombstones(len(bucket))
+            if bucket and self.journal:
+                self.journal("x", (index, key))
+            return list(bucket.values())
+
+    def clear(self):
+        with self.lock.write():
+            self.rows.clear()
+            self.ids.reset()
+            self._order.clear()
+            self._tombstones = 0
+            for index in self._unique.values():
+                index.clear()
+            for index in self._multi.values():
+                index.clear()
+            if self.journal:
+                self.journal("c", None)
+
+    def restore(self, rows):
+        # Recovery only: stores already-validated rows without unique
+        # checks or journaling
+        with self.lock.write():
+            for row in rows:
+                self._store(row)
+
+
+    # Index Maintenance
+
+    def _convert(self, row):
+        return self._entity(row) if self._entity else row
+
+    def _store(self, row: dict):
+        row_id = self._id(row)
+        self.rows[row_id] = row
+        self._index(row)
+        if not self._order or row_id > self._order[-1]:
+            self._order.append(row_id)
+        else:
+            insort(self._order, row_id)
+
+    def _add_tombstones(self, count: int):
+        self._tombstones += count
+        if self._tombstones > len(self.rows):
+            self._order = [row_id for row_id in self._order if row_id in self.rows]
+            self._tombstones = 0
+
+    def _check_unique(self, row: dict):
+        for name, key_of in self._unique_keys.items():
+            existing = self._unique[name].get(key_of(row))
+            if existing is not None and self._id(existing) != self._id(row):
+                raise DuplicateKeyError(name)
+
+    def _index(self, row: dict):
+        for name, key_of in self._unique_keys.items():
+            self._unique[name][key_of(row)] = row
+        for name, key_of in self._multi_keys.items():
+            self._multi[name].setdefault(key_of(row), {})[self._id(row)] = row
+
+    def _unindex(self, row: dict):
+        for name, key_of in self._unique_keys.items():
+            self._unique[name].pop(key_of(row), None)
+        for name, key_of in self._multi_keys.items():
+            bucket = self._multi[name].get(key_of(row))
+            if bucket is not None:
+                bucket.pop(self._id(row), None)
+                if not bucket:
+                    del self._multi[name][key_of(row)]
+
+
+# In-memory backend. Calls never wait on I/O, so the inherited
+# StorageBackend.run executes them inline on the event loop. With a
+# `wal_dir`, state is recovered from it on start and every write is
+# journaled there (see app.core.wal); fsyncs happen off the request path.
+#
+# With a `catalog` snapshot, users and courses start out as the mapped,
+# read-only rows of that file, with later writes kept in memory on top
+# (see app.core.catalog). The two options are exclusive: the log could
+# not recover writes made on top of a snapshot it did not write.
+
+class MemoryBackend(StorageBackend):
+
+    def __init__(self, wal_dir: str = None, sync_interval: float = 0.01,
+                 snapshot_every: int = 1_000_000, catalog: str = None):
+        if wal_dir and catalog:
+            raise ValueError("A catalog snapshot cannot be combined with a write-ahead log")
+
+        tables = {
+            name: _table_from_schema(name, layout)
+            for name, layout in SCHEMA.items()
+        }
+        if catalog:
+            snapshot = CatalogFile(catalog)
+            for name in CATALOG_TABLES:
+                base = snapshot.rows(name, tables[name].entity)
+                if base is not None:
+                    tables[name] = MappedTable(base, tables[name])
+        super().__init__(**tables)
+
+        self.wal = None
+        if wal_dir:
+            self.wal = WriteAheadLog(
+                wal_dir,
+                self.tables,
+                sync_interval=sync_interval,
+                snapshot_every=snapshot_every
+            )
+            self.wal.open()
+
+    def close(self):
+        if self.wal is not None:
+            self.wal.close()
+
+
+def _table_from_schema(name: str, layout: dict):
+    # Rows are entities, so index keys are read as attributes
+    return Table(
+        unique={n: attrgetter(*cols) for n, cols in layout["unique"].items()},
+        multi={n: attrgetter(*cols) for n, cols in layout["multi"].items()},
+        entity=entity_class(name.title().rstrip("s"), ("id", *layout["columns"])),
+    )
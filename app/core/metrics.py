@@ -0,0 +1,263 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+
+# Process-local metrics rendered in the Prometheus text format.
+#
+# Each metric keeps one child per label combination; callers resolve the
+# child once (labels()) and then only touch its counters, so recording a
+# sample is a short locked update with no formatting or allocation.
+
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OPERATION_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 1.0)
+
+
+class _Value:
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def reset(self):
+        with self._lock:
+            self.value = 0.0
+
+
+class _Buckets:
+
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        # Bucket bounds are inclusive ("le"), hence bisect_left
+        position = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.sum += value
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.sum = 0.0
+
+
+class Metric:
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def clear(self):
+        # Resets samples but keeps the children, which timing hooks hold on to
+        with self._lock:
+            for child in self._children.values():
+                child.reset()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return lines
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(Metric):
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self, values: tuple, child):
+        return [f"{self.name}_total{self._label_text(values)} {_number(child.value)}"]
+
+
+class Gauge(Metric):
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self, values: tuple, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value)}"]
+
+
+class Histogram(Metric):
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def _samples(self, values: tuple, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            bucket = self._label_text(values, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+        labels = self._label_text(values)
+        lines.append(f"{self.name}_sum{labels} {_number(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def clear(self):
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if value == int(value) else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests", "HTTP requests by route, method and status code.", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+))
+service_call_duration = registry.register(Histogram(
+    "service_call_duration_seconds", "Service method latency.", ("service", "method"), OPERATION_BUCKETS
+))
+store_operation_duration = registry.register(Histogram(
+    "store_operation_duration_seconds", "Storage table operation latency.", ("table", "operation"), OPERATION_BUCKETS
+))
+admission_rejected = registry.register(Counter(
+    "admission_rejected", "Requests turned away by rate limiting or admission control.", ("router", "reason")
+))
+admission_queued = registry.register(Counter(
+    "admission_queued", "Requests admitted after waiting for a slot.", ("router", "priority")
+))
+admission_waiting = registry.register(Gauge(
+    "admission_waiting", "Requests currently waiting for a slot.", ("priority",)
+))
+idempotent_requests = registry.register(Counter(
+    "idempotent_requests", "Requests carrying an Idempotency-Key, by outcome.", ("outcome",)
+))
+
+
+# Timing hooks
+
+def timed(child: _Buckets, func):
+    clock = time.perf_counter
+    observe = child.observe
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            observe(clock() - start)
+
+    return wrapper
+
+
+def instrument_service(service):
+    # Class decorator: times every public static method. Applied before
+    # async_variant, so the async services report through the same hooks.
+    for name, member in list(vars(service).items()):
+        if name.startswith("_") or not isinstance(member, staticmethod):
+            continue
+        child = service_call_duration.labels(service.__name__, name)
+        setattr(service, name, staticmethod(timed(child, member.__func__)))
+    return service
+
+
+class TimedTable:
+
+    # Wraps a storage table so every operation of the table interface
+    # (see app.core.backend) it implements is timed; anything else passes
+    # through. Read-only mapped tables (see app.core.catalog) implement
+    # only part of the interface.
+
+    OPERATIONS = (
+        "get", "get_many", "lookup", "lookup_many", "find", "first", "count", "page", "all",
+        "insert", "insert_many", "insert_all", "update", "delete", "delete_by", "clear"
+    )
+
+    def __init__(self, table, name: str):
+        self.table = table
+        self.name = name
+        self.ids = table.ids
+        for operation in self.OPERATIONS:
+            if not hasattr(table, operation):
+                continue
+            child = store_operation_duration.labels(name, operation)
+            setattr(self, operation, timed(child, getattr(table, operation)))
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __getattr__(self, name: str):
+        return getattr(self.table, name)
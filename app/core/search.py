@@ -0,0 +1,241 @@
+import heapq
+import re
+import string
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+from app.core.storage import backend, courses, scan, users
+
+
+# Catalog and directory search, kept up to date by CourseService and
+# UserService on every write.
+#
+# Courses: an inverted index from title tokens, and from every prefix
+# of the course code, to the ids carrying them. Posting lists are
+# sorted by id (new ids are appended), so a query intersects them
+# lazily from the `after` cursor and stops once it has a page.
+#
+# Users: per role, a sorted list of (folded email, id). An email prefix
+# is a bisect into it, and a query across roles merges the role lists,
+# so results come back in email order; the page cursor is the id of
+# the last user, which resolves to its (email, id) position.
+#
+# The index is built from the tables on the first query (and again
+# after clear()). Hooks are idempotent, so writes that race the build
+# are neither lost nor applied twice.
+
+_TOKEN = re.compile(r"[^\W_]+")
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall(text.lower())
+
+
+def fold_email(email: str) -> str:
+    # ASCII-only lower-casing, the same as SQLite's lower()
+    folded = email.lower() if email.isascii() else email.translate(_ASCII_LOWER)
+    return email if folded == email else folded
+
+
+def code_prefixes(code: str):
+    return [code[:end] for end in range(1, len(code) + 1)]
+
+
+class SearchIndex:
+
+    def __init__(self, users_table, courses_table):
+        self._users = users_table
+        self._courses = courses_table
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._titles = {}
+            self._codes = {}
+            self._emails = {}
+            self._built = False
+
+
+    # Queries
+
+    def search_courses(self, q: str, limit: int, after: int = None) -> list:
+        tokens = set(tokenize(q))
+        code = q.strip().upper()
+        after = after or 0
+
+        with self._lock:
+            self._build()
+            streams = []
+            if tokens:
+                lists = [self._titles.get(token) for token in tokens]
+                if all(lists):
+                    streams.append(_intersect(sorted(lists, key=len), after))
+            if code in self._codes:
+                ids = self._codes[code]
+                streams.append(_from(ids, bisect_right(ids, after)))
+            found = list(islice(_unique(heapq.merge(*streams)), limit))
+
+        return self._courses.get_many(found)
+
+    def search_users(self, email_prefix: str = None, role: str = None,
+                     limit: int = 100, after: tuple = None) -> list:
+        # `after` is the (email, id) of the last user of the previous page
+        prefix = fold_email(email_prefix or "")
+
+        with self._lock:
+            self._build()
+            roles = [role] if role is not None else list(self._emails)
+            streams = []
+            for name in roles:
+                entries = self._emails.get(name, [])
+                start = bisect_left(entries, (prefix,))
+                if after is not None:
+                    start = max(start, bisect_right(entries, (fold_email(after[0]), after[1])))
+                streams.append(_from(entries, start))
+
+            found = []
+            for email, user_id in heapq.merge(*streams):
+                if not email.startswith(prefix) or len(found) == limit:
+                    break
+                found.append(user_id)
+
+        return self._users.get_many(found)
+
+
+    # Course Hooks
+
+    def course_added(self, course):
+        with self._lock:
+            if self._built:
+                self._add_course(course)
+
+    def courses_added(self, rows):
+        with self._lock:
+            if self._built:
+                for course in rows:
+                    self._add_course(course)
+
+    def course_updated(self, old, new):
+        with self._lock:
+            if self._built:
+                self._remove_course(old)
+                self._add_course(new)
+
+    def course_removed(self, course):
+        with self._lock:
+            if self._built:
+                self._remove_course(course)
+
+
+    # User Hooks
+
+    def user_added(self, user):
+        with self._lock:
+            if self._built:
+                self._add_user(user)
+
+    def users_added(self, rows):
+        with self._lock:
+            if self._built:
+                for user in rows:
+                    self._add_user(user)
+
+
+    # Private Methods
+
+    def _build(self):
+        # Rows come in id order, so posting lists are built sorted
+        if self._built:
+            return
+        titles, codes = self._titles, self._codes
+        for course in scan(self._courses):
+            course_id = course["id"]
+            for token in set(tokenize(course["title"])):
+                titles.setdefault(token, []).append(course_id)
+            for prefix in code_prefixes(course["code"]):
+                codes.setdefault(prefix, []).append(course_id)
+
+        emails = self._emails
+        for user in scan(self._users):
+            emails.setdefault(user["role"], []).append((fold_email(user["email"]), user["id"]))
+        for entries in emails.values():
+            entries.sort()
+        self._built = True
+
+    def _add_course(self, course):
+        course_id = course["id"]
+        for postings, keys in self._course_keys(course):
+            for key in keys:
+                ids = postings.setdefault(key, [])
+                if not ids or ids[-1] < course_id:
+                    ids.append(course_id)
+                elif not _contains(ids, course_id):
+                    insort(ids, course_id)
+
+    def _remove_course(self, course):
+        course_id = course["id"]
+        for postings, keys in self._course_keys(course):
+            for key in keys:
+                ids = postings.get(key)
+                if ids and _contains(ids, course_id):
+                    del ids[bisect_left(ids, course_id)]
+                    if not ids:
+                        del postings[key]
+
+    def _course_keys(self, course):
+        return (
+            (self._titles, set(tokenize(course["title"]))),
+            (self._codes, code_prefixes(course["code"]))
+        )
+
+    def _add_user(self, user):
+        entry = (fold_email(user["email"]), user["id"])
+        entries = self._emails.setdefault(user["role"], [])
+        position = bisect_left(entries, entry)
+        if position == len(entries) or entries[position] != entry:
+            entries.insert(position, entry)
+
+
+def _contains(ids: list, item) -> bool:
+    position = bisect_left(ids, item)
+    return position < len(ids) and ids[position] == item
+
+
+def _intersect(lists: list, after: int, chunk: int = 256):
+    # Walks the shortest list in growing chunks; each chunk is
+    # intersected (as sets, in C) with the same id range of the others
+    first, rest = lists[0], lists[1:]
+    start = bisect_right(first, after)
+    while start < len(first):
+        ids = first[start:start + chunk]
+        low, high = ids[0], ids[-1]
+        common = set(ids)
+        for other in rest:
+            common.intersection_update(other[bisect_left(other, low):bisect_right(other, high)])
+        yield from sorted(common)
+        start += chunk
+        chunk *= 2
+
+
+def _from(items: list, start: int):
+    # Iterates a list from a position without skipping through the
+    # items before it, as islice() would
+    return map(items.__getitem__, range(start, len(items)))
+
+
+def _unique(items):
+    last = None
+    for item in items:
+        if item != last:
+            yield item
+            last = item
+
+
+# Backends shared between processes search inside the store
+if backend.search is not None:
+    search_index = backend.search
+else:
+    search_index = SearchIndex(users, courses)
@@ -0,0 +1,732 @@
+import functools
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import anyio
+
+from app.core.backend import SCHEMA, DuplicateKeyError, StorageBackend
+from app.core.locks import StripedLock
+
+
+# Fixed-size pool of SQLite connections shared by worker threads. Every
+# connection runs in WAL mode, so readers never block the writer, and
+# keeps a statement cache, so repeated queries are prepared only once.
+
+class ConnectionPool:
+
+    def __init__(self, path: str, size: int = 8):
+        self.path = path
+        self._idle = queue.Queue()
+        self._connections = [self._connect() for _ in range(size)]
+        self._local = threading.local()
+
+        for conn in self._connections:
+            self._idle.put(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        # Inside a transaction, reuse the thread's connection so every
+        # statement joins it.
+        current = getattr(self._local, "conn", None)
+        if current is not None:
+            yield current
+            return
+
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, "conn", None) is not None:
+            yield self._local.conn
+            return
+
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.conn = conn
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                self._local.conn = None
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+
+
+# Id sequence stored in the database, so ids stay unique across every
+# process sharing the file.
+
+class SQLiteSequence:
+
+    def __init__(self, pool: ConnectionPool, name: str):
+        self._pool = pool
+        self.name = name
+
+    def next(self) -> int:
+        return self.reserve(1).start
+
+    def reserve(self, count: int) -> range:
+        with self._pool.connection() as conn:
+            end = conn.execute(
+                "UPDATE sequences SET value = value + ? WHERE name = ? RETURNING value",
+                (count, self.name)
+            ).fetchone()["value"]
+        return range(end - count + 1, end + 1)
+
+    def reset(self):
+        with self._pool.connection() as conn:
+            conn.execute("UPDATE sequences SET value = 0 WHERE name = ?", (self.name,))
+
+
+# SQLite-backed table implementing the same interface as the in-memory
+# Table. SQL text is built once per table, so each call reuses a cached
+# prepared statement.
+
+class SQLiteTable:
+
+    def __init__(self, pool: ConnectionPool, name: str, layout: dict):
+        self._pool = pool
+        self.name = name
+        self.ids = SQLiteSequence(pool, name)
+        self._unique = layout["unique"]
+        self._multi = layout["multi"]
+        self._index_by_columns = {cols: index for index, cols in self._unique.items()}
+
+        columns = ("id", *layout["columns"])
+        self._sql_get = f"SELECT * FROM {name} WHERE id = ?"
+        self._sql_all = f"SELECT * FROM {name} ORDER BY id"
+        self._sql_first_page = f"SELECT * FROM {name} ORDER BY id LIMIT ?"
+        self._sql_page = f"SELECT * FROM {name} WHERE id > ? ORDER BY id LIMIT ?"
+        self._sql_count = f"SELECT COUNT(*) AS n FROM {name}"
+        self._sql_insert = (
+            f"INSERT INTO {name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        self._sql_delete = f"DELETE FROM {name} WHERE id = ? RETURNING *"
+        self._sql_clear = f"DELETE FROM {name}"
+        self._columns = columns
+        self._sql_where = {
+            index: " AND ".join(f"{col} = ?" for col in cols)
+            for index, cols in {**self._unique, **self._multi}.items()
+        }
+
+
+    # Reads
+
+    def get(self, row_id: int):
+        return self._one(self._sql_get, (row_id,))
+
+    def get_many(self, row_ids):
+        row_ids = list(row_ids)
+        found = {}
+        for start in range(0, len(row_ids), 500):
+            chunk = row_ids[start:start + 500]
+            rows = self._many(
+                f"SELECT * FROM {self.name} WHERE id IN ({', '.join('?' for _ in chunk)})",
+                tuple(chunk)
+            )
+            found.update((row["id"], row) for row in rows)
+        return [found[row_id] for row_id in row_ids if row_id in found]
+
+    def lookup(self, index: str, key):
+        return self._one(
+            f"SELECT * FROM {self.name} WHERE {self._sql_where[index]}",
+            self._params(self._unique[index], key)
+        )
+
+    def lookup_many(self, index: str, keys):
+        # Single-column unique indexes only; keys go in chunks that fit
+        # under SQLite's bound-parameter limit.
+        (column,) = self._unique[index]
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._many(
+                f"SELECT * FROM {self.name} WHERE {column} IN ({', '.join('?' for _ in chunk)})",
+                tuple(chunk)
+            )
+            found.update((row[column], row) for row in rows)
+        return found
+
+    def find(self, index: str, key):
+        return self._many(
+            f"SELECT * FROM {self.name} WHERE {self._sql_where[index]} ORDER BY id",
+            self._params(self._multi[index], key)
+        )
+
+    def first(self, index: str, key):
+        return self._one(
+            f"SELECT * FROM {self.name} WHERE {self._sql_where[index]} ORDER BY id LIMIT 1",
+            self._params(self._multi[index], key)
+        )
+
+    def count(self, index: str, key):
+        return self._one(
+            f"SELECT COUNT(*) AS n FROM {self.name} WHERE {self._sql_where[index]}",
+            self._params(self._multi[index], key)
+        )["n"]
+
+    def page(self, after: int = None, limit: int = 100):
+        if after is None:
+            return self._many(self._sql_first_page, (limit,))
+        return self._many(self._sql_page, (after, limit))
+
+    def all(self):
+        return self._many(self._sql_all, ())
+
+    def __len__(self):
+        return self._one(self._sql_count, ())["n"]
+
+    def __iter__(self):
+        return iter(self.all())
+
+
+    # Writes
+
+    def insert(self, row: dict):
+        with self._writing():
+            self._execute(self._sql_insert, tuple(row.get(col) for col in self._columns))
+        return row
+
+    def insert_many(self, rows: list):
+        # One transaction for the whole batch. A failed INSERT only rolls
+        # back that statement, so colliding rows are skipped and reported.
+        results = []
+        with self._pool.transaction() as conn:
+            for row in rows:
+                try:
+                    with self._writing():
+                        conn.execute(self._sql_insert, tuple(row.get(col) for col in self._columns))
+                except DuplicateKeyError as exc:
+                    results.append(exc)
+                else:
+                    results.append(None)
+        return results
+
+    def insert_all(self, rows: list):
+        # All-or-nothing batch: any collision rolls back the transaction
+        with self._writing(), self._pool.transaction() as conn:
+            conn.executemany(self._sql_insert, [
+                tuple(row.get(col) for col in self._columns) for row in rows
+            ])
+        return rows
+
+    def update(self, row_id: int, **changes):
+        if not changes:
+            row = self.get(row_id)
+        else:
+            assignments = ", ".join(f"{col} = ?" for col in changes)
+            with self._writing():
+                row = self._one(
+                    f"UPDATE {self.name} SET {assignments} WHERE id = ? RETURNING *",
+                    (*changes.values(), row_id)
+                )
+        if row is None:
+            raise KeyError(row_id)
+        return row
+
+    def delete(self, row_id: int):
+        return self._one(self._sql_delete, (row_id,))
+
+    def delete_by(self, index: str, key):
+        return self._many(
+            f"DELETE FROM {self.name} WHERE {self._sql_where[index]} RETURNING *",
+            self._params(self._multi[index], key)
+        )
+
+    def clear(self):
+        self._execute(self._sql_clear, ())
+        self.ids.reset()
+
+
+    # Private Methods
+
+    def _execute(self, sql: str, params: tuple):
+        with self._pool.connection() as conn:
+            conn.execute(sql, params)
+
+    def _one(self, sql: str, params: tuple):
+        with self._pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def _many(self, sql: str, params: tuple):
+        with self._pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _params(columns: tuple, key) -> tuple:
+        return tuple(key) if len(columns) > 1 else (key,)
+
+    @contextmanager
+    def _writing(self):
+        try:
+            yield
+        except sqlite3.IntegrityError as exc:
+            # e.g. "UNIQUE constraint failed: enrollments.user_id, enrollments.course_id"
+            failed = str(exc).partition(": ")[2]
+            columns = tuple(col.split(".")[-1] for col in failed.split(", "))
+            raise DuplicateKeyError(self._index_by_columns.get(columns, "id")) from exc
+
+
+# Course locks for a database shared by several worker processes. The
+# stripe queues this process's threads; BEGIN IMMEDIATE then takes the
+# database write lock, so the checks and writes made under the lock
+# form one transaction that no other process can interleave with.
+
+class TransactionLocks:
+
+    def __init__(self, pool: ConnectionPool, stripes: int = 64):
+        self._pool = pool
+        self._stripes = StripedLock(stripes)
+
+    @contextmanager
+    def __call__(self, key):
+        with self._stripes(key), self._pool.transaction():
+            yield
+
+    @contextmanager
+    def many(self, keys):
+        with self._stripes.many(keys), self._pool.transaction():
+            yield
+
+
+# Enrollment counters kept by triggers on the enrollments table, so
+# every process sees the same counts. Mirrors the read side of
+# app.core.stats.EnrollmentStats; its write hooks are no-ops.
+
+class SQLiteStats:
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    @property
+    def total(self) -> int:
+        return self._scalar("SELECT COALESCE(SUM(enrollments), 0) FROM course_counts", ())
+
+    def course_count(self, course_id: int) -> int:
+        return self._scalar(
+            "SELECT enrollments FROM course_counts WHERE course_id = ?", (course_id,)
+        )
+
+    def user_count(self, user_id: int) -> int:
+        return self._scalar("SELECT courses FROM user_counts WHERE user_id = ?", (user_id,))
+
+    def top_courses(self, limit: int):
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT course_id, enrollments FROM course_counts "
+                "ORDER BY enrollments DESC, course_id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(row["course_id"], row["enrollments"]) for row in rows]
+
+    def added(self, user_id: int, course_id: int):
+        pass
+
+    def removed(self, user_id: int, course_id: int):
+        pass
+
+    def course_removed(self, course_id: int, user_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def _scalar(self, sql: str, params: tuple) -> int:
+        with self._pool.connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return next(iter(row.values())) if row else 0
+
+
+_COUNTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS course_counts (
+    course_id INTEGER PRIMARY KEY, enrollments INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS course_counts_top ON course_counts (enrollments DESC, course_id);
+CREATE TABLE IF NOT EXISTS user_counts (
+    user_id INTEGER PRIMARY KEY, courses INTEGER NOT NULL);
+
+CREATE TRIGGER IF NOT EXISTS enrollments_counted AFTER INSERT ON enrollments BEGIN
+    INSERT INTO course_counts VALUES (NEW.course_id, 1)
+        ON CONFLICT (course_id) DO UPDATE SET enrollments = enrollments + 1;
+    INSERT INTO user_counts VALUES (NEW.user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET courses = courses + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS enrollments_uncounted AFTER DELETE ON enrollments BEGIN
+    UPDATE course_counts SET enrollments = enrollments - 1 WHERE course_id = OLD.course_id;
+    DELETE FROM course_counts WHERE course_id = OLD.course_id AND enrollments = 0;
+    UPDATE user_counts SET courses = courses - 1 WHERE user_id = OLD.user_id;
+    DELETE FROM user_counts WHERE user_id = OLD.user_id AND courses = 0;
+END;
+"""
+
+# Counts for enrollments written before the triggers existed
+_COUNTER_BACKFILL = """
+DELETE FROM course_counts;
+DELETE FROM user_counts;
+INSERT INTO course_counts SELECT course_id, COUNT(*) FROM enrollments GROUP BY course_id;
+INSERT INTO user_counts SELECT user_id, COUNT(*) FROM enrollments GROUP BY user_id;
+"""
+
+
+# Course and user search inside the database, so every process sees
+# the same results. Title tokens come from an FTS5 index kept in sync
+# by triggers; code and email prefixes are range scans over indexes.
+# Mirrors app.core.search.SearchIndex; its write hooks are no-ops.
+
+class SQLiteSearch:
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    def search_courses(self, q: str, limit: int, after: int = None) -> list:
+        from app.core.search import tokenize
+
+        # Each source yields at most one page of ids past the cursor
+        after = after or 0
+        sources, params = [], []
+        tokens = tokenize(q)
+        if tokens:
+            sources.append(
+                "SELECT id FROM (SELECT rowid AS id FROM course_search "
+                "WHERE course_search MATCH ? AND rowid > ? ORDER BY rowid LIMIT ?)"
+            )
+            params += [" ".join(f'"{token}"' for token in tokens), after, limit]
+        code = q.strip().upper()
+        if code:
+            condition, bounds = _prefix_range("code", code)
+            sources.append(
+                "SELECT id FROM (SELECT id FROM courses INDEXED BY courses_code "
+                f"WHERE {condition} AND id > ? ORDER BY id LIMIT ?)"
+            )
+            params += [*bounds, after, limit]
+        if not sources:
+            return []
+
+        return self._query(
+            f"SELECT * FROM courses WHERE id IN ({' UNION '.join(sources)}) ORDER BY id LIMIT ?",
+            (*params, limit)
+        )
+
+    def search_users(self, email_prefix: str = None, role: str = None,
+                     limit: int = 100, after: tuple = None) -> list:
+        from app.core.search import fold_email
+
+        conditions, params = [], []
+        if email_prefix:
+            condition, bounds = _prefix_range("lower(email)", fold_email(email_prefix))
+            conditions.append(condition)
+            params += bounds
+        if role is not None:
+            conditions.append("role = ?")
+            params.append(role)
+        if after is not None:
+            # Spelled out so the email bound seeks into the index
+            email = fold_email(after[0])
+            conditions.append("lower(email) >= ? AND (lower(email) > ? OR id > ?)")
+            params += [email, email, after[1]]
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._query(
+            f"SELECT * FROM users {where}ORDER BY lower(email), id LIMIT ?",
+            (*params, limit)
+        )
+
+    def course_added(self, course):
+        pass
+
+    def courses_added(self, rows):
+        pass
+
+    def course_updated(self, old, new):
+        pass
+
+    def course_removed(self, course):
+        pass
+
+    def user_added(self, user):
+        pass
+
+    def users_added(self, rows):
+        pass
+
+    def clear(self):
+        pass
+
+    def _query(self, sql: str, params: tuple) -> list:
+        with self._pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+
+def _prefix_range(column: str, prefix: str):
+    # `column` starts with `prefix`, as a range its index can seek. The
+    # upper bound is the smallest string above every such string: the
+    # prefix with its last character incremented, once trailing U+10FFFF
+    # (which has no successor) is dropped; there is none when nothing
+    # else is left. Text compares as UTF-8, in code point order, so the
+    # surrogates (never valid text) are skipped.
+    stem = prefix.rstrip(chr(0x10FFFF))
+    if not stem:
+        return f"{column} >= ?", [prefix]
+    end = ord(stem[-1]) + 1
+    if 0xD800 <= end <= 0xDFFF:
+        end = 0xE000
+    return f"{column} >= ? AND {column} < ?", [prefix, stem[:-1] + chr(end)]
+
+
+_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5(
+    title, content='courses', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 0");
+
+CREATE TRIGGER IF NOT EXISTS courses_indexed AFTER INSERT ON courses BEGIN
+    INSERT INTO course_search (rowid, title) VALUES (NEW.id, NEW.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS courses_unindexed AFTER DELETE ON courses BEGIN
+    INSERT INTO course_search (course_search, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS courses_reindexed AFTER UPDATE OF title ON courses BEGIN
+    INSERT INTO course_search (course_search, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+    INSERT INTO course_search (rowid, title) VALUES (NEW.id, NEW.title);
+END;
+
+CREATE INDEX IF NOT EXISTS users_email_search ON users (lower(email), id);
+CREATE INDEX IF NOT EXISTS users_role_email_search ON users (role, lower(email), id);
+"""
+
+
+# Idempotent responses (see app.core.idempotency) kept in the database,
+# so a retry is answered by whichever worker it reaches. Expiry is wall
+# clock time, the only clock every process agrees on; "used" orders the
+# entries for LRU eviction. A claim is one upsert, never a transaction,
+# and the entry count is kept by triggers, so eviction only runs once
+# the cap is passed: it purges expired entries (never served meanwhile)
+# and drops the least recently used ones, a small batch at a time.
+
+class SQLiteIdempotency:
+
+    def __init__(self, pool: ConnectionPool, max_entries: int = 10000, ttl: float = 3600.0,
+                 clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._pool = pool
+        self._clock = clock
+        self._batch = max(1, max_entries // 100)
+
+    def claim(self, key: bytes, fingerprint: bytes):
+        now = self._clock()
+        with self._pool.connection() as conn:
+            # Inserted, or replacing an expired entry: the caller owns it
+            owned = conn.execute(
+                "INSERT INTO idempotency (key, fingerprint, expires, used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET fingerprint = excluded.fingerprint, "
+                "expires = excluded.expires, used = excluded.used, "
+                "status = NULL, headers = NULL, body = NULL, route = NULL "
+                "WHERE idempotency.expires <= excluded.used",
+                (key, fingerprint, now + self.ttl, now)
+            ).rowcount
+            if owned:
+                self._evict(conn, now)
+                return None
+
+            row = conn.execute("SELECT * FROM idempotency WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                # Abandoned since the insert was refused
+                return self.claim(key, fingerprint)
+            conn.execute("UPDATE idempotency SET used = ? WHERE key = ?", (now, key))
+            return _stored_response(row)
+
+    def complete(self, key: bytes, status: int, headers: list, body: bytes, route: str = None):
+        headers = json.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers])
+        with self._pool.connection() as conn:
+            conn.execute(
+                "UPDATE idempotency SET status = ?, headers = ?, body = ?, route = ? "
+                "WHERE key = ? AND status IS NULL",
+                (status, headers, body, route, key)
+            )
+
+    def abandon(self, key: bytes):
+        with self._pool.connection() as conn:
+            conn.execute("DELETE FROM idempotency WHERE key = ? AND status IS NULL", (key,))
+
+    def __len__(self):
+        with self._pool.connection() as conn:
+            return self._size(conn)
+
+    def clear(self):
+        with self._pool.connection() as conn:
+            conn.execute("DELETE FROM idempotency")
+
+    def _evict(self, conn, now: float):
+        if self._size(conn) <= self.max_entries:
+            return
+        conn.execute("DELETE FROM idempotency WHERE expires <= ?", (now,))
+        # A batch below the cap, so this runs once every _batch claims
+        excess = self._size(conn) - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM idempotency WHERE key IN (SELECT key FROM idempotency ORDER BY used LIMIT ?)",
+                (excess + self._batch - 1,)
+            )
+
+    @staticmethod
+    def _size(conn) -> int:
+        return conn.execute("SELECT entries FROM idempotency_size").fetchone()["entries"]
+
+
+def _stored_response(row: dict):
+    # Imported here: app.core.idempotency builds its store from app.core.storage
+    from app.core.idempotency import StoredResponse
+
+    entry = StoredResponse(row["fingerprint"], row["expires"])
+    if row["status"] is not None:
+        entry.status = row["status"]
+        entry.headers = [
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(row["headers"])
+        ]
+        entry.body = row["body"]
+        entry.route = row["route"]
+    return entry
+
+
+_IDEMPOTENCY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key BLOB PRIMARY KEY, fingerprint BLOB NOT NULL, expires REAL NOT NULL, used REAL NOT NULL,
+    status INTEGER, headers TEXT, body BLOB, route TEXT);
+
+CREATE INDEX IF NOT EXISTS idempotency_expires ON idempotency (expires);
+CREATE INDEX IF NOT EXISTS idempotency_used ON idempotency (used);
+
+CREATE TABLE IF NOT EXISTS idempotency_size (
+    id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL);
+INSERT OR IGNORE INTO idempotency_size SELECT 0, COUNT(*) FROM idempotency;
+
+CREATE TRIGGER IF NOT EXISTS idempotency_counted AFTER INSERT ON idempotency BEGIN
+    UPDATE idempotency_size SET entries = entries + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS idempotency_uncounted AFTER DELETE ON idempotency BEGIN
+    UPDATE idempotency_size SET entries = entries - 1;
+END;
+"""
+
+
+class SQLiteBackend(StorageBackend):
+
+    def __init__(self, path: str, pool_size: int = 8):
+        self.pool = ConnectionPool(path, size=pool_size)
+        self._create_schema()
+        self.stats = SQLiteStats(self.pool)
+        self.search = SQLiteSearch(self.pool)
+        super().__init__(**{
+            name: SQLiteTable(self.pool, name, layout)
+            for name, layout in SCHEMA.items()
+        })
+
+    def course_locks(self):
+        return TransactionLocks(self.pool)
+
+    async def run(self, func, *args, **kwargs):
+        # SQLite calls block, so keep them off the event loop
+        return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        self.pool.close()
+
+    def _create_schema(self):
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sequences ("
+                "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            for name, layout in SCHEMA.items():
+                columns = ", ".join(
+                    f"{col} {declaration}" for col, declaration in layout["columns"].items()
+                )
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY, {columns})"
+                )
+                # Columns added to the schema after the table was created
+                existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({name})")}
+                for col, declaration in layout["columns"].items():
+                    if col not in existing:
+                        conn.execute(f"ALTER TABLE {name} ADD COLUMN {col} {declaration}")
+                for index, cols in layout["unique"].items():
+                    conn.execute(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_{index} "
+                        f"ON {name} ({', '.join(cols)})"
+                    )
+                for index, cols in layout["multi"].items():
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {name}_{index} "
+                        f"ON {name} ({', '.join(cols)})"
+                    )
+                conn.execute(
+                    "INSERT OR IGNORE INTO sequences (name, value) VALUES (?, 0)",
+                    (name,)
+                )
+
+            counted = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'enrollments_counted'"
+            ).fetchone()
+            for statement in _split_statements(_COUNTER_SCHEMA):
+                conn.execute(statement)
+            if not counted:
+                for statement in _split_statements(_COUNTER_BACKFILL):
+                    conn.execute(statement)
+
+            indexed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'courses_indexed'"
+            ).fetchone()
+            for statement in _split_statements(_SEARCH_SCHEMA):
+                conn.execute(statement)
+            if not indexed:
+                # Courses written before the search index existed
+                conn.execute("INSERT INTO course_search (course_search) VALUES ('rebuild')")
+
+            for statement in _split_statements(_IDEMPOTENCY_SCHEMA):
+                conn.execute(statement)
+
+
+def _split_statements(script: str):
+    # executescript() would commit the open transaction, so statements
+    # run one at a time; trigger bodies contain ';' and end with END;
+    statement = ""
+    for line in script.strip().splitlines():
+        statement += line + "\n"
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+
+
+def _dict_row(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
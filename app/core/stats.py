@@ -0,0 +1,120 @@
+import bisect
+import threading
+
+from app.core.storage import backend, enrollments, scan
+
+
+# Enrollment counters maintained on every write, so dashboards read
+# counts without scanning enrollments.
+#
+# Courses are also bucketed by their count: `_levels` is the sorted list
+# of counts that have at least one course, and `_buckets[n]` holds those
+# courses in the order they reached n. Counts only move by one, so a
+# course hops between adjacent buckets in O(1) (plus a bisect when a
+# level appears or empties), and the top k courses are read off the
+# highest levels in O(k).
+
+class EnrollmentStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._per_course = {}
+            self._per_user = {}
+            self._buckets = {}
+            self._levels = []
+            self.total = 0
+
+    def rebuild(self, rows):
+        self.clear()
+        for row in rows:
+            self.added(row["user_id"], row["course_id"])
+
+
+    # Reads
+
+    def course_count(self, course_id: int) -> int:
+        return self._per_course.get(course_id, 0)
+
+    def user_count(self, user_id: int) -> int:
+        return self._per_user.get(user_id, 0)
+
+    def top_courses(self, limit: int):
+        top = []
+        with self._lock:
+            for level in reversed(self._levels):
+                for course_id in self._buckets[level]:
+                    top.append((course_id, level))
+                    if len(top) == limit:
+                        return top
+        return top
+
+
+    # Writes
+
+    def added(self, user_id: int, course_id: int):
+        with self._lock:
+            self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+            self._move(course_id, +1)
+            self.total += 1
+
+    def removed(self, user_id: int, course_id: int):
+        with self._lock:
+            self._decrement_user(user_id)
+            self._move(course_id, -1)
+            self.total -= 1
+
+    def course_removed(self, course_id: int, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._decrement_user(user_id)
+                self.total -= 1
+            count = self._per_course.pop(course_id, 0)
+            if count:
+                self._leave_level(course_id, count)
+
+
+    # Private Methods
+
+    def _decrement_user(self, user_id: int):
+        count = self._per_user.get(user_id, 0) - 1
+        if count > 0:
+            self._per_user[user_id] = count
+        else:
+            self._per_user.pop(user_id, None)
+
+    def _move(self, course_id: int, delta: int):
+        old = self._per_course.get(course_id, 0)
+        new = max(old + delta, 0)
+        if old == new:
+            return
+
+        if old:
+            self._leave_level(course_id, old)
+        if new:
+            self._per_course[course_id] = new
+            bucket = self._buckets.get(new)
+            if bucket is None:
+                bucket = self._buckets[new] = {}
+                bisect.insort(self._levels, new)
+            bucket[course_id] = None
+        else:
+            del self._per_course[course_id]
+
+    def _leave_level(self, course_id: int, level: int):
+        bucket = self._buckets[level]
+        del bucket[course_id]
+        if not bucket:
+            del self._buckets[level]
+            del self._levels[bisect.bisect_left(self._levels, level)]
+
+
+# Backends shared between processes keep their own counters
+if backend.stats is not None:
+    enrollment_stats = backend.stats
+else:
+    enrollment_stats = EnrollmentStats()
+    enrollment_stats.rebuild(scan(enrollments))
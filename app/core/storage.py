@@ -1,4 +1,88 @@
-# In-memory storage for users, courses, and enrollments
-users = []
-courses = []
-enrollments = []
+import atexit
+import os
+from app.core.backend import DuplicateKeyError
+from app.core.config import settings
+from app.core.metrics import TimedTable
+
+
+# Storage for users, courses, and enrollments. The backend is chosen
+# by configuration (STORAGE_BACKEND=memory|sqlite); services only use
+# the table interface described in app.core.backend.
+
+def create_backend(name: str = None):
+    name = name or settings.storage_backend
+
+    if name == "memory":
+        from app.core.memory import MemoryBackend
+        if settings.catalog_snapshot:
+            _hold_catalog(settings.catalog_snapshot)
+        return MemoryBackend(
+            settings.wal_dir,
+            sync_interval=settings.wal_sync_interval,
+            snapshot_every=settings.snapshot_every,
+            catalog=settings.catalog_snapshot
+        )
+
+    if name == "sqlite":
+        from app.core.sqlite import SQLiteBackend
+        return SQLiteBackend(settings.sqlite_path, pool_size=settings.sqlite_pool_size)
+
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+# With a catalog snapshot, every write (and all enrollments) stays in
+# this process and is lost on exit, so a second worker would serve a
+# different state. The first process to open the snapshot holds a lock
+# on it until it exits; any other fails to start.
+
+_catalog_lock = None
+
+
+def _hold_catalog(path: str):
+    global _catalog_lock
+    import fcntl
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        raise RuntimeError(
+            f"CATALOG_SNAPSHOT {path} is already served by another process: catalog mode runs a single worker"
+        )
+    _catalog_lock = fd
+
+
+backend = create_backend()
+atexit.register(backend.close)
+
+# Every table operation is timed for /metrics (see app.core.metrics).
+users = TimedTable(backend.users, "users")
+courses = TimedTable(backend.courses, "courses")
+enrollments = TimedTable(backend.enrollments, "enrollments")
+waitlist = TimedTable(backend.waitlist, "waitlist")
+
+# Serializes enroll, deregister and delete for the same course, so a
+# course cannot be deleted between an enrollment's checks and its insert,
+# and seat counting stays exact. Courses hash to different stripes, so a
+# hot course never blocks enrollment into the others. Backends shared
+# between processes also hold a store-level transaction (see sqlite.py).
+course_locks = backend.course_locks()
+
+
+# Async access to storage: in-memory calls run inline on the event
+# loop, blocking backends are offloaded to a worker thread.
+async def run(func, *args, **kwargs):
+    return await backend.run(func, *args, **kwargs)
+
+
+# Streams every row of a table in id order, one page at a time, so
+# callers can walk millions of rows in constant memory.
+def scan(table, batch_size: int = 1000):
+    after = None
+    while True:
+        rows = table.page(after, batch_size)
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after = rows[-1]["id"]
@@ -0,0 +1,318 @@
+import gc
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import deque
+from contextlib import ExitStack
+
+
+# Write-ahead log and snapshots for the in-memory store.
+#
+# Every table write is journaled as a (table, op, arg) record; ops are
+# "i" insert rows (tuples of column values), "u" update (id, changes),
+# "d" delete id, "x" delete_by (index, key) and "c" clear. Records are
+# buffered in memory and a background thread writes and fsyncs them in
+# batches every `sync_interval` seconds, so a crash loses at most that
+# window of acknowledged writes (the same trade-off as SQLite's
+# synchronous=NORMAL).
+#
+# On disk, the log is a series of segments (wal.<n>.log) made of frames:
+# a 4-byte length, a CRC32 and a JSON-encoded batch of records. A
+# snapshot (snapshot.<n>.bin, same framing) holds every row and id
+# sequence as of the start of segment n. Recovery loads the newest
+# snapshot, then replays the segments from n on. A torn or corrupt frame
+# (a crash mid-write) is cut off, along with anything after it.
+#
+# Every file starts with _MAGIC, which names the format version. JSON
+# reads the same under any Python version; files in another format
+# (including the marshal frames of earlier releases) stop recovery with
+# WALFormatError rather than being misread.
+
+_MAGIC = b"enrollment-wal/2\n"
+_FRAME = struct.Struct("<II")
+_SEGMENT = re.compile(r"wal\.(\d+)\.log$")
+_SNAPSHOT = re.compile(r"snapshot\.(\d+)\.bin$")
+_SNAPSHOT_CHUNK = 50_000
+
+
+class TornFrame(Exception):
+
+    def __init__(self, offset: int):
+        super().__init__(f"Torn or corrupt frame at offset {offset}")
+        self.offset = offset
+
+
+class WALFormatError(Exception):
+
+    def __init__(self, path: str):
+        super().__init__(f"{path} is not in log format {_MAGIC.strip().decode()}; refusing to recover from it")
+        self.path = path
+
+
+class WriteAheadLog:
+
+    def __init__(self, directory: str, tables: dict, sync_interval: float = 0.01,
+                 snapshot_every: int = 1_000_000):
+        self.directory = directory
+        self.tables = tables
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+
+        # Writers append without locking; deque appends and pops are
+        # thread-safe, and only the flusher drains it.
+        self._pending = deque()
+        self._io_lock = threading.Lock()
+        self._since_snapshot = 0
+        self._snapshotter = None
+        self._closed = threading.Event()
+        self._file = None
+        self._segment = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def open(self):
+        # Recover existing state, then journal every table into a fresh
+        # segment and start the background flusher.
+        self._segment = self.recover() + 1
+        self._file = _open_segment(self._path("wal", self._segment))
+
+        for name, table in self.tables.items():
+            table.journal = self._journal_for(name)
+
+        self._flusher = threading.Thread(target=self._run, name="wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        if self._file is None or self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        for table in self.tables.values():
+            table.journal = None
+        self.flush()
+        self._file.close()
+
+
+    # Writing
+
+    def flush(self):
+        with self._io_lock:
+            batch = self._drain()
+            if batch:
+                _write_frame(self._file, batch)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._since_snapshot += len(batch)
+
+    def snapshot(self):
+        # Blocks writers only while the log is rotated and the row lists
+        # are copied; the file is written after the locks are released.
+        # Rows updated after the copy may already carry the new values,
+        # which is harmless: replaying the update sets them again.
+        with ExitStack() as stack:
+            for name in sorted(self.tables):
+                stack.enter_context(self.tables[name].lock.read())
+            with self._io_lock:
+                batch = self._drain()
+                if batch:
+                    _write_frame(self._file, batch)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._segment += 1
+                self._file = _open_segment(self._path("wal", self._segment))
+                self._since_snapshot = 0
+                segment = self._segment
+
+            sequences = {name: table.ids.last() for name, table in self.tables.items()}
+            rows = {name: list(table.rows.values()) for name, table in self.tables.items()}
+
+        path = self._path("snapshot", segment)
+        with open(path + ".tmp", "wb") as file:
+            file.write(_MAGIC)
+            _write_frame(file, sequences)
+            for name, table in self.tables.items():
+                values = table.row_values
+                table_rows = rows.pop(name)
+                for start in range(0, len(table_rows), _SNAPSHOT_CHUNK):
+                    chunk = table_rows[start:start + _SNAPSHOT_CHUNK]
+                    _write_frame(file, (name, [values(row) for row in chunk]))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+
+        # Everything before the new snapshot is now redundant
+        for kind, number in self._files():
+            if number < segment:
+                os.remove(self._path(kind, number))
+
+
+    # Recovery
+
+    def recover(self) -> int:
+        # Returns the number of the last segment on disk (0 if none).
+        # Recovery allocates millions of long-lived objects, which would
+        # set off repeated full GC passes, so the collector is paused.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._recover()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _recover(self) -> int:
+        files = self._files()
+        snapshots = [n for kind, n in files if kind == "snapshot"]
+        segments = sorted(n for kind, n in files if kind == "wal")
+        start = max(snapshots, default=0)
+
+        for table in self.tables.values():
+            table.clear()
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".tmp"):
+                # Snapshot interrupted before its rename
+                os.remove(os.path.join(self.directory, filename))
+        if start:
+            self._load_snapshot(self._path("snapshot", start))
+
+        highest = {}
+        for number in segments:
+            if number >= start:
+                self._replay(self._path("wal", number), highest)
+
+        for name, last in highest.items():
+            self.tables[name].ids.advance(last)
+        return max(segments + [start], default=0)
+
+    def _load_snapshot(self, path: str):
+        frames = _read_frames(path)
+        sequences = next(frames)
+        for name, values in frames:
+            make = self.tables[name].entity
+            self.tables[name].restore([make(*row) for row in values])
+        for name, last in sequences.items():
+            self.tables[name].ids.advance(last)
+
+    def _replay(self, path: str, highest: dict):
+        try:
+            for batch in _read_frames(path):
+                self._apply(batch, highest)
+        except TornFrame as torn:
+            os.truncate(path, torn.offset)
+
+    def _apply(self, batch: list, highest: dict):
+        # Consecutive inserts into the same table are restored together
+        inserts, inserts_into = [], None
+        for name, op, arg in batch:
+            if op == "i" and name == inserts_into:
+                inserts.extend(arg)
+                continue
+            if inserts:
+                self._restore(inserts_into, inserts, highest)
+            inserts, inserts_into = [], None
+
+            table = self.tables[name]
+            if op == "i":
+                inserts, inserts_into = list(arg), name
+            elif op == "u":
+                table.update(arg[0], **arg[1])
+            elif op == "d":
+                table.delete(arg)
+            elif op == "x":
+                # JSON has no tuples; composite index keys come back as lists
+                index, key = arg
+                table.delete_by(index, tuple(key) if isinstance(key, list) else key)
+            elif op == "c":
+                table.clear()
+                highest.pop(name, None)
+        if inserts:
+            self._restore(inserts_into, inserts, highest)
+
+    def _restore(self, name: str, values: list, highest: dict):
+        table = self.tables[name]
+        make = table.entity
+        table.restore([make(*row) for row in values])
+        highest[name] = max(highest.get(name, 0), max(row[0] for row in values))
+
+
+    # Private Methods
+
+    def _journal_for(self, name: str):
+        append = self._pending.append
+
+        def journal(op: str, arg):
+            append((name, op, arg))
+
+        return journal
+
+    def _drain(self) -> list:
+        popleft = self._pending.popleft
+        return [popleft() for _ in range(len(self._pending))]
+
+    def _run(self):
+        while not self._closed.wait(self.sync_interval):
+            self.flush()
+            busy = self._snapshotter is not None and self._snapshotter.is_alive()
+            if self._since_snapshot >= self.snapshot_every and not busy:
+                self._snapshotter = threading.Thread(
+                    target=self.snapshot, name="wal-snapshot", daemon=True
+                )
+                self._snapshotter.start()
+
+    def _files(self):
+        found = []
+        for filename in os.listdir(self.directory):
+            for kind, pattern in (("wal", _SEGMENT), ("snapshot", _SNAPSHOT)):
+                match = pattern.match(filename)
+                if match:
+                    found.append((kind, int(match.group(1))))
+        return found
+
+    def _path(self, kind: str, number: int) -> str:
+        suffix = "log" if kind == "wal" else "bin"
+        return os.path.join(self.directory, f"{kind}.{number:08d}.{suffix}")
+
+
+def _open_segment(path: str):
+    file = open(path, "ab")
+    if file.tell() == 0:
+        file.write(_MAGIC)
+    return file
+
+
+def _write_frame(file, payload):
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    file.write(_FRAME.pack(len(data), zlib.crc32(data)))
+    file.write(data)
+
+
+def _read_frames(path: str):
+    # Raises TornFrame at a truncated or corrupt frame, and WALFormatError
+    # when the file is not in this format
+    with open(path, "rb") as file:
+        magic = file.read(len(_MAGIC))
+        if magic != _MAGIC:
+            if _MAGIC.startswith(magic):
+                # Empty, or cut off while its header was written
+                if magic:
+                    raise TornFrame(0)
+                return
+            raise WALFormatError(path)
+        while True:
+            offset = file.tell()
+            header = file.read(_FRAME.size)
+            if not header:
+                return
+            if len(header) == _FRAME.size:
+                length, checksum = _FRAME.unpack(header)
+                data = file.read(length)
+                if len(data) == length and zlib.crc32(data) == checksum:
+                    yield json.loads(data)
+                    continue
+            raise TornFrame(offset)
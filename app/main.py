@@ -1,16 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.v1 import enrollments, users, courses
+from app.api.v1 import enrollments, users, courses, stats, metrics, admission, idempotency, auth
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    auth.bootstrap_admin()
+    yield
+
 
 app = FastAPI(
     title="Course Enrollment Management API",
     description="A simple API for managing course enrollments with role-based access control.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Outermost last: metrics also see requests that admission turns away,
+# and idempotent retries are replayed before they are rate limited
+app.add_middleware(admission.AdmissionMiddleware, routers=[
+    (enrollments.router, enrollments.admission),
+    (users.router, users.admission),
+    (courses.router, courses.admission),
+    (stats.router, stats.admission),
+])
+app.add_middleware(idempotency.IdempotencyMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(enrollments.router)
 app.include_router(users.router)
 app.include_router(courses.router)
+app.include_router(stats.router)
+app.include_router(metrics.router)
+app.include_router(auth.router)
 
 @app.get("/", status_code=200, tags=["Health"])
 async def health_check():
-    return {"status": "API is running"}
\ No newline at end of file
+    return {"status": "API is running"}
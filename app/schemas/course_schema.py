@@ -1,23 +1,25 @@
 
 from pydantic import BaseModel, Field
-from app.schemas.common import UserRole
 
 
 class CourseCreate(BaseModel):
     title: str = Field(..., min_length=1)
     code: str = Field(..., min_length=1)
-    role: UserRole
-    
+    capacity: int | None = Field(None, ge=1)
+
 
 class CourseUpdate(BaseModel):
     title: str | None = None
     code: str | None = None
-    role: UserRole
+    capacity: int | None = Field(None, ge=1)
+
+class CourseImport(BaseModel):
+    title: str = Field(..., min_length=1)
+    code: str = Field(..., min_length=1)
+    capacity: int | None = Field(None, ge=1)
 
 class CourseResponse(BaseModel):
     id: int
     title: str
     code: str
-
-class RoleRequest(BaseModel):
-    role: UserRole
+    capacity: int | None = None
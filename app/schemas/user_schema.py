@@ -1,6 +1,34 @@
-from pydantic import BaseModel, EmailStr, Field
+import re
+from functools import lru_cache
+from typing import Annotated
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+from pydantic.networks import validate_email
 from app.schemas.common import UserRole
 
+# Plain ASCII dot-atom local part, which EmailStr always accepts as-is
+_SIMPLE_LOCAL_PART = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+)
+
+
+@lru_cache(maxsize=4096)
+def _normalized_domain(domain: str) -> str:
+    return validate_email(f"a@{domain}")[1].partition("@")[2]
+
+
+def _validate_import_email(value: str) -> str:
+    # Same result as EmailStr, but each distinct domain is validated
+    # once per batch instead of once per row. Anything other than a
+    # plain local part falls back to full validation.
+    local, _, domain = value.rpartition("@")
+    if len(local) <= 64 and len(value) <= 254 and _SIMPLE_LOCAL_PART.fullmatch(local):
+        return f"{local}@{_normalized_domain(domain)}"
+    return validate_email(value)[1]
+
+
+ImportEmail = Annotated[str, AfterValidator(_validate_import_email)]
+
+
 class UserCreate(BaseModel):
     name: str = Field(..., min_length=1)
     email: EmailStr
@@ -10,4 +38,25 @@ class UserResponse(BaseModel):
     id: int
     name: str
     email: EmailStr
-    role: UserRole
\ No newline at end of file
+    role: UserRole
+
+
+class UserCreated(UserResponse):
+    access_token: str
+
+
+class TokenRequest(BaseModel):
+    user_id: int
+    ttl: int | None = Field(None, gt=0)
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str
+    expires_in: int
+
+
+class UserImport(BaseModel):
+    name: str = Field(..., min_length=1)
+    email: ImportEmail
+    role: UserRole
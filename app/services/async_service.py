@@ -0,0 +1,25 @@
+import functools
+from app.core import storage
+
+
+# Builds the async variant of a service class: every public static
+# method becomes a coroutine that runs through storage.run, so the
+# storage layer decides whether a call runs inline or off the loop.
+
+def async_variant(service):
+    namespace = {}
+
+    for name, member in vars(service).items():
+        if name.startswith("_") or not isinstance(member, staticmethod):
+            continue
+        namespace[name] = staticmethod(_make_async(member.__func__))
+
+    return type(f"Async{service.__name__}", (), namespace)
+
+
+def _make_async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await storage.run(func, *args, **kwargs)
+
+    return wrapper
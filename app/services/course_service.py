@@ -1,34 +1,107 @@
 from fastapi import HTTPException
-from app.core.storage import courses, enrollments
-
-
+from app.core.cache import catalog_cache
+from app.core.stats import enrollment_stats
+from app.core.metrics import instrument_service
+from app.core.search import search_index
+from app.services.async_service import async_variant
+from app.services.enrollment_service import EnrollmentService
+from app.core.storage import (
+    courses,
+    enrollments,
+    waitlist,
+    course_locks,
+    DuplicateKeyError
+)
+
+
+@instrument_service
 class CourseService:
 
 
     # Create Course
 
     @staticmethod
-    def create_course(title: str, code: str, role: str):
+    def create_course(title: str, code: str, role: str, capacity: int = None):
         CourseService._ensure_admin(role)
         CourseService._validate_title(title)
         CourseService._validate_code(code)
-        CourseService._prevent_duplicate_code(code)
 
+        # Course codes are normalized (stripped, upper-cased) once on write,
+        # so the unique index never has to re-normalize stored rows.
         course = {
-            "id": len(courses) + 1,
+            "id": courses.ids.next(),
             "title": title.strip(),
-            "code": code.strip().upper()
+            "code": code.strip().upper(),
+            "capacity": capacity
         }
 
-        courses.append(course)
+        try:
+            courses.insert(course)
+        except DuplicateKeyError:
+            CourseService._raise_duplicate_code()
+
+        search_index.course_added(course)
+        catalog_cache.invalidate("courses:list")
         return course
 
 
+    # Bulk Import Courses
+
+    @staticmethod
+    def import_courses(rows: list, role: str):
+        # Validates and deduplicates the whole batch (within itself and
+        # against the store) before committing it in one step.
+        CourseService._ensure_admin(role)
+
+        codes = [row["code"].strip().upper() for row in rows]
+        existing = courses.lookup_many("code", set(codes))
+        errors, seen = [], set()
+        for position, (row, code) in enumerate(zip(rows, codes)):
+            if not row["title"].strip():
+                errors.append({"row": position, "detail": "Course title must not be empty"})
+            elif not code:
+                errors.append({"row": position, "detail": "Course code must not be empty"})
+            elif code in seen or code in existing:
+                errors.append({"row": position, "detail": "Course code must be unique"})
+            seen.add(code)
+
+        if errors:
+            raise HTTPException(status_code=400, detail=errors)
+
+        new_courses = [
+            {
+                "id": course_id,
+                "title": row["title"].strip(),
+                "code": code,
+                "capacity": row["capacity"]
+            }
+            for course_id, row, code in zip(courses.ids.reserve(len(rows)), rows, codes)
+        ]
+
+        try:
+            courses.insert_all(new_courses)
+        except DuplicateKeyError:
+            CourseService._raise_duplicate_code()
+
+        search_index.courses_added(new_courses)
+        catalog_cache.invalidate("courses:list")
+        return {
+            "created": len(new_courses),
+            "first_id": new_courses[0]["id"],
+            "last_id": new_courses[-1]["id"]
+        }
+
+
     # Get All Courses
 
     @staticmethod
-    def get_all_courses():
-        return courses
+    def get_all_courses(limit: int = None, after: int = None, q: str = None):
+        # `q` matches every title word, or a prefix of the course code
+        if q:
+            return search_index.search_courses(q, limit or len(courses), after)
+        if limit is None:
+            return courses.all()
+        return courses.page(after, limit)
 
     
     # Get Course by ID
@@ -43,29 +116,60 @@ class CourseService:
         CourseService._ensure_admin(role)
         CourseService._find_course(course_id)
 
-        return [
-            e for e in enrollments
-            if e["course_id"] == course_id
-        ]
+        return enrollments.find("course_id", course_id)
+
+    @staticmethod
+    def get_course_waitlist(course_id: int, role: str):
+        CourseService._ensure_admin(role)
+        CourseService._find_course(course_id)
+
+        return waitlist.find("course_id", course_id)
 
     
     # Update Course
 
     @staticmethod
-    def update_course(course_id: int, title: str, code: str, role: str):
+    def update_course(
+        course_id: int,
+        title: str,
+        code: str,
+        role: str,
+        capacity: int = None
+    ):
         CourseService._ensure_admin(role)
 
-        course = CourseService._find_course(course_id)
+        changes = {}
 
         if title:
             CourseService._validate_title(title)
-            course["title"] = title.strip()
+            changes["title"] = title.strip()
 
         if code:
             CourseService._validate_code(code)
-            CourseService._prevent_duplicate_code(code, exclude_id=course_id)
-            course["code"] = code.strip().upper()
+            changes["code"] = code.strip().upper()
+
+        if capacity is not None:
+            changes["capacity"] = capacity
+
+        # Looked up under the lock, so a concurrent delete yields 404
+        with course_locks(course_id):
+            course = CourseService._find_course(course_id)
+            # Rows may be updated in place; keep what the search index holds
+            previous = {"id": course["id"], "title": course["title"], "code": course["code"]}
+
+            try:
+                course = courses.update(course["id"], **changes)
+            except DuplicateKeyError:
+                CourseService._raise_duplicate_code()
+
+            # A larger capacity frees seats for the waitlist
+            EnrollmentService._promote_waitlist(course_id)
+
+            # Under the lock too, so concurrent renames reach the index
+            # in the order they reached the store
+            search_index.course_updated(previous, course)
 
+        CourseService._invalidate_catalog(course_id)
         return course
 
 
@@ -75,21 +179,29 @@ class CourseService:
     def delete_course(course_id: int, role: str):
         CourseService._ensure_admin(role)
 
-        course = CourseService._find_course(course_id)
-        global enrollments
-        # Remove related enrollments
-        enrollments[:] = [
-            e for e in enrollments
-            if e["course_id"] != course_id
-        ]
+        with course_locks(course_id):
+            course = CourseService._find_course(course_id)
+
+            # Remove related enrollments and waitlist entries
+            removed = enrollments.delete_by("course_id", course_id)
+            enrollment_stats.course_removed(course_id, [e["user_id"] for e in removed])
+            waitlist.delete_by("course_id", course_id)
+
+            courses.delete(course["id"])
 
-        courses.remove(course)
+        search_index.course_removed(course)
+        CourseService._invalidate_catalog(course_id)
 
         return {"message": "Course deleted successfully"}
 
 
     # Private Methods
 
+    @staticmethod
+    def _invalidate_catalog(course_id: int):
+        catalog_cache.invalidate("courses:item", course_id)
+        catalog_cache.invalidate("courses:list")
+
     @staticmethod
     def _ensure_admin(role: str):
         if role != "admin":
@@ -115,24 +227,21 @@ class CourseService:
             )
 
     @staticmethod
-    def _prevent_duplicate_code(code: str, exclude_id: int = None):
-        code = code.strip().upper()
-
-        for course in courses:
-            if course["code"] == code:
-                if exclude_id and course["id"] == exclude_id:
-                    continue
-                raise HTTPException(
-                    status_code=400,
-                    detail="Course code must be unique"
-                )
+    def _raise_duplicate_code():
+        raise HTTPException(
+            status_code=400,
+            detail="Course code must be unique"
+        )
 
     @staticmethod
     def _find_course(course_id: int):
-        course = next((c for c in courses if c["id"] == course_id), None)
+        course = courses.get(course_id)
         if not course:
             raise HTTPException(
                 status_code=404,
                 detail="Course not found"
             )
         return course
+
+
+AsyncCourseService = async_variant(CourseService)
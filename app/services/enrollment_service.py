@@ -1,70 +1,233 @@
 from fastapi import HTTPException
-from app.core.storage import users, courses, enrollments
+from app.core.stats import enrollment_stats
+from app.core.metrics import instrument_service
+from app.services.async_service import async_variant
+from app.core.storage import (
+    users,
+    courses,
+    enrollments,
+    waitlist,
+    course_locks,
+    scan,
+    DuplicateKeyError
+)
 
 
+@instrument_service
 class EnrollmentService:
 
     @staticmethod
     def enroll(user_id: int, course_id: int, role: str):
         EnrollmentService._ensure_student_role(role)
-        user = EnrollmentService._get_user(user_id)
-        course = EnrollmentService._get_course(course_id)
-        EnrollmentService._prevent_duplicate(user_id, course_id)
+        EnrollmentService._get_user(user_id)
 
-        enrollment = {
-            "id": len(enrollments) + 1,
-            "user_id": user_id,
-            "course_id": course_id
-        }
+        with course_locks(course_id):
+            course = EnrollmentService._get_course(course_id)
 
-        enrollments.append(enrollment)
+            if enrollments.lookup("user_course", (user_id, course_id)):
+                EnrollmentService._raise_already_enrolled()
+            if EnrollmentService._seats_left(course) == 0:
+                return EnrollmentService._join_waitlist(user_id, course_id)
+
+            enrollment = {
+                "id": enrollments.ids.next(),
+                "user_id": user_id,
+                "course_id": course_id
+            }
+
+            try:
+                enrollments.insert(enrollment)
+            except DuplicateKeyError:
+                EnrollmentService._raise_already_enrolled()
+            enrollment_stats.added(user_id, course_id)
         return enrollment
 
+    @staticmethod
+    def bulk_enroll(pairs: list, role: str):
+        # Registrar cohort enrollment: each (user_id, course_id) pair is
+        # validated against the indexes in one pass, then all valid rows
+        # are inserted in a single batch. Failures are reported per item.
+        EnrollmentService._ensure_admin_role(role)
+
+        results = [None] * len(pairs)
+        user_exists, seats_left = {}, {}
+        seen, pending = set(), []
+
+        with course_locks.many(course_id for _, course_id in pairs):
+            for position, (user_id, course_id) in enumerate(pairs):
+                if user_id not in user_exists:
+                    user_exists[user_id] = users.get(user_id) is not None
+                if course_id not in seats_left:
+                    course = courses.get(course_id)
+                    seats_left[course_id] = (
+                        EnrollmentService._seats_left(course) if course else -1
+                    )
+
+                if not user_exists[user_id]:
+                    results[position] = (404, "User not found")
+                elif seats_left[course_id] == -1:
+                    results[position] = (404, "Course not found")
+                elif (user_id, course_id) in seen:
+                    results[position] = (400, "Duplicate item in batch")
+                elif enrollments.lookup("user_course", (user_id, course_id)):
+                    results[position] = (400, "Student already enrolled in this course")
+                elif seats_left[course_id] == 0:
+                    results[position] = (409, "Course is full")
+                else:
+                    seen.add((user_id, course_id))
+                    pending.append(position)
+                    if seats_left[course_id] is not None:
+                        seats_left[course_id] -= 1
+
+            rows = [
+                {"id": row_id, "user_id": pairs[p][0], "course_id": pairs[p][1]}
+                for row_id, p in zip(enrollments.ids.reserve(len(pending)), pending)
+            ]
+            for position, row, error in zip(pending, rows, enrollments.insert_many(rows)):
+                if error:
+                    results[position] = (400, "Student already enrolled in this course")
+                else:
+                    results[position] = row
+                    enrollment_stats.added(row["user_id"], row["course_id"])
+
+        return EnrollmentService._bulk_report(pairs, results)
+
     @staticmethod
     def deregister(user_id: int, course_id: int, role: str):
         EnrollmentService._ensure_student_role(role)
 
-        enrollment = EnrollmentService._find_enrollment(user_id, course_id)
+        with course_locks(course_id):
+            if EnrollmentService._leave_waitlist(user_id, course_id):
+                return {"message": "Removed from waitlist"}
+
+            enrollment = EnrollmentService._find_enrollment(user_id, course_id)
+            enrollments.delete(enrollment["id"])
+            enrollment_stats.removed(user_id, course_id)
+            EnrollmentService._promote_waitlist(course_id)
 
-        enrollments.remove(enrollment)
         return {"message": "Deregistered successfully"}
 
     @staticmethod
     def get_student_enrollments(user_id: int):
         EnrollmentService._get_user(user_id)
-        
-        return [
-            e for e in enrollments
-            if e["user_id"] == user_id
-        ]
+
+        return enrollments.find("user_id", user_id)
 
     @staticmethod
-    def get_all_enrollments(role: str):
+    def get_all_enrollments(role: str, limit: int = None, after: int = None):
         EnrollmentService._ensure_admin_role(role)
-        return enrollments
+
+        if limit is None:
+            return enrollments.all()
+        return enrollments.page(after, limit)
 
     @staticmethod
     def get_course_enrollments(course_id: int, role: str):
         EnrollmentService._ensure_admin_role(role)
         EnrollmentService._get_course(course_id)
 
-        return [
-            e for e in enrollments
-            if e["course_id"] == course_id
-        ]
+        return enrollments.find("course_id", course_id)
+
+    @staticmethod
+    def export_enrollments(role: str, course_id: int = None, user_id: int = None):
+        EnrollmentService._ensure_admin_role(role)
+
+        if course_id is not None and user_id is not None:
+            enrollment = enrollments.lookup("user_course", (user_id, course_id))
+            return iter([enrollment] if enrollment else [])
+        if course_id is not None:
+            return iter(enrollments.find("course_id", course_id))
+        if user_id is not None:
+            return iter(enrollments.find("user_id", user_id))
+        return scan(enrollments)
 
     @staticmethod
     def force_deregister(user_id: int, course_id: int, role: str):
         EnrollmentService._ensure_admin_role(role)
 
-        enrollment = EnrollmentService._find_enrollment(user_id, course_id)
-        enrollments.remove(enrollment)
+        with course_locks(course_id):
+            if EnrollmentService._leave_waitlist(user_id, course_id):
+                return {"message": "Student removed from waitlist"}
+
+            enrollment = EnrollmentService._find_enrollment(user_id, course_id)
+            enrollments.delete(enrollment["id"])
+            enrollment_stats.removed(user_id, course_id)
+            EnrollmentService._promote_waitlist(course_id)
 
         return {"message": "Student forcefully deregistered"}
 
     
+    # Capacity & Waitlist
+    # Callers hold the course's stripe lock, so the seat count cannot
+    # change between the check and the insert or promotion.
+
+    @staticmethod
+    def _seats_left(course: dict):
+        if course.get("capacity") is None:
+            return None
+        return max(course["capacity"] - enrollments.count("course_id", course["id"]), 0)
+
+    @staticmethod
+    def _join_waitlist(user_id: int, course_id: int):
+        entry = {
+            "id": waitlist.ids.next(),
+            "user_id": user_id,
+            "course_id": course_id
+        }
+
+        try:
+            waitlist.insert(entry)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=400,
+                detail="Student already on the waitlist for this course"
+            )
+        return {
+            "message": "Course is full; added to waitlist",
+            "position": waitlist.count("course_id", course_id)
+        }
+
+    @staticmethod
+    def _leave_waitlist(user_id: int, course_id: int):
+        entry = waitlist.lookup("user_course", (user_id, course_id))
+        if entry is None:
+            return False
+        waitlist.delete(entry["id"])
+        return True
+
+    @staticmethod
+    def _promote_waitlist(course_id: int):
+        course = courses.get(course_id)
+
+        while course and EnrollmentService._seats_left(course) != 0:
+            entry = waitlist.first("course_id", course_id)
+            if entry is None:
+                return
+            waitlist.delete(entry["id"])
+            enrollments.insert({
+                "id": enrollments.ids.next(),
+                "user_id": entry["user_id"],
+                "course_id": course_id
+            })
+            enrollment_stats.added(entry["user_id"], course_id)
+
+
     # Private Validation Methods
 
+    @staticmethod
+    def _bulk_report(pairs: list, results: list):
+        items = []
+        for (user_id, course_id), result in zip(pairs, results):
+            item = {"user_id": user_id, "course_id": course_id}
+            if isinstance(result, tuple):
+                item["status"], item["detail"] = result
+            else:
+                item["status"], item["enrollment"] = 201, result
+            items.append(item)
+
+        created = sum(1 for item in items if item["status"] == 201)
+        return {"created": created, "failed": len(items) - created, "results": items}
+
     @staticmethod
     def _ensure_student_role(role: str):
         if role != "student":
@@ -77,40 +240,34 @@ class EnrollmentService:
 
     @staticmethod
     def _get_user(user_id: int):
-        user = next((u for u in users if u["id"] == user_id), None)
+        user = users.get(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
 
     @staticmethod
     def _get_course(course_id: int):
-        course = next((c for c in courses if c["id"] == course_id), None)
+        course = courses.get(course_id)
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         return course
 
     @staticmethod
-    def _prevent_duplicate(user_id: int, course_id: int):
-        exists = any(
-            e for e in enrollments
-            if e["user_id"] == user_id and e["course_id"] == course_id
+    def _raise_already_enrolled():
+        raise HTTPException(
+            status_code=400,
+            detail="Student already enrolled in this course"
         )
-        if exists:
-            raise HTTPException(
-                status_code=400,
-                detail="Student already enrolled in this course"
-            )
 
     @staticmethod
     def _find_enrollment(user_id: int, course_id: int):
-        enrollment = next(
-            (e for e in enrollments
-             if e["user_id"] == user_id and e["course_id"] == course_id),
-            None
-        )
+        enrollment = enrollments.lookup("user_course", (user_id, course_id))
         if not enrollment:
             raise HTTPException(
                 status_code=404,
                 detail="Enrollment not found"
             )
         return enrollment
+
+
+AsyncEnrollmentService = async_variant(EnrollmentService)
@@ -0,0 +1,60 @@
+from fastapi import HTTPException
+from app.core.stats import enrollment_stats
+from app.core.metrics import instrument_service
+from app.services.async_service import async_variant
+from app.core.storage import users, courses
+
+
+@instrument_service
+class StatsService:
+
+    @staticmethod
+    def get_course_stats(course_id: int, role: str):
+        StatsService._ensure_admin(role)
+        if courses.get(course_id) is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+
+        return {
+            "course_id": course_id,
+            "enrollments": enrollment_stats.course_count(course_id)
+        }
+
+    @staticmethod
+    def get_user_stats(user_id: int, role: str):
+        StatsService._ensure_admin(role)
+        if users.get(user_id) is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return {
+            "user_id": user_id,
+            "courses": enrollment_stats.user_count(user_id)
+        }
+
+    @staticmethod
+    def get_top_courses(limit: int, role: str):
+        StatsService._ensure_admin(role)
+
+        return [
+            {"course_id": course_id, "enrollments": count}
+            for course_id, count in enrollment_stats.top_courses(limit)
+        ]
+
+    @staticmethod
+    def get_summary(role: str):
+        StatsService._ensure_admin(role)
+
+        return {
+            "enrollments": enrollment_stats.total,
+            "top_courses": StatsService.get_top_courses(10, role)
+        }
+
+
+    # Private Methods
+
+    @staticmethod
+    def _ensure_admin(role: str):
+        if role != "admin":
+            raise HTTPException(status_code=403, detail="Only admins allowed")
+
+
+AsyncStatsService = async_variant(StatsService)
@@ -1,33 +1,109 @@
 from fastapi import HTTPException
-from app.core.storage import users
+from app.core.auth import issue_token, principal_cache
+from app.core.config import settings
+from app.core.metrics import instrument_service
+from app.core.search import search_index
+from app.services.async_service import async_variant
+from app.core.storage import users, scan, DuplicateKeyError
+from app.schemas.common import UserRole
 from app.services.enrollment_service import EnrollmentService
 
 
+@instrument_service
 class UserService:
 
     @staticmethod
-    def create_user(name: str, email: str, role: str):
+    def create_user(name: str, email: str, role: str, caller_role: str = None):
         UserService._validate_name(name)
         UserService._validate_role(role)
-        UserService._prevent_duplicate_email(email)
+        # Anyone may sign up as a student; only admins create admins
+        if role == "admin" and caller_role != "admin":
+            raise HTTPException(
+                status_code=403,
+                detail="Only admins can create admin accounts"
+            )
 
         user = {
-            "id": len(users) + 1,
+            "id": users.ids.next(),
             "name": name.strip(),
             "email": email,
-            "role": role
+            "role": UserRole(role).value
         }
 
-        users.append(user)
+        try:
+            users.insert(user)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=400,
+                detail="Email already exists"
+            )
+
+        # Ids are reissued after a reset: drop principals of a previous
+        # user with this id
+        principal_cache.invalidate_user(user["id"])
+        search_index.user_added(user)
         return user
 
     @staticmethod
-    def get_all_users():
-        return users
+    def import_users(rows: list, role: str):
+        # Validates and deduplicates the whole batch (within itself and
+        # against the store) before committing it in one step.
+        UserService._ensure_admin(role)
+
+        existing = users.lookup_many("email", {row["email"] for row in rows})
+        errors, seen = [], set()
+        for position, row in enumerate(rows):
+            if not row["name"].strip():
+                errors.append({"row": position, "detail": "Name must not be empty"})
+            elif row["email"] in seen or row["email"] in existing:
+                errors.append({"row": position, "detail": "Email already exists"})
+            seen.add(row["email"])
+
+        if errors:
+            raise HTTPException(status_code=400, detail=errors)
+
+        new_users = [
+            {
+                "id": user_id,
+                "name": row["name"].strip(),
+                "email": row["email"],
+                "role": UserRole(row["role"]).value
+            }
+            for user_id, row in zip(users.ids.reserve(len(rows)), rows)
+        ]
+
+        try:
+            users.insert_all(new_users)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=400,
+                detail="Email already exists"
+            )
+
+        principal_cache.invalidate_users(user["id"] for user in new_users)
+        search_index.users_added(new_users)
+        return {
+            "created": len(new_users),
+            "first_id": new_users[0]["id"],
+            "last_id": new_users[-1]["id"]
+        }
+
+    @staticmethod
+    def get_all_users(limit: int = None, after: int = None, email_prefix: str = None, role: str = None):
+        if email_prefix or role:
+            return UserService._search_users(limit or len(users), after, email_prefix, role)
+        if limit is None:
+            return users.all()
+        return users.page(after, limit)
+
+    @staticmethod
+    def export_users(role: str):
+        UserService._ensure_admin(role)
+        return scan(users)
 
     @staticmethod
     def get_user_by_id(user_id: int):
-        user = next((u for u in users if u["id"] == user_id), None)
+        user = users.get(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
@@ -36,9 +112,47 @@ class UserService:
     def get_user_enrollments(user_id: int):
         return EnrollmentService.get_student_enrollments(user_id)
 
+
+    # Tokens
+
+    @staticmethod
+    def create_token(user_id: int, role: str, ttl: int = None):
+        UserService._ensure_admin(role)
+        user = UserService.get_user_by_id(user_id)
+        return UserService.token_for(user, ttl)
+
+    @staticmethod
+    def token_for(user, ttl: int = None):
+        ttl = ttl or settings.auth_token_ttl
+        return {
+            "access_token": issue_token(user["id"], user["role"], ttl),
+            "token_type": "bearer",
+            "expires_in": ttl
+        }
+
     
+    # Private Methods
+
+    @staticmethod
+    def _search_users(limit: int, after: int, email_prefix: str, role: str):
+        # Filtered results are ordered by email; the cursor's user id
+        # marks the position to continue from
+        position = None
+        if after is not None:
+            last = users.get(after)
+            if last is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            position = (last["email"], last["id"])
+        return search_index.search_users(email_prefix, role, limit, position)
+
+
     # Private Validation Methods
 
+    @staticmethod
+    def _ensure_admin(role: str):
+        if role != "admin":
+            raise HTTPException(status_code=403, detail="Only admins allowed")
+
     @staticmethod
     def _validate_name(name: str):
         if not name or not name.strip():
@@ -55,11 +169,5 @@ class UserService:
                 detail="Role must be either 'student' or 'admin'"
             )
 
-    @staticmethod
-    def _prevent_duplicate_email(email: str):
-        exists = any(u for u in users if u["email"] == email)
-        if exists:
-            raise HTTPException(
-                status_code=400,
-                detail="Email already exists"
-            )
+
+AsyncUserService = async_variant(UserService)
@@ -0,0 +1,146 @@
+"""
+Benchmark: read latency during an enrollment storm.
+
+Drives the ASGI app the way a server does, one task per request, with
+open-loop arrivals: POST /enrollments at WRITE_RATE per second (every
+student enrolling in three courses in a row, each with its own token)
+and GET /courses at 100 per second, for SECONDS. Latency is measured
+from each request's scheduled arrival, so a growing backlog shows up.
+Runs three configurations:
+
+  off          no rate limit, no admission queue
+  rate limit   enrollments limited per user (2/s, burst 2)
+  admission    plus an admission queue (CONCURRENCY slots, queue of
+               QUEUE, 1s timeout): reads ahead of writes, excess shed
+
+Usage:
+    python -m benchmarks.bench_admission [WRITE_RATE] [SECONDS] [CONCURRENCY] [QUEUE]
+"""
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+
+from app.api.v1 import admission
+from app.api.v1 import enrollments as enrollment_routes
+from app.core.admission import AdmissionQueue, RateLimiter
+from app.core.auth import issue_token, principal_cache
+from app.core.cache import catalog_cache
+from app.core.storage import courses, enrollments, users, waitlist
+from app.main import app
+
+READ_RATE = 100
+
+
+def seed(students: int):
+    for table in (users, courses, enrollments, waitlist):
+        table.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+    users.insert_all([
+        {"id": i, "name": f"Student {i}", "email": f"s{i}@example.com", "role": "student"}
+        for i in users.ids.reserve(students)
+    ])
+    courses.insert_all([
+        {"id": i, "title": f"Course {i}", "code": f"C{i}", "capacity": None}
+        for i in courses.ids.reserve(100)
+    ])
+    return {
+        user_id: f"Bearer {issue_token(user_id, 'student')}".encode()
+        for user_id in range(1, students + 1)
+    }
+
+
+async def call(method: str, path: str, query: bytes = b"", body: bytes = b"", token: bytes = None) -> int:
+    headers = [(b"host", b"bench"), (b"content-type", b"application/json")]
+    if token is not None:
+        headers.append((b"authorization", token))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query, "root_path": "", "headers": headers,
+        "client": ("10.0.0.1", 4000), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def storm(tokens: dict, write_rate: int, seconds: float):
+    writes = [
+        (user_id, json.dumps({"user_id": user_id, "course_id": course_id}).encode())
+        for user_id in tokens
+        for course_id in (1, 2, 3)
+    ]
+    statuses, read_latencies, tasks = Counter(), [], []
+    clock = time.perf_counter
+
+    async def write(user_id: int, body: bytes):
+        statuses[await call("POST", "/enrollments", body=body, token=tokens[user_id])] += 1
+
+    async def read(arrival: float):
+        await call("GET", "/courses", b"limit=10")
+        read_latencies.append(clock() - arrival)
+
+    start = clock()
+    sent_writes = sent_reads = 0
+    while True:
+        # Catch up with every arrival due by now, like a server accepting
+        # connections that queued while the loop was busy
+        elapsed = clock() - start
+        if elapsed >= seconds:
+            break
+        while sent_writes < min(int(elapsed * write_rate), len(writes)):
+            tasks.append(asyncio.create_task(write(*writes[sent_writes])))
+            sent_writes += 1
+        while sent_reads < int(elapsed * READ_RATE):
+            tasks.append(asyncio.create_task(read(start + sent_reads / READ_RATE)))
+            sent_reads += 1
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+
+    read_latencies.sort()
+    return {
+        "p50": read_latencies[len(read_latencies) // 2] * 1e3,
+        "p99": read_latencies[len(read_latencies) * 99 // 100] * 1e3,
+        "drain": (clock() - start - seconds) * 1e3,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def main(argv):
+    write_rate = int(argv[0]) if argv else 5000
+    seconds = float(argv[1]) if len(argv) > 1 else 2
+    concurrency = int(argv[2]) if len(argv) > 2 else 8
+    queue = int(argv[3]) if len(argv) > 3 else 256
+    students = int(write_rate * seconds) // 3 + 1
+
+    configurations = [
+        ("off", None, None),
+        ("rate limit", RateLimiter(2, 2), None),
+        ("admission", RateLimiter(2, 2), AdmissionQueue(concurrency, queue, 1.0)),
+    ]
+
+    print(f"{write_rate} writes/s and {READ_RATE} reads/s for {seconds}s")
+    print(f"{'config':>12} {'read p50 ms':>12} {'read p99 ms':>12} {'drain ms':>9}  write statuses")
+    for label, limiter, admission_queue in configurations:
+        tokens = seed(students)
+        enrollment_routes.admission.limiter = limiter
+        admission.admission_queue = admission_queue
+        result = asyncio.run(storm(tokens, write_rate, seconds))
+        print(f"{label:>12} {result['p50']:>12.2f} {result['p99']:>12.2f} {result['drain']:>9.0f}  {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,83 @@
+"""
+Benchmark: hot-course enrollment under contention.
+
+Half of the threads enroll students into one hot, capacity-limited
+course (so most of them land on its waitlist). The other half enroll
+into their own cold courses. The run is repeated with the default
+striped per-course locks and with a single stripe, which behaves like
+one global enrollment lock.
+
+Usage:
+    python -m benchmarks.bench_capacity [THREADS] [OPS_PER_THREAD]
+"""
+import sys
+import threading
+import time
+
+from app.core import storage
+from app.core.locks import StripedLock
+from app.services import enrollment_service
+from app.services.course_service import CourseService
+from app.services.enrollment_service import EnrollmentService
+from app.services.user_service import UserService
+
+
+def reset(threads: int, ops: int):
+    for table in (storage.users, storage.courses, storage.enrollments, storage.waitlist):
+        table.clear()
+
+    UserService.import_users([
+        {"name": f"Student {i}", "email": f"s{i}@example.com", "role": "student"}
+        for i in range(threads * ops)
+    ], "admin")
+    CourseService.create_course("Hot Course", "HOT", "admin", capacity=100)
+    for n in range(threads):
+        CourseService.create_course(f"Cold Course {n}", f"COLD{n}", "admin")
+
+
+def run(threads: int, ops: int, stripes: int):
+    reset(threads, ops)
+    enrollment_service.course_locks = StripedLock(stripes)
+
+    barrier = threading.Barrier(threads)
+    timings = [0.0] * threads
+
+    def worker(n):
+        hot = n % 2 == 0
+        course_id = 1 if hot else n + 2
+        first_user = n * ops + 1
+        barrier.wait()
+        start = time.perf_counter()
+        for user_id in range(first_user, first_user + ops):
+            EnrollmentService.enroll(user_id, course_id, "student")
+        timings[n] = time.perf_counter() - start
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    cold = [timings[n] for n in range(threads) if n % 2]
+    return threads * ops / elapsed, ops / (sum(cold) / len(cold))
+
+
+def main(argv):
+    threads = int(argv[0]) if argv else 8
+    ops = int(argv[1]) if len(argv) > 1 else 5_000
+    original = enrollment_service.course_locks
+
+    print(f"{threads} threads x {ops} enrollments, hot course capacity 100")
+    print(f"{'locking':>16} {'total ops/s':>12} {'cold ops/s/thread':>18}")
+    try:
+        for label, stripes in (("striped (64)", 64), ("global (1)", 1)):
+            total, cold = run(threads, ops, stripes)
+            print(f"{label:>16} {total:>12.0f} {cold:>18.0f}")
+    finally:
+        enrollment_service.course_locks = original
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,44 @@
+"""
+Benchmark: creating users through UserService stays linear.
+
+Each run creates N users from an empty store and reports the cost per
+insert. With the maintained email index the per-user cost should stay
+flat as N grows.
+
+Usage:
+    python -m benchmarks.bench_create_users [N ...]
+"""
+import sys
+import time
+
+from app.core.storage import users
+from app.services.user_service import UserService
+
+
+def run(count: int):
+    users.clear()
+
+    start = time.perf_counter()
+    for i in range(count):
+        UserService.create_user(
+            name=f"User {i}",
+            email=f"user{i}@example.com",
+            role="student"
+        )
+    elapsed = time.perf_counter() - start
+
+    users.clear()
+    return elapsed
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'users':>10} {'total (s)':>10} {'per user (us)':>14}")
+    for count in sizes:
+        elapsed = run(count)
+        print(f"{count:>10} {elapsed:>10.2f} {elapsed / count * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,123 @@
+"""
+Benchmark: cost of a retried POST /enrollments.
+
+Enrolls N students (one request each, through the ASGI app), then
+retries every request once, timing both rounds:
+
+  without key   the retry runs the full enrollment path and gets
+                400 "already enrolled"
+  with key      the retry carries the first request's Idempotency-Key
+                and is answered from the idempotency cache
+  cache full    as "with key", with the cache already holding
+                IDEMPOTENCY_CACHE_SIZE entries, so every first request
+                also evicts one
+
+With --sqlite the app runs on a fresh SQLite database, where the cache
+is a table shared by every worker.
+
+Usage:
+    python -m benchmarks.bench_idempotency [N] [--sqlite]
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+
+def seed(students: int, fill: bool = False):
+    from app.core.auth import issue_token, principal_cache
+    from app.core.cache import catalog_cache
+    from app.core.idempotency import idempotency_cache
+    from app.core.storage import courses, enrollments, users, waitlist
+
+    for table in (users, courses, enrollments, waitlist):
+        table.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+    idempotency_cache.clear()
+
+    users.insert_all([
+        {"id": i, "name": f"Student {i}", "email": f"s{i}@example.com", "role": "student"}
+        for i in users.ids.reserve(students)
+    ])
+    course_id = courses.ids.next()
+    courses.insert({"id": course_id, "title": "Course", "code": "C1", "capacity": None})
+    if fill:
+        for i in range(idempotency_cache.max_entries):
+            key = hashlib.blake2b(b"fill-%d" % i, digest_size=16).digest()
+            idempotency_cache.claim(key, b"")
+            idempotency_cache.complete(key, 201, [], b"{}")
+    return [
+        (
+            f"Bearer {issue_token(user_id, 'student')}".encode(),
+            json.dumps({"user_id": user_id, "course_id": course_id}).encode()
+        )
+        for user_id in range(1, students + 1)
+    ]
+
+
+async def call(body: bytes, token: bytes, key: bytes = None) -> int:
+    from app.main import app
+
+    headers = [(b"host", b"bench"), (b"content-type", b"application/json"), (b"authorization", token)]
+    if key is not None:
+        headers.append((b"idempotency-key", key))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/enrollments", "raw_path": b"/enrollments",
+        "query_string": b"", "root_path": "", "headers": headers,
+        "client": ("10.0.0.1", 4000), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def timed(requests: list, keys: list):
+    statuses = Counter()
+    start = time.perf_counter()
+    for (token, body), key in zip(requests, keys):
+        statuses[await call(body, token, key)] += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / len(requests) * 1e6, dict(statuses)
+
+
+async def retries(requests: list, keyed: bool):
+    keys = [str(i).encode() if keyed else None for i in range(len(requests))]
+    first, _ = await timed(requests, keys)
+    retry, statuses = await timed(requests, keys)
+    return first, retry, statuses
+
+
+def main(argv):
+    if "--sqlite" in argv:
+        argv = [arg for arg in argv if arg != "--sqlite"]
+        # Before the app is imported, so it picks the backend up
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_idempotency_"), "bench.db")
+    count = int(argv[0]) if argv else 5000
+
+    print(f"{count} retried enrollments, {os.environ.get('STORAGE_BACKEND', 'memory')} backend")
+    print(f"{'retry':>12} {'first us/req':>13} {'retry us/req':>13}  statuses")
+    for label, keyed, fill in (
+        ("without key", False, False), ("with key", True, False), ("cache full", True, True)
+    ):
+        first, retry, statuses = asyncio.run(retries(seed(count, fill), keyed))
+        print(f"{label:>12} {first:>13.1f} {retry:>13.1f}  {statuses}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,64 @@
+"""
+Benchmark: memory per enrollment in the in-memory store.
+
+Fills an enrollments table with N rows twice: once keeping the inserted
+dicts as rows (the previous layout) and once with the slotted entity
+rows used by MemoryBackend. Reports traced bytes per enrollment for the
+whole table (rows plus primary key, indexes and keyset order) and for
+the row objects alone.
+
+Usage:
+    python -m benchmarks.bench_memory [ROWS]
+"""
+import gc
+import sys
+import tracemalloc
+from operator import itemgetter
+
+from app.core.backend import SCHEMA
+from app.core.entities import entity_class
+from app.core.memory import Table
+
+
+def make_table(entity):
+    layout = SCHEMA["enrollments"]
+    return Table(
+        unique={n: itemgetter(*cols) for n, cols in layout["unique"].items()},
+        multi={n: itemgetter(*cols) for n, cols in layout["multi"].items()},
+        entity=entity,
+    )
+
+
+def measure(rows: int, entity):
+    gc.collect()
+    tracemalloc.start()
+    table = make_table(entity)
+
+    # Same shape as EnrollmentService.bulk_enroll: 1000 students per course
+    table.insert_many([
+        {"id": row_id, "user_id": row_id % 1000, "course_id": row_id // 1000}
+        for row_id in range(1, rows + 1)
+    ])
+
+    gc.collect()
+    total, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    row = table.get(1)
+    row_size = sys.getsizeof(row) + (16 if gc.is_tracked(row) else 0)
+    return total / rows, row_size
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 1_000_000
+    enrollment = entity_class("Enrollment", ("id", *SCHEMA["enrollments"]["columns"]))
+
+    print(f"{rows} enrollments")
+    print(f"{'rows':>10} {'table B/row':>12} {'row object B':>13}")
+    for label, entity in (("dict", None), ("slots", enrollment)):
+        per_row, row_size = measure(rows, entity)
+        print(f"{label:>10} {per_row:>12.0f} {row_size:>13}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,100 @@
+"""
+Benchmark: course and user search latency.
+
+Seeds N users and N courses (titles drawn from a small vocabulary, so
+common words have long posting lists), builds the search index and
+times page-sized queries through the services: title words, code
+prefixes, email prefixes and role filters.
+
+Usage:
+    python -m benchmarks.bench_search [ROWS] [QUERIES]
+"""
+import random
+import sys
+import time
+
+from app.core.cache import catalog_cache
+from app.core.search import search_index
+from app.core.storage import courses, enrollments, users, waitlist
+from app.services.course_service import CourseService
+from app.services.user_service import UserService
+
+WORDS = (
+    "introduction advanced applied modern theory practice history foundations "
+    "linear algebra calculus physics chemistry biology economics literature "
+    "music art design systems networks data analysis statistics philosophy"
+).split()
+
+
+def seed(rows: int, rng: random.Random):
+    for table in (users, courses, enrollments, waitlist):
+        table.clear()
+    catalog_cache.clear()
+    search_index.clear()
+
+    users.insert_all([
+        {
+            "id": i,
+            "name": f"User {i}",
+            "email": f"{rng.choice(WORDS)}.{i}@example.com",
+            "role": "admin" if i % 100 == 0 else "student"
+        }
+        for i in users.ids.reserve(rows)
+    ])
+    courses.insert_all([
+        {
+            "id": i,
+            "title": " ".join(rng.sample(WORDS, 3)),
+            "code": f"{rng.choice(WORDS)[:3].upper()}{i}",
+            "capacity": None
+        }
+        for i in courses.ids.reserve(rows)
+    ])
+
+
+def timed(func, queries: list):
+    latencies = []
+    for args in queries:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[len(latencies) * 99 // 100] * 1e6
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 1_000_000
+    count = int(argv[1]) if len(argv) > 1 else 1000
+    rng = random.Random(7)
+
+    seed(rows, rng)
+    start = time.perf_counter()
+    CourseService.get_all_courses(limit=1, q="warmup")
+    print(f"{rows} users, {rows} courses; index built in {time.perf_counter() - start:.2f}s")
+
+    def cursor():
+        return rng.randint(0, rows) if rng.random() < 0.5 else None
+
+    cases = [
+        ("course: one word", CourseService.get_all_courses,
+         [(100, cursor(), rng.choice(WORDS)) for _ in range(count)]),
+        ("course: two words", CourseService.get_all_courses,
+         [(100, cursor(), " ".join(rng.sample(WORDS, 2))) for _ in range(count)]),
+        ("course: code prefix", CourseService.get_all_courses,
+         [(100, cursor(), f"{rng.choice(WORDS)[:3]}{rng.randint(1, 99)}") for _ in range(count)]),
+        ("user: email prefix", UserService.get_all_users,
+         [(100, None, rng.choice(WORDS)[:rng.randint(1, 4)], None) for _ in range(count)]),
+        ("user: prefix + role", UserService.get_all_users,
+         [(100, None, rng.choice(WORDS)[:2], "admin") for _ in range(count)]),
+        ("user: role, next page", UserService.get_all_users,
+         [(100, rng.randint(1, rows), None, "student") for _ in range(count)]),
+    ]
+
+    print(f"{'query (limit 100)':>24} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for label, func, queries in cases:
+        p50, p99 = timed(func, queries)
+        print(f"{label:>24} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,105 @@
+"""
+Benchmark: per-row JSON serialization cost of list responses.
+
+Seeds N users and N/10 courses, reads them back as stored rows and
+compares the encoders behind list endpoints:
+
+  response model   validate through the response model, then
+                   Pydantic dump_json (FastAPI's path for
+                   response_model routes)
+  jsonable_encoder jsonable_encoder + stdlib json (routes without a
+                   response model)
+  fast             FAST_JSON: trusted rows straight to orjson
+
+then times GET /users and GET /enrollments end to end, with fast mode
+off and on.
+
+Usage:
+    python -m benchmarks.bench_serialization [ROWS] [REPEAT]
+"""
+import json
+import sys
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.api.v1.serialization import adapter, dumps, project
+from app.core.auth import issue_token
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.storage import courses, enrollments, users, waitlist
+from app.main import app
+from app.schemas.course_schema import CourseResponse
+from app.schemas.user_schema import UserResponse
+
+
+def seed(rows: int):
+    for table in (users, courses, enrollments, waitlist):
+        table.clear()
+    catalog_cache.clear()
+
+    users.insert_all([
+        {"id": i, "name": f"Student {i}", "email": f"s{i}@example.com", "role": "student"}
+        for i in users.ids.reserve(rows)
+    ])
+    courses.insert_all([
+        {"id": i, "title": f"Course {i}", "code": f"C{i}", "capacity": None}
+        for i in courses.ids.reserve(max(rows // 10, 1))
+    ])
+    enrollments.insert_all([
+        {"id": i, "user_id": i, "course_id": 1}
+        for i in enrollments.ids.reserve(rows)
+    ])
+
+
+def per_row(func, rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1e6
+
+
+def encoders(model, rows: list):
+    model_adapter = adapter(List[model])
+    return [
+        ("response model", lambda: model_adapter.dump_json(model_adapter.validate_python(rows))),
+        ("jsonable_encoder", lambda: json.dumps(jsonable_encoder(rows), ensure_ascii=False).encode()),
+        ("fast", lambda: dumps(project(rows, model))),
+    ]
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 1000
+    repeat = int(argv[1]) if len(argv) > 1 else 50
+    seed(rows)
+
+    print(f"Encoding {rows} stored rows (best of {repeat}), us per row")
+    print(f"{'encoder':>18} {'users':>10} {'courses':>10}")
+    user_rows, course_rows = users.page(None, rows), courses.page(None, rows)
+    for (label, encode_users), (_, encode_courses) in zip(
+        encoders(UserResponse, user_rows), encoders(CourseResponse, course_rows)
+    ):
+        print(f"{label:>18} {per_row(encode_users, len(user_rows), repeat):>10.3f} "
+              f"{per_row(encode_courses, len(course_rows), repeat):>10.3f}")
+
+    admin_id = users.ids.next()
+    users.insert({"id": admin_id, "name": "Admin", "email": "admin@example.com", "role": "admin"})
+    client = TestClient(app, headers={"Authorization": f"Bearer {issue_token(admin_id, 'admin')}"})
+    limit = min(rows, 1000)
+    print(f"\nGET with limit={limit} (best of {repeat}), us per row")
+    print(f"{'endpoint':>18} {'standard':>10} {'fast':>10}")
+    for url in (f"/users?limit={limit}", f"/enrollments?limit={limit}"):
+        timings = []
+        for fast in (False, True):
+            settings.fast_json = fast
+            timings.append(per_row(lambda: client.get(url), limit, repeat))
+        print(f"{url.split('?')[0]:>18} {timings[0]:>10.3f} {timings[1]:>10.3f}")
+    settings.fast_json = False
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,273 @@
+"""
+Benchmark suite: every hot endpoint at several data sizes.
+
+For each size (1k, 100k and 1M enrollments by default) the store is
+seeded with that many enrollments, one per student, spread over
+rows / 100 courses. The suite then measures, with a fixed random seed:
+
+  service.*  in-process calls to the service layer
+  asgi.*     full HTTP requests through the ASGI app via httpx, each
+             with a bearer token (one per student, one admin), so
+             they include authentication and the principal cache
+
+covering course lookup, course and enrollment listing, enroll,
+deregister and cascading course delete. Results are printed and written
+as JSON. Given a baseline file from an earlier run, any operation whose
+throughput dropped by more than the threshold is reported and the exit
+status is 1, so the suite can gate changes in CI.
+
+Usage:
+    python -m benchmarks.bench_suite [--sizes 1k,100k,1m] [--iterations N]
+        [--concurrency N] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+from app.api.v1.pagination import encode_cursor
+from app.core.auth import issue_token, principal_cache
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.stats import EnrollmentStats, enrollment_stats
+from app.core.storage import courses, enrollments, scan, users, waitlist
+from app.main import app
+from app.services.course_service import CourseService
+from app.services.enrollment_service import EnrollmentService
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+# Seeding
+
+def seed(rows: int, spare: int):
+    # `rows` enrolled students plus `spare` students with no enrollment,
+    # for the enroll benchmarks
+    for table in (users, courses, enrollments, waitlist):
+        table.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+    course_count = max(rows // 100, 10)
+    users.insert_all([
+        {"id": user_id, "name": f"Student {user_id}", "email": f"s{user_id}@example.com", "role": "student"}
+        for user_id in users.ids.reserve(rows + spare)
+    ])
+    courses.insert_all([
+        {"id": course_id, "title": f"Course {course_id}", "code": f"C{course_id}", "capacity": None}
+        for course_id in courses.ids.reserve(course_count)
+    ])
+    enrollments.insert_all([
+        {"id": row_id, "user_id": row_id, "course_id": row_id % course_count + 1}
+        for row_id in enrollments.ids.reserve(rows)
+    ])
+
+    if isinstance(enrollment_stats, EnrollmentStats):
+        enrollment_stats.rebuild(scan(enrollments))
+    return course_count
+
+
+def plan(rows: int, iterations: int, course_count: int):
+    rng = random.Random(rows)
+    return {
+        "courses": [rng.randint(1, course_count) for _ in range(iterations)],
+        "after_courses": [rng.randint(0, course_count) for _ in range(iterations)],
+        "after_enrollments": [rng.randint(0, rows) for _ in range(iterations)],
+        "students": list(range(rows + 1, rows + iterations + 1)),
+        "deletes": list(range(1, min(iterations // 10, course_count // 2) + 1)),
+    }
+
+
+# Measurement
+
+def summarize(name: str, rows: int, latencies: list, elapsed: float):
+    latencies.sort()
+    return {
+        "name": name,
+        "rows": rows,
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1e6,
+    }
+
+
+def measure(name: str, rows: int, func, arguments: list):
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for args in arguments:
+        began = clock()
+        func(*args)
+        latencies.append(clock() - began)
+    return summarize(name, rows, latencies, clock() - start)
+
+
+async def measure_http(name: str, rows: int, client, requests: list, concurrency: int):
+    latencies = []
+    queue = iter(requests)
+    clock = time.perf_counter
+
+    async def worker():
+        for method, url, body, headers in queue:
+            began = clock()
+            response = await client.request(method, url, json=body, headers=headers)
+            latencies.append(clock() - began)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} -> {response.status_code}")
+
+    start = clock()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, rows, latencies, clock() - start)
+
+
+# Benchmarks
+
+def bearer(user_id: int, role: str) -> dict:
+    return {"Authorization": f"Bearer {issue_token(user_id, role)}"}
+
+
+def service_benchmarks(rows: int, iterations: int):
+    course_count = seed(rows, iterations)
+    work = plan(rows, iterations, course_count)
+    pairs = list(zip(work["students"], work["courses"]))
+
+    return [
+        measure("service.course_lookup", rows, CourseService.get_course_by_id,
+                [(course_id,) for course_id in work["courses"]]),
+        measure("service.list_courses", rows, CourseService.get_all_courses,
+                [(100, after) for after in work["after_courses"]]),
+        measure("service.list_enrollments", rows, EnrollmentService.get_all_enrollments,
+                [("admin", 100, after) for after in work["after_enrollments"]]),
+        measure("service.enroll", rows, EnrollmentService.enroll,
+                [(user_id, course_id, "student") for user_id, course_id in pairs]),
+        measure("service.deregister", rows, EnrollmentService.deregister,
+                [(user_id, course_id, "student") for user_id, course_id in pairs]),
+        measure("service.cascade_delete", rows, CourseService.delete_course,
+                [(course_id, "admin") for course_id in work["deletes"]]),
+    ]
+
+
+async def asgi_benchmarks(rows: int, iterations: int, concurrency: int):
+    course_count = seed(rows, iterations)
+    work = plan(rows, iterations, course_count)
+    pairs = list(zip(work["students"], work["courses"]))
+    transport = httpx.ASGITransport(app=app)
+
+    admin_id = users.ids.next()
+    users.insert({"id": admin_id, "name": "Admin", "email": "admin@example.com", "role": "admin"})
+    admin = bearer(admin_id, "admin")
+    students = {user_id: bearer(user_id, "student") for user_id, _ in pairs}
+
+    def cursor(after: int) -> str:
+        return f"&after={encode_cursor(after)}" if after else ""
+
+    suites = [
+        ("asgi.course_lookup", [
+            ("GET", f"/courses/{course_id}", None, None) for course_id in work["courses"]
+        ]),
+        ("asgi.list_courses", [
+            ("GET", f"/courses?limit=100{cursor(after)}", None, None) for after in work["after_courses"]
+        ]),
+        ("asgi.list_enrollments", [
+            ("GET", f"/enrollments?limit=100{cursor(after)}", None, admin)
+            for after in work["after_enrollments"]
+        ]),
+        ("asgi.enroll", [
+            ("POST", "/enrollments", {"user_id": u, "course_id": c}, students[u])
+            for u, c in pairs
+        ]),
+        ("asgi.deregister", [
+            ("DELETE", "/enrollments", {"user_id": u, "course_id": c}, students[u])
+            for u, c in pairs
+        ]),
+        ("asgi.cascade_delete", [
+            ("DELETE", f"/courses/{course_id}", None, admin) for course_id in work["deletes"]
+        ]),
+    ]
+
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, requests in suites:
+            results.append(await measure_http(name, rows, client, requests, concurrency))
+    return results
+
+
+# Reporting
+
+def compare(results: list, baseline: dict, threshold: float):
+    previous = {(r["name"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["rows"]))
+        if before is None:
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        result["change"] = change
+        if change < -threshold:
+            regressions.append(result)
+    return regressions
+
+
+def print_results(results: list):
+    print(f"{'benchmark':<26} {'rows':>9} {'ops/s':>11} {'p50 (us)':>10} {'p99 (us)':>10} {'vs base':>8}")
+    for r in results:
+        change = f"{r['change'] * 100:+.0f}%" if "change" in r else ""
+        print(f"{r['name']:<26} {r['rows']:>9} {r['ops_per_sec']:>11,.0f} "
+              f"{r['p50_us']:>10.1f} {r['p99_us']:>10.1f} {change:>8}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite")
+    parser.add_argument("--sizes", default="1k,100k,1m")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    options = parser.parse_args(argv)
+
+    results = []
+    for size in options.sizes.split(","):
+        rows = SIZES[size.lower()]
+        results += service_benchmarks(rows, options.iterations)
+        results += asyncio.run(asgi_benchmarks(rows, options.iterations, options.concurrency))
+
+    regressions = []
+    if options.baseline:
+        with open(options.baseline) as file:
+            regressions = compare(results, json.load(file), options.threshold)
+
+    print_results(results)
+    with open(options.output, "w") as file:
+        json.dump({
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "storage_backend": settings.storage_backend,
+                "iterations": options.iterations,
+                "concurrency": options.concurrency,
+            },
+            "results": results,
+        }, file, indent=2)
+    print(f"\nResults written to {options.output}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {options.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['name']} at {r['rows']} rows: {r['change'] * 100:+.0f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,73 @@
+"""
+Benchmark: write-ahead log throughput and recovery time.
+
+Inserts N enrollments one at a time into the in-memory store, first
+without persistence and then with the write-ahead log, and reports the
+journaling overhead and log size. Then measures startup recovery from
+the log alone, the time to write a snapshot, and recovery from the
+snapshot.
+
+Usage:
+    python -m benchmarks.bench_wal [ROWS] [DIRECTORY]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.memory import MemoryBackend
+
+
+def fill(backend, rows: int):
+    table = backend.enrollments
+    start = time.perf_counter()
+    for row_id in range(1, rows + 1):
+        table.insert({"id": row_id, "user_id": row_id, "course_id": row_id % 1000})
+    return time.perf_counter() - start
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 10_000_000
+    directory = argv[1] if len(argv) > 1 else tempfile.mkdtemp(prefix="bench_wal_")
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{rows} single-row inserts, log in {directory}")
+    try:
+        baseline = fill(MemoryBackend(), rows)
+        print(f"{'no log':>22}: {rows / baseline:>12,.0f} rows/s")
+
+        backend = MemoryBackend(directory, snapshot_every=rows * 2)
+        logged = fill(backend, rows)
+        close_time, _ = timed(backend.close)
+        print(f"{'with log':>22}: {rows / logged:>12,.0f} rows/s "
+              f"(+{(logged / baseline - 1) * 100:.0f}%), final fsync {close_time:.2f}s")
+        print(f"{'log size':>22}: {directory_size(directory) / rows:>12.1f} bytes/row")
+
+        elapsed, backend = timed(lambda: MemoryBackend(directory, snapshot_every=rows * 2))
+        print(f"{'recover from log':>22}: {elapsed:>12.2f} s ({rows / elapsed:,.0f} rows/s)")
+
+        elapsed, _ = timed(backend.wal.snapshot)
+        backend.close()
+        print(f"{'write snapshot':>22}: {elapsed:>12.2f} s "
+              f"({directory_size(directory) / rows:.1f} bytes/row)")
+
+        elapsed, backend = timed(lambda: MemoryBackend(directory, snapshot_every=rows * 2))
+        backend.close()
+        print(f"{'recover from snapshot':>22}: {elapsed:>12.2f} s ({rows / elapsed:,.0f} rows/s)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
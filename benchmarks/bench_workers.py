@@ -0,0 +1,89 @@
+"""
+Benchmark: read throughput with several worker processes sharing one
+SQLite database.
+
+Seeds a database, then starts 1, 2, 4 ... worker processes (as uvicorn
+--workers would) that each run course lookups and catalog pages through
+the services for a fixed time. Reports aggregate reads per second, which
+should grow close to linearly with the number of cores.
+
+Usage:
+    python -m benchmarks.bench_workers [MAX_WORKERS] [SECONDS]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.core.sqlite import SQLiteBackend
+
+COURSES = 10_000
+
+
+def seed(path: str):
+    backend = SQLiteBackend(path, pool_size=1)
+    backend.courses.insert_all([
+        {"id": i, "title": f"Course {i}", "code": f"C{i}", "capacity": 100}
+        for i in range(1, COURSES + 1)
+    ])
+    backend.close()
+
+
+def worker(seconds: float, start, results):
+    # Imported here so the worker picks up the inherited environment
+    from app.services.course_service import CourseService
+
+    rng = random.Random(os.getpid())
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    reads = 0
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            if rng.random() < 0.9:
+                CourseService.get_course_by_id(rng.randint(1, COURSES))
+            else:
+                CourseService.get_all_courses(limit=50, after=rng.randint(0, COURSES))
+        reads += 100
+    results.put(reads)
+
+
+def run(workers: int, seconds: float):
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    processes = [
+        context.Process(target=worker, args=(seconds, start, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(1)  # let every worker finish importing
+    start.set()
+    total = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return total / seconds
+
+
+def main(argv):
+    max_workers = int(argv[0]) if argv else os.cpu_count()
+    seconds = float(argv[1]) if len(argv) > 1 else 5.0
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_workers_"), "shared.db")
+    seed(path)
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = path
+
+    print(f"{COURSES} courses, 90% lookups / 10% pages, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'reads/s':>12} {'speedup':>8}")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        rate = run(workers, seconds)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>12,.0f} {rate / baseline:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
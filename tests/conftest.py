@@ -0,0 +1,22 @@
+import pytest
+from app.core.auth import issue_token
+from app.core.storage import users
+
+# Callers are stored outside the id sequence, so the ids tests create
+# are unchanged
+CALLERS = {"admin": 1000, "student": 1001}
+
+
+# Bearer headers for a caller of the given role, or for the stored user
+# `user_id` (student routes only act for the caller)
+@pytest.fixture
+def auth():
+    def headers(role: str = None, user_id: int = None):
+        if user_id is not None:
+            return {"Authorization": f"Bearer {issue_token(user_id, users.get(user_id)['role'])}"}
+        user_id = CALLERS[role]
+        if users.get(user_id) is None:
+            users.insert({"id": user_id, "name": role.title(), "email": f"{role}-caller@example.com", "role": role})
+        return {"Authorization": f"Bearer {issue_token(user_id, role)}"}
+
+    return headers
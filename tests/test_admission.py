@@ -0,0 +1,225 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.v1 import admission as admission_module
+from app.api.v1 import enrollments as enrollment_routes
+from app.core.admission import READ, WRITE, AdmissionQueue, AdmissionRejected, RateLimiter
+from app.core.auth import issue_token, principal_cache
+from app.core.cache import catalog_cache
+from app.core.metrics import registry
+from app.core.storage import users, courses, enrollments, waitlist
+
+client = TestClient(app)
+
+
+# Reset storage and metrics before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+    registry.clear()
+
+
+# Helper Functions
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def create_student(email: str):
+    user = client.post("/users", json={"name": "Student", "email": email, "role": "student"}).json()
+    return {"Authorization": f"Bearer {issue_token(user['id'], 'student')}"}
+
+
+def seed_courses(count: int):
+    courses.insert_all([
+        {"id": i, "title": f"Course {i}", "code": f"C{i}", "capacity": None}
+        for i in courses.ids.reserve(count)
+    ])
+
+
+def enroll(headers: dict, user_id: int, course_id: int):
+    return client.post("/enrollments", json={"user_id": user_id, "course_id": course_id}, headers=headers)
+
+
+def limit_enrollments(monkeypatch, rate: float, burst: int):
+    monkeypatch.setattr(enrollment_routes.admission, "limiter", RateLimiter(rate, burst))
+
+
+# Rate Limiter
+def test_bucket_allows_burst_then_refills():
+    clock = Clock()
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+
+
+def test_buckets_are_per_key_and_bounded():
+    limiter = RateLimiter(rate=1, burst=1, max_keys=2, clock=Clock())
+
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("b") == 0
+    assert limiter.acquire("a") > 0
+
+    # A third client pushes out the least recently seen one ("b")
+    assert limiter.acquire("c") == 0
+    assert limiter.acquire("b") == 0
+
+
+# Admission Queue
+def test_writes_wait_for_reads_that_are_ready():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=10, max_queue=10, timeout=1)
+        order = []
+
+        async def request(name: str, priority: int):
+            await queue.acquire(priority)
+            order.append(name)
+            queue.release()
+
+        await asyncio.gather(request("write", WRITE), request("read", READ))
+        return order
+
+    assert asyncio.run(scenario()) == ["read", "write"]
+
+
+def test_only_requests_that_found_no_free_slot_count_as_queued():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=2, max_queue=10, timeout=1)
+        # Deferred behind reads, but a slot was free all along
+        first = await queue.acquire(WRITE)
+        # The last free slot
+        second = await queue.acquire(WRITE)
+        third = asyncio.create_task(queue.acquire(WRITE))
+        await asyncio.sleep(0)
+        queue.release()
+        return first, second, await third
+
+    assert asyncio.run(scenario()) == (False, False, True)
+
+
+def test_freed_slot_goes_to_reads_before_earlier_writes():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=1, max_queue=10, timeout=1)
+        order = []
+
+        async def request(name: str, priority: int):
+            await queue.acquire(priority)
+            order.append(name)
+            await asyncio.sleep(0)
+            queue.release()
+
+        await queue.acquire(READ)
+        tasks = [asyncio.create_task(request("write", WRITE)), asyncio.create_task(request("read", READ))]
+        await asyncio.sleep(0)
+        assert queue.queued == 2
+
+        queue.release()
+        await asyncio.gather(*tasks)
+        return order, queue.active
+
+    assert asyncio.run(scenario()) == (["read", "write"], 0)
+
+
+def test_full_queue_sheds_writes_and_keeps_reads():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=1, max_queue=1, timeout=1)
+        await queue.acquire(READ)
+        write = asyncio.create_task(queue.acquire(WRITE))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await queue.acquire(WRITE)
+        assert rejected.value.reason == "queue_full"
+
+        read = asyncio.create_task(queue.acquire(READ))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as evicted:
+            await write
+        assert evicted.value.reason == "evicted"
+
+        queue.release()
+        assert await read is True
+        queue.release()
+        return queue.active, queue.queued
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_waiters_time_out():
+    async def scenario():
+        queue = AdmissionQueue(concurrency=1, max_queue=1, timeout=0.01)
+        await queue.acquire(READ)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await queue.acquire(WRITE)
+        return rejected.value.reason, queue.queued
+
+    assert asyncio.run(scenario()) == ("queue_timeout", 0)
+
+
+# Routes
+def test_rate_limit_is_per_user(monkeypatch):
+    limit_enrollments(monkeypatch, rate=0.001, burst=2)
+    seed_courses(3)
+    first, second = create_student("a@example.com"), create_student("b@example.com")
+
+    assert enroll(first, 1, 1).status_code == 201
+    assert enroll(first, 1, 2).status_code == 201
+    limited = enroll(first, 1, 3)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert len(enrollments) == 2
+
+    assert enroll(second, 2, 1).status_code == 201
+    assert client.get("/courses").status_code == 200
+
+
+def test_rate_limit_resolves_known_tokens_from_principal_cache(monkeypatch):
+    limit_enrollments(monkeypatch, rate=1000, burst=1000)
+    seed_courses(2)
+    student = create_student("a@example.com")
+    calls = []
+    read_token = admission_module.read_token
+    monkeypatch.setattr(admission_module, "read_token", lambda token: calls.append(token) or read_token(token))
+
+    assert enroll(student, 1, 1).status_code == 201
+    assert enroll(student, 1, 2).status_code == 201
+
+    # Only the first request, before the route cached its principal
+    assert len(calls) == 1
+
+
+def test_busy_queue_rejects_with_503(monkeypatch):
+    monkeypatch.setattr(admission_module, "admission_queue", AdmissionQueue(0, 0, 1))
+
+    response = client.get("/courses")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/metrics").status_code == 200
+
+
+def test_rejections_are_counted(monkeypatch):
+    limit_enrollments(monkeypatch, rate=0.001, burst=1)
+    seed_courses(2)
+    student = create_student("a@example.com")
+    enroll(student, 1, 1)
+    enroll(student, 1, 2)
+
+    text = client.get("/metrics").text
+
+    assert 'admission_rejected_total{router="enrollments",reason="rate_limited"} 1' in text
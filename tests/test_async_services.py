@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.core.storage import users, courses, enrollments
+from app.services.course_service import CourseService, AsyncCourseService
+from app.services.enrollment_service import AsyncEnrollmentService
+from app.services.user_service import AsyncUserService
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+
+
+# Async Variants
+def test_async_variant_exposes_public_methods_only():
+    assert hasattr(AsyncCourseService, "create_course")
+    assert not hasattr(AsyncCourseService, "_find_course")
+    assert asyncio.iscoroutinefunction(AsyncCourseService.create_course)
+
+
+def test_async_enroll_flow():
+    async def scenario():
+        await AsyncUserService.create_user("Student One", "s@example.com", "student")
+        await AsyncCourseService.create_course("Math", "MTH101", "admin")
+        return await AsyncEnrollmentService.enroll(1, 1, "student")
+
+    enrollment = asyncio.run(scenario())
+
+    assert enrollment == {"id": 1, "user_id": 1, "course_id": 1}
+    assert CourseService.get_course_enrollments(1, "admin") == [enrollment]
+
+
+def test_async_variant_propagates_http_errors():
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(AsyncCourseService.get_course_by_id(999))
+
+    assert error.value.status_code == 404
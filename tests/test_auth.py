@@ -0,0 +1,195 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.v1.auth import bootstrap_admin
+from app.core import auth as auth_module
+from app.core.auth import Principal, PrincipalCache, issue_token, principal_cache
+from app.core.cache import LocalVersions, catalog_cache
+from app.core.storage import users, courses
+from app.services.user_service import UserService
+
+client = TestClient(app)
+
+
+# Reset storage and cached principals before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def create_user(role: str, email: str = "user@example.com"):
+    # Through the service: signing up as an admin takes an admin's token
+    return UserService.create_user("User", email, role, caller_role="admin")
+
+
+def bearer(token: str):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_course(headers: dict):
+    return client.post("/courses", json={"title": "Math", "code": "MTH101"}, headers=headers)
+
+
+# Token Verification
+def test_missing_token_is_rejected():
+    response = create_course({})
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_valid_token_authorizes_by_its_role():
+    admin = create_user("admin")
+    student = create_user("student", "student@example.com")
+
+    assert create_course(bearer(issue_token(admin["id"], "admin"))).status_code == 201
+    assert create_course(bearer(issue_token(student["id"], "student"))).status_code == 403
+
+
+def test_tampered_token_is_rejected():
+    student = create_user("student")
+    payload, signature = issue_token(student["id"], "student").split(".")
+    forged = issue_token(student["id"], "admin").split(".")[0]
+
+    assert create_course(bearer(f"{forged}.{signature}")).status_code == 401
+    assert create_course(bearer(f"{payload}.{signature[:-2]}")).status_code == 401
+    assert create_course(bearer("not-a-token")).status_code == 401
+
+
+def test_expired_token_is_rejected():
+    admin = create_user("admin")
+
+    assert create_course(bearer(issue_token(admin["id"], "admin", ttl=-1))).status_code == 401
+
+
+def test_token_must_match_stored_role():
+    student = create_user("student")
+
+    assert create_course(bearer(issue_token(student["id"], "admin"))).status_code == 401
+    assert create_course(bearer(issue_token(999, "admin"))).status_code == 401
+
+
+def test_role_in_request_body_is_ignored():
+    student = create_user("student")
+
+    response = client.post(
+        "/courses",
+        json={"title": "Math", "code": "MTH101", "role": "admin"},
+        headers=bearer(issue_token(student["id"], "student"))
+    )
+
+    assert response.status_code == 403
+
+
+# Issuing Tokens
+def test_admin_issues_tokens_for_other_users():
+    admin = create_user("admin")
+    student = create_user("student", "student@example.com")
+
+    response = client.post(
+        "/auth/tokens",
+        json={"user_id": student["id"], "ttl": 60},
+        headers=bearer(issue_token(admin["id"], "admin"))
+    )
+
+    assert response.status_code == 201
+    assert response.json()["expires_in"] == 60
+    token = response.json()["access_token"]
+    assert client.get(f"/users/{student['id']}/enrollments", headers=bearer(token)).status_code == 200
+
+
+def test_students_cannot_issue_tokens():
+    student = create_user("student")
+    headers = bearer(issue_token(student["id"], "student"))
+
+    assert client.post("/auth/tokens", json={"user_id": student["id"]}, headers=headers).status_code == 403
+    assert client.post("/auth/tokens", json={"user_id": student["id"]}).status_code == 401
+
+
+def test_token_for_unknown_user_is_not_found():
+    admin = create_user("admin")
+
+    response = client.post("/auth/tokens", json={"user_id": 999}, headers=bearer(issue_token(admin["id"], "admin")))
+
+    assert response.status_code == 404
+
+
+def test_startup_creates_an_admin_when_there_is_none():
+    with TestClient(app):
+        admin = users.lookup("email", "admin@example.com")
+
+    assert admin["role"] == "admin"
+    assert create_course(bearer(bootstrap_admin())).status_code == 201
+    assert len(users) == 1
+
+
+# Principal Cache
+def test_repeat_requests_skip_verification(monkeypatch):
+    admin = create_user("admin")
+    token = issue_token(admin["id"], "admin")
+    calls = []
+    read_token = auth_module.read_token
+    monkeypatch.setattr(auth_module, "read_token", lambda t: calls.append(t) or read_token(t))
+
+    for _ in range(3):
+        client.get("/stats", headers=bearer(token))
+
+    assert len(calls) == 1
+
+
+def test_reissued_user_id_drops_cached_principal():
+    admin = create_user("admin")
+    token = issue_token(admin["id"], "admin")
+    assert create_course(bearer(token)).status_code == 201
+
+    # A reset reissues id 1 to a student; the old admin token must stop working
+    users.clear()
+    users.ids.reset()
+    create_user("student")
+
+    assert client.get("/stats", headers=bearer(token)).status_code == 401
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PrincipalCache(max_entries=2, versions=LocalVersions())
+    for user_id in (1, 2):
+        cache.put(f"t{user_id}", Principal(user_id, "student"), 2**40, cache.version(user_id))
+
+    cache.get("t1")
+    cache.put("t3", Principal(3, "student"), 2**40, cache.version(3))
+
+    assert cache.get("t1") is not None
+    assert cache.get("t2") is None
+    assert cache.get("t3") is not None
+
+
+def test_cache_entries_expire():
+    cache = PrincipalCache(ttl=0, versions=LocalVersions())
+    cache.put("t1", Principal(1, "student"), 2**40, cache.version(1))
+
+    assert cache.get("t1") is None
+
+
+def test_invalidate_user_drops_only_that_user():
+    cache = PrincipalCache(versions=LocalVersions(slots=1 << 20))
+    for user_id in (1, 2):
+        cache.put(f"t{user_id}", Principal(user_id, "student"), 2**40, cache.version(user_id))
+
+    cache.invalidate_user(1)
+
+    assert cache.get("t1") is None
+    assert cache.get("t2").user_id == 2
+
+
+def test_put_after_invalidation_is_not_cached():
+    cache = PrincipalCache(versions=LocalVersions())
+    version = cache.version(1)
+    cache.invalidate_user(1)
+
+    cache.put("t1", Principal(1, "student"), 2**40, version)
+
+    assert cache.get("t1") is None
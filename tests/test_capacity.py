@@ -0,0 +1,170 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.storage import users, courses, enrollments, waitlist
+from app.core.cache import catalog_cache
+
+client = TestClient(app)
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def create_students(count: int):
+    for i in range(1, count + 1):
+        client.post("/users", json={
+            "name": f"Student {i}",
+            "email": f"s{i}@example.com",
+            "role": "student"
+        })
+
+
+def create_course(auth, capacity: int):
+    return client.post("/courses", json={
+        "title": "Mathematics",
+        "code": "MTH101",
+        "capacity": capacity
+    }, headers=auth("admin"))
+
+
+def enroll(auth, user_id: int):
+    return client.post("/enrollments", json={
+        "user_id": user_id,
+        "course_id": 1
+    }, headers=auth(user_id=user_id))
+
+
+def deregister(auth, user_id: int):
+    return client.request("DELETE", "/enrollments", json={
+        "user_id": user_id,
+        "course_id": 1
+    }, headers=auth(user_id=user_id))
+
+
+def enrolled_ids():
+    return [e["user_id"] for e in enrollments.find("course_id", 1)]
+
+
+# Seat Limits
+def test_course_reports_capacity(auth):
+    response = create_course(auth, capacity=2)
+
+    assert response.status_code == 201
+    assert response.json()["capacity"] == 2
+
+
+def test_full_course_queues_on_waitlist(auth):
+    create_students(3)
+    create_course(auth, capacity=1)
+
+    assert enroll(auth, 1).status_code == 201
+
+    second = enroll(auth, 2)
+    third = enroll(auth, 3)
+
+    assert second.status_code == 202
+    assert second.json()["position"] == 1
+    assert third.json()["position"] == 2
+    assert enrolled_ids() == [1]
+
+
+def test_waitlisted_student_cannot_queue_twice(auth):
+    create_students(2)
+    create_course(auth, capacity=1)
+    enroll(auth, 1)
+    enroll(auth, 2)
+
+    response = enroll(auth, 2)
+
+    assert response.status_code == 400
+    assert "waitlist" in response.json()["detail"]
+
+
+# Waitlist Promotion
+def test_deregister_promotes_waitlist_in_order(auth):
+    create_students(3)
+    create_course(auth, capacity=1)
+    for user_id in (1, 2, 3):
+        enroll(auth, user_id)
+
+    deregister(auth, 1)
+
+    assert enrolled_ids() == [2]
+    assert [w["user_id"] for w in waitlist.find("course_id", 1)] == [3]
+
+
+def test_force_deregister_promotes_waitlist(auth):
+    create_students(2)
+    create_course(auth, capacity=1)
+    enroll(auth, 1)
+    enroll(auth, 2)
+
+    response = client.request("DELETE", "/admin/enrollments", json={
+        "user_id": 1,
+        "course_id": 1
+    }, headers=auth("admin"))
+
+    assert response.status_code == 200
+    assert enrolled_ids() == [2]
+    assert len(waitlist) == 0
+
+
+def test_waitlisted_student_can_leave_queue(auth):
+    create_students(2)
+    create_course(auth, capacity=1)
+    enroll(auth, 1)
+    enroll(auth, 2)
+
+    response = deregister(auth, 2)
+
+    assert response.json()["message"] == "Removed from waitlist"
+    assert enrolled_ids() == [1]
+    assert len(waitlist) == 0
+
+
+def test_raising_capacity_promotes_waitlist(auth):
+    create_students(3)
+    create_course(auth, capacity=1)
+    for user_id in (1, 2, 3):
+        enroll(auth, user_id)
+
+    client.put("/courses/1", json={"capacity": 2}, headers=auth("admin"))
+
+    assert enrolled_ids() == [1, 2]
+    response = client.get("/courses/1/waitlist", headers=auth("admin"))
+    assert [w["user_id"] for w in response.json()] == [3]
+
+
+def test_delete_course_clears_waitlist(auth):
+    create_students(2)
+    create_course(auth, capacity=1)
+    enroll(auth, 1)
+    enroll(auth, 2)
+
+    client.delete("/courses/1", headers=auth("admin"))
+
+    assert len(waitlist) == 0
+
+
+# Bulk Enrollment
+def test_bulk_enroll_respects_capacity(auth):
+    create_students(3)
+    create_course(auth, capacity=2)
+
+    response = client.post("/enrollments/bulk", json={
+        
+        "items": [{"user_id": i, "course_id": 1} for i in (1, 2, 3)]
+    }, headers=auth("admin"))
+
+    assert [item["status"] for item in response.json()["results"]] == [201, 201, 409]
+    assert enrolled_ids() == [1, 2]
@@ -0,0 +1,183 @@
+import fcntl
+import multiprocessing
+import os
+import pytest
+from app.core.backend import DuplicateKeyError
+from app.core.catalog import MappedTable, build_catalog
+from app.core.memory import MemoryBackend
+
+
+# Helper Functions
+def write_snapshot(tmp_path, user_count: int = 5, course_count: int = 3):
+    source = MemoryBackend()
+    source.users.insert_all([
+        {"id": i, "name": f"Student {i}", "email": f"s{i}@example.com", "role": "student"}
+        for i in range(1, user_count + 1)
+    ])
+    source.courses.insert_all([
+        {"id": i, "title": f"Course {i}", "code": f"C{i}", "capacity": i * 10}
+        for i in range(1, course_count + 1)
+    ])
+    # Gaps in the ids must survive the snapshot
+    source.courses.delete(2)
+
+    path = str(tmp_path / "catalog.snapshot")
+    build_catalog(path, {"users": source.users.all(), "courses": source.courses.all()})
+    return path
+
+
+def make_snapshot(tmp_path, user_count: int = 5, course_count: int = 3):
+    return MemoryBackend(catalog=write_snapshot(tmp_path, user_count, course_count))
+
+
+# Runs in a separate process that inherits the test's environment,
+# like a uvicorn worker started with CATALOG_SNAPSHOT set
+def serve_catalog():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/courses")
+    assert response.status_code == 200
+    assert [course["id"] for course in response.json()] == [1, 3]
+
+
+# Startup (bootstrapping the admin included) reads no catalog rows
+def boot_catalog():
+    from fastapi.testclient import TestClient
+    from app.core.search import search_index
+    from app.core.storage import users
+    from app.main import app
+
+    with TestClient(app):
+        pass
+    assert not search_index._built
+    assert users.lookup("email", "admin@example.com")["role"] == "admin"
+
+
+# Reads From the Map
+def test_catalog_tables_are_mapped(tmp_path):
+    backend = make_snapshot(tmp_path)
+
+    assert isinstance(backend.users, MappedTable)
+    assert isinstance(backend.courses, MappedTable)
+    assert not isinstance(backend.enrollments, MappedTable)
+
+
+def test_get_lookup_and_page(tmp_path):
+    backend = make_snapshot(tmp_path)
+
+    assert backend.courses.get(3) == {"id": 3, "title": "Course 3", "code": "C3", "capacity": 30}
+    assert backend.courses.get(2) is None
+    assert backend.users.lookup("email", "s4@example.com")["id"] == 4
+    assert backend.users.lookup("email", "nobody@example.com") is None
+    assert [r["id"] for r in backend.users.page(after=2, limit=2)] == [3, 4]
+    assert len(backend.users) == 5
+    assert len(backend.courses) == 2
+
+
+def test_ids_continue_after_snapshot(tmp_path):
+    backend = make_snapshot(tmp_path)
+
+    assert backend.courses.ids.next() == 4
+
+
+# Writes Over the Map
+def test_inserts_merge_into_pages(tmp_path):
+    backend = make_snapshot(tmp_path)
+    backend.courses.insert({"id": backend.courses.ids.next(), "title": "New", "code": "NEW", "capacity": None})
+
+    assert [r["id"] for r in backend.courses.all()] == [1, 3, 4]
+    assert [r["id"] for r in backend.courses.page(after=1, limit=1)] == [3]
+    assert backend.courses.lookup("code", "NEW")["id"] == 4
+
+
+def test_unique_keys_checked_against_snapshot(tmp_path):
+    backend = make_snapshot(tmp_path)
+
+    with pytest.raises(DuplicateKeyError):
+        backend.users.insert({"id": 6, "name": "Copy", "email": "s1@example.com", "role": "student"})
+    with pytest.raises(DuplicateKeyError):
+        backend.courses.update(3, code="C1")
+
+    results = backend.users.insert_many([
+        {"id": 6, "name": "New", "email": "new@example.com", "role": "student"},
+        {"id": 7, "name": "Copy", "email": "s2@example.com", "role": "student"},
+    ])
+    assert results[0] is None
+    assert isinstance(results[1], DuplicateKeyError)
+
+
+def test_update_and_delete_shadow_snapshot_rows(tmp_path):
+    backend = make_snapshot(tmp_path)
+
+    backend.courses.update(1, code="MTH101")
+    backend.users.delete(2)
+
+    assert backend.courses.get(1)["code"] == "MTH101"
+    assert backend.courses.lookup("code", "C1") is None
+    assert backend.courses.lookup("code", "MTH101")["id"] == 1
+    assert [r["id"] for r in backend.courses.all()] == [1, 3]
+    assert backend.users.get(2) is None
+    assert len(backend.users) == 4
+
+    # The freed key can be reused
+    backend.courses.insert({"id": 4, "title": "Again", "code": "C1", "capacity": None})
+
+
+def test_clear_drops_snapshot_rows(tmp_path):
+    backend = make_snapshot(tmp_path)
+
+    backend.users.clear()
+
+    assert len(backend.users) == 0
+    assert backend.users.lookup("email", "s1@example.com") is None
+    assert backend.users.ids.next() == 1
+
+
+def test_catalog_cannot_be_combined_with_wal(tmp_path):
+    with pytest.raises(ValueError):
+        MemoryBackend(str(tmp_path / "wal"), catalog=str(tmp_path / "catalog.snapshot"))
+
+
+# App Startup
+def test_app_serves_from_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("WAL_DIR", "")
+    monkeypatch.setenv("CATALOG_SNAPSHOT", write_snapshot(tmp_path))
+
+    process = multiprocessing.get_context("spawn").Process(target=serve_catalog)
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+
+def test_startup_does_not_build_the_search_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("WAL_DIR", "")
+    monkeypatch.setenv("CATALOG_SNAPSHOT", write_snapshot(tmp_path, user_count=1000))
+
+    process = multiprocessing.get_context("spawn").Process(target=boot_catalog)
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+
+def test_second_worker_on_a_snapshot_fails_to_start(tmp_path, monkeypatch):
+    path = write_snapshot(tmp_path)
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("WAL_DIR", "")
+    monkeypatch.setenv("CATALOG_SNAPSHOT", path)
+
+    # This process stands in for the worker already serving the snapshot
+    fd = os.open(path, os.O_RDONLY)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        process = multiprocessing.get_context("spawn").Process(target=serve_catalog)
+        process.start()
+        process.join()
+    finally:
+        os.close(fd)
+
+    assert process.exitcode != 0
@@ -0,0 +1,196 @@
+import random
+import threading
+import pytest
+from fastapi import HTTPException
+from app.core.search import search_index
+from app.core.storage import users, courses, enrollments, waitlist
+from app.core.stats import enrollment_stats
+from app.services.user_service import UserService
+from app.services import course_service
+from app.services.course_service import CourseService
+from app.services.enrollment_service import EnrollmentService
+
+THREADS = 8
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    enrollment_stats.clear()
+
+
+# Helper Functions
+def seed(student_count: int, course_count: int):
+    for i in range(student_count):
+        UserService.create_user(f"Student {i}", f"s{i}@example.com", "student")
+    for i in range(course_count):
+        CourseService.create_course(f"Course {i}", f"C{i}", "admin")
+
+
+def run_threads(target, *args):
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            target(n, *args)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def try_call(func, *args):
+    try:
+        return func(*args)
+    except HTTPException:
+        return None
+
+
+def assert_indexes_consistent():
+    rows = enrollments.all()
+    pairs = [(e["user_id"], e["course_id"]) for e in rows]
+
+    assert len(pairs) == len(set(pairs))
+    for e in rows:
+        assert enrollments.lookup("user_course", (e["user_id"], e["course_id"])) == e
+    for course_id in {e["course_id"] for e in rows}:
+        expected = sorted(e["id"] for e in rows if e["course_id"] == course_id)
+        assert sorted(e["id"] for e in enrollments.find("course_id", course_id)) == expected
+        assert enrollment_stats.course_count(course_id) == len(expected)
+    for user_id in {e["user_id"] for e in rows}:
+        assert enrollment_stats.user_count(user_id) == len(enrollments.find("user_id", user_id))
+    assert enrollment_stats.total == len(rows)
+
+
+# Invariants Under Contention
+def test_concurrent_duplicate_enrollments_admit_one():
+    seed(student_count=20, course_count=5)
+
+    def enroll_everyone(n):
+        for user_id in range(1, 21):
+            for course_id in range(1, 6):
+                try_call(EnrollmentService.enroll, user_id, course_id, "student")
+
+    run_threads(enroll_everyone)
+
+    assert len(enrollments) == 100
+    assert len({e["id"] for e in enrollments}) == 100
+    assert_indexes_consistent()
+
+
+def test_enroll_racing_course_delete_leaves_no_orphans():
+    seed(student_count=50, course_count=1)
+
+    def enroll_or_delete(n):
+        if n == 0:
+            try_call(CourseService.delete_course, 1, "admin")
+            return
+        for user_id in range(n, 51, THREADS - 1):
+            try_call(EnrollmentService.enroll, user_id, 1, "student")
+
+    run_threads(enroll_or_delete)
+
+    assert courses.get(1) is None
+    assert enrollments.find("course_id", 1) == []
+    assert len(enrollments) == 0
+
+
+def test_update_racing_course_delete_is_not_found(monkeypatch):
+    seed(student_count=0, course_count=1)
+    course_locks = course_service.course_locks
+
+    def delete_first(course_id: int):
+        # A delete that lands just before the update takes the lock
+        with course_locks(course_id):
+            courses.delete(course_id)
+        return course_locks(course_id)
+
+    monkeypatch.setattr(course_service, "course_locks", delete_first)
+
+    with pytest.raises(HTTPException) as error:
+        CourseService.update_course(1, "Renamed", None, "admin")
+    assert error.value.status_code == 404
+
+
+def test_renames_reach_search_index_in_store_order(monkeypatch):
+    seed(student_count=0, course_count=1)
+    indexing, renamed = threading.Event(), threading.Event()
+    seen = []
+
+    def slow_first_update(previous, course):
+        # The first rename stalls while updating the index, giving the
+        # second one the chance to overtake it if the lock allows
+        if not indexing.is_set():
+            indexing.set()
+            renamed.wait(timeout=0.5)
+        seen.append((previous["title"], course["title"]))
+
+    monkeypatch.setattr(search_index, "course_updated", slow_first_update)
+
+    def second_rename():
+        indexing.wait()
+        CourseService.update_course(1, "Beta", "BBB", "admin")
+        renamed.set()
+
+    thread = threading.Thread(target=second_rename)
+    thread.start()
+    CourseService.update_course(1, "Alpha", "AAA", "admin")
+    thread.join()
+
+    assert seen == [("Course 0", "Alpha"), ("Alpha", "Beta")]
+
+
+def test_enroll_deregister_churn_keeps_indexes_consistent():
+    seed(student_count=10, course_count=10)
+
+    def churn(n):
+        rng = random.Random(n)
+        for _ in range(2000):
+            user_id = rng.randint(1, 10)
+            course_id = rng.randint(1, 10)
+            if rng.random() < 0.5:
+                try_call(EnrollmentService.enroll, user_id, course_id, "student")
+            else:
+                try_call(EnrollmentService.deregister, user_id, course_id, "student")
+
+    run_threads(churn)
+
+    assert_indexes_consistent()
+
+
+def test_capacity_holds_under_contention():
+    seed(student_count=200, course_count=1)
+    courses.update(1, capacity=10)
+
+    def rush(n):
+        for user_id in range(n + 1, 201, THREADS):
+            try_call(EnrollmentService.enroll, user_id, 1, "student")
+
+    run_threads(rush)
+
+    assert len(enrollments.find("course_id", 1)) == 10
+    assert len(waitlist.find("course_id", 1)) == 190
+
+    enrolled = [e["user_id"] for e in enrollments.find("course_id", 1)]
+
+    def leave(n):
+        for user_id in enrolled[n::THREADS]:
+            try_call(EnrollmentService.deregister, user_id, 1, "student")
+
+    run_threads(leave)
+
+    assert len(enrollments.find("course_id", 1)) == 10
+    assert len(waitlist.find("course_id", 1)) == 180
+    assert_indexes_consistent()
@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app.core.storage import courses
+from app.core.auth import principal_cache
+from app.core.storage import users, courses
+from app.core.cache import catalog_cache
 
 client = TestClient(app)
 
@@ -9,9 +11,13 @@ client = TestClient(app)
 # Reset storage before each test
 @pytest.fixture(autouse=True)
 def clear_courses():
+    users.clear()
     courses.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
 
 
+# Helper Functions
 # Public Access Test
 def test_get_all_courses_empty():
     response = client.get("/courses")
@@ -25,12 +31,11 @@ def test_get_course_by_id_not_found():
 
 
 # Admin Create Course
-def test_admin_create_course_success():
+def test_admin_create_course_success(auth):
     response = client.post("/courses", json={
         "title": "Mathematics",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
     assert response.status_code == 201
     data = response.json()
@@ -39,102 +44,126 @@ def test_admin_create_course_success():
     assert data["id"] == 1
 
 
-def test_student_cannot_create_course():
+def test_student_cannot_create_course(auth):
     response = client.post("/courses", json={
         "title": "Physics",
-        "code": "PHY101",
-        "role": "student"
-    })
+        "code": "PHY101"
+    }, headers=auth("student"))
 
     assert response.status_code == 403
 
 
-def test_create_course_missing_title():
+def test_create_course_missing_title(auth):
     response = client.post("/courses", json={
         "title": "",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
     assert response.status_code == 422
 
 
-def test_create_course_duplicate_code():
+def test_create_course_duplicate_code(auth):
     client.post("/courses", json={
         "title": "Math",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
     response = client.post("/courses", json={
         "title": "Advanced Math",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
     assert response.status_code == 400
     assert "unique" in response.json()["detail"].lower()
 
 
 # Admin Update Course
-def test_admin_update_course_success():
+def test_admin_update_course_success(auth):
     client.post("/courses", json={
         "title": "Math",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
     response = client.put("/courses/1", json={
         "title": "Advanced Math",
-        "code": "MTH201",
-        "role": "admin"
-    })
+        "code": "MTH201"
+    }, headers=auth("admin"))
 
     assert response.status_code == 200
     assert response.json()["title"] == "Advanced Math"
 
 
-def test_student_cannot_update_course():
+def test_student_cannot_update_course(auth):
     client.post("/courses", json={
         "title": "Math",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
     response = client.put("/courses/1", json={
         "title": "Changed",
-        "code": "MTH999",
-        "role": "student"
-    })
+        "code": "MTH999"
+    }, headers=auth("student"))
 
     assert response.status_code == 403
 
 
 # Admin Delete Course
-def test_admin_delete_course_success():
+def test_admin_delete_course_success(auth):
     client.post("/courses", json={
         "title": "Math",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
-    response = client.request("DELETE", "/courses/1", json={
-        "role": "admin"
-    })
+    response = client.delete("/courses/1", headers=auth("admin"))
 
     assert response.status_code == 200
     assert len(courses) == 0
 
 
-def test_student_cannot_delete_course():
+def test_student_cannot_delete_course(auth):
     client.post("/courses", json={
         "title": "Math",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
-    response = client.request("DELETE", "/courses/1", json={
-        "role": "student"
-    })
+    response = client.delete("/courses/1", headers=auth("student"))
 
     assert response.status_code == 403
+
+
+def test_update_course_duplicate_code(auth):
+    client.post("/courses", json={
+        "title": "Math",
+        "code": "MTH101"
+    }, headers=auth("admin"))
+    client.post("/courses", json={
+        "title": "Physics",
+        "code": "PHY101"
+    }, headers=auth("admin"))
+
+    response = client.put("/courses/2", json={
+        "code": " mth101 "
+    }, headers=auth("admin"))
+
+    assert response.status_code == 400
+    assert client.get("/courses/2").json()["code"] == "PHY101"
+
+
+def test_course_ids_not_reused_after_delete(auth):
+    client.post("/courses", json={
+        "title": "Math",
+        "code": "MTH101"
+    }, headers=auth("admin"))
+    client.post("/courses", json={
+        "title": "Physics",
+        "code": "PHY101"
+    }, headers=auth("admin"))
+    client.delete("/courses/1", headers=auth("admin"))
+
+    response = client.post("/courses", json={
+        "title": "Chemistry",
+        "code": "CHM101"
+    }, headers=auth("admin"))
+
+    assert response.json()["id"] == 3
+    assert client.get("/courses/2").json()["code"] == "PHY101"
@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app.core.storage import users, courses, enrollments
+from app.core.auth import principal_cache
+from app.core.storage import users, courses, enrollments, waitlist
+from app.core.cache import catalog_cache
 
 client = TestClient(app)
 
@@ -12,6 +14,9 @@ def clear_storage():
     users.clear()
     courses.clear()
     enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
 
 
 # Helper Functions
@@ -31,129 +36,122 @@ def create_admin():
     })
 
 
-def create_course():
+def create_course(auth):
     return client.post("/courses", json={
         "title": "Mathematics",
-        "code": "MTH101",
-        "role": "admin"
-    })
+        "code": "MTH101"
+    }, headers=auth("admin"))
 
 
 # Student Enrollment Test
-def test_student_enroll_success():
+def test_student_enroll_success(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     response = client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     assert response.status_code == 201
     assert len(enrollments) == 1
 
 
-def test_admin_cannot_enroll():
+def test_admin_cannot_enroll(auth):
     create_admin()
-    create_course()
+    create_course(auth)
 
     response = client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "admin"
-    })
+        "course_id": 1
+    }, headers=auth("admin"))
 
     assert response.status_code == 403
 
 
-def test_enroll_nonexistent_student():
-    create_course()
-
-    response = client.post("/enrollments", json={
-        "user_id": 999,
-        "course_id": 1,
-        "role": "student"
-    })
-
-    assert response.status_code == 404
+def test_student_cannot_act_for_another_user(auth):
+    create_student()
+    create_admin()
+    create_course(auth)
+
+    # Student 1 enrolling (or deregistering) user 2, an admin
+    for method in ("POST", "DELETE"):
+        response = client.request(method, "/enrollments", json={
+            "user_id": 2,
+            "course_id": 1
+        }, headers=auth(user_id=1))
+        assert response.status_code == 403
+    assert len(enrollments) == 0
 
 
-def test_enroll_nonexistent_course():
+def test_enroll_nonexistent_course(auth):
     create_student()
 
     response = client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 999,
-        "role": "student"
-    })
+        "course_id": 999
+    }, headers=auth(user_id=1))
 
     assert response.status_code == 404
 
 
-def test_duplicate_enrollment_fails():
+def test_duplicate_enrollment_fails(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     response = client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     assert response.status_code == 400
 
 
 # Student Deregistration
-def test_student_deregister_success():
+def test_student_deregister_success(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     response = client.request("DELETE", "/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     assert response.status_code == 200
     assert len(enrollments) == 0
 
 
-def test_deregister_nonexistent_enrollment():
+def test_deregister_nonexistent_enrollment(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     response = client.request("DELETE", "/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     assert response.status_code == 404
 
 
 # Student views of enrollments
-def test_get_student_enrollments():
+def test_get_student_enrollments(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     response = client.get("/users/1/enrollments")
 
@@ -162,53 +160,131 @@ def test_get_student_enrollments():
 
 
 # Admin View & Manage Enrollments
-def test_admin_get_all_enrollments():
+def test_admin_get_all_enrollments(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
-    response = client.get("/enrollments", params={"role": "admin"})
+    response = client.get("/enrollments", headers=auth("admin"))
 
     assert response.status_code == 200
     assert len(response.json()) == 1
 
 
-def test_admin_get_course_enrollments():
+def test_admin_get_course_enrollments(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
-    response = client.get("/courses/1/enrollments", params={"role": "admin"})
+    response = client.get("/courses/1/enrollments", headers=auth("admin"))
 
     assert response.status_code == 200
     assert len(response.json()) == 1
 
 
-def test_admin_force_deregister():
+def test_admin_force_deregister(auth):
     create_student()
-    create_course()
+    create_course(auth)
 
     client.post("/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "student"
-    })
+        "course_id": 1
+    }, headers=auth(user_id=1))
 
     response = client.request("DELETE", "/admin/enrollments", json={
         "user_id": 1,
-        "course_id": 1,
-        "role": "admin"
+        "course_id": 1
+    }, headers=auth("admin"))
+
+    assert response.status_code == 200
+    assert len(enrollments) == 0
+
+
+# Cascade Delete
+def test_delete_course_removes_its_enrollments(auth):
+    create_student()
+    create_course(auth)
+    client.post("/courses", json={
+        "title": "Physics",
+        "code": "PHY101"
+    }, headers=auth("admin"))
+
+    client.post("/enrollments", json={
+        "user_id": 1,
+        "course_id": 1
+    }, headers=auth(user_id=1))
+    client.post("/enrollments", json={
+        "user_id": 1,
+        "course_id": 2
+    }, headers=auth(user_id=1))
+
+    response = client.delete("/courses/1", headers=auth("admin"))
+
+    assert response.status_code == 200
+    assert [e["course_id"] for e in enrollments] == [2]
+    assert len(client.get("/users/1/enrollments").json()) == 1
+
+
+# Bulk Enrollment
+def test_admin_bulk_enroll_reports_per_item_results(auth):
+    create_student()
+    create_course(auth)
+    client.post("/users", json={
+        "name": "Student Two",
+        "email": "student2@example.com",
+        "role": "student"
     })
+    client.post("/enrollments", json={
+        "user_id": 2,
+        "course_id": 1
+    }, headers=auth(user_id=2))
+
+    response = client.post("/enrollments/bulk", json={
+        
+        "items": [
+            {"user_id": 1, "course_id": 1},
+            {"user_id": 1, "course_id": 1},
+            {"user_id": 2, "course_id": 1},
+            {"user_id": 999, "course_id": 1},
+            {"user_id": 1, "course_id": 999},
+        ]
+    }, headers=auth("admin"))
 
     assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 1
+    assert data["failed"] == 4
+    assert [item["status"] for item in data["results"]] == [201, 400, 400, 404, 404]
+    assert data["results"][0]["enrollment"]["user_id"] == 1
+    assert data["results"][3]["detail"] == "User not found"
+    assert len(enrollments) == 2
+
+
+def test_student_cannot_bulk_enroll(auth):
+    create_student()
+    create_course(auth)
+
+    response = client.post("/enrollments/bulk", json={
+        
+        "items": [{"user_id": 1, "course_id": 1}]
+    }, headers=auth("student"))
+
+    assert response.status_code == 403
     assert len(enrollments) == 0
+
+
+def test_bulk_enroll_rejects_empty_batch(auth):
+    response = client.post("/enrollments/bulk", json={
+        
+        "items": []
+    }, headers=auth("admin"))
+
+    assert response.status_code == 422
@@ -0,0 +1,95 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.storage import users, courses, enrollments
+from app.core.cache import catalog_cache
+
+client = TestClient(app)
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def seed(auth):
+    for i in (1, 2):
+        client.post("/users", json={
+            "name": f"Student {i}",
+            "email": f"s{i}@example.com",
+            "role": "student"
+        })
+        client.post("/courses", json={
+            "title": f"Course {i}",
+            "code": f"C{i}"
+        }, headers=auth("admin"))
+    for user_id, course_id in [(1, 1), (2, 1), (1, 2)]:
+        client.post("/enrollments", json={
+            "user_id": user_id,
+            "course_id": course_id
+        }, headers=auth(user_id=user_id))
+
+
+# NDJSON Export
+def test_export_enrollments_ndjson(auth):
+    seed(auth)
+
+    response = client.get("/enrollments/export", headers=auth("admin"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["user_id"], r["course_id"]) for r in rows] == [(1, 1), (2, 1), (1, 2)]
+
+
+def test_export_enrollments_filtered_by_course(auth):
+    seed(auth)
+
+    response = client.get("/enrollments/export", params={
+        "course_id": 1
+    }, headers=auth("admin"))
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["user_id"] for r in rows] == [1, 2]
+
+
+# CSV Export
+def test_export_users_csv(auth):
+    seed(auth)
+
+    response = client.get("/users/export", params={"format": "csv"}, headers=auth("admin"))
+
+    assert response.status_code == 200
+    assert response.text.splitlines() == [
+        "id,name,email,role",
+        "1,Student 1,s1@example.com,student",
+        "2,Student 2,s2@example.com,student",
+        "1000,Admin,admin-caller@example.com,admin",
+    ]
+
+
+def test_export_empty_csv_has_header(auth):
+    response = client.get("/enrollments/export", params={"format": "csv"}, headers=auth("admin"))
+
+    assert response.text.splitlines() == ["id,user_id,course_id"]
+
+
+# Access & Validation
+def test_student_cannot_export(auth):
+    response = client.get("/enrollments/export", headers=auth("student"))
+
+    assert response.status_code == 403
+
+
+def test_unknown_format_rejected(auth):
+    response = client.get("/users/export", params={"format": "xml"}, headers=auth("admin"))
+
+    assert response.status_code == 400
@@ -0,0 +1,255 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import issue_token, principal_cache
+from app.core.cache import catalog_cache
+from app.core.idempotency import IdempotencyCache, idempotency_cache
+from app.core.metrics import registry
+from app.core.sqlite import SQLiteBackend, SQLiteIdempotency
+from app.core.storage import users, courses, enrollments, waitlist
+from app.services.enrollment_service import AsyncEnrollmentService
+
+client = TestClient(app)
+
+
+# Reset storage, caches and metrics before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+    idempotency_cache.clear()
+    registry.clear()
+
+
+# Helper Functions
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def create_student(email: str = "student@example.com"):
+    user = client.post("/users", json={"name": "Student", "email": email, "role": "student"}).json()
+    return user["id"], {"Authorization": f"Bearer {issue_token(user['id'], 'student')}"}
+
+
+def create_course():
+    course_id = courses.ids.next()
+    courses.insert({"id": course_id, "title": f"Course {course_id}", "code": f"C{course_id}", "capacity": None})
+
+
+def enroll(headers: dict, user_id: int, key: str = None, course_id: int = 1):
+    if key is not None:
+        headers = {**headers, "Idempotency-Key": key}
+    return client.post("/enrollments", json={"user_id": user_id, "course_id": course_id}, headers=headers)
+
+
+def count_enroll_calls(monkeypatch):
+    calls = []
+    enroll_service = AsyncEnrollmentService.enroll
+
+    async def counted(**kwargs):
+        calls.append(kwargs)
+        return await enroll_service(**kwargs)
+
+    monkeypatch.setattr(AsyncEnrollmentService, "enroll", counted)
+    return calls
+
+
+# Replay
+def test_retry_replays_first_response_without_the_service(monkeypatch):
+    create_course()
+    user_id, headers = create_student()
+    calls = count_enroll_calls(monkeypatch)
+
+    first = enroll(headers, user_id, "retry-1")
+    retry = enroll(headers, user_id, "retry-1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1
+    assert len(enrollments) == 1
+
+
+def test_without_key_retry_runs_again():
+    create_course()
+    user_id, headers = create_student()
+
+    assert enroll(headers, user_id).status_code == 201
+    assert enroll(headers, user_id).status_code == 400
+
+
+def test_new_key_is_a_new_request():
+    create_course()
+    user_id, headers = create_student()
+
+    assert enroll(headers, user_id, "a").status_code == 201
+    assert enroll(headers, user_id, "b").status_code == 400
+
+
+def test_keys_are_scoped_to_the_caller():
+    create_course()
+    first_id, first = create_student("a@example.com")
+    second_id, second = create_student("b@example.com")
+
+    assert enroll(first, first_id, "same").status_code == 201
+    response = enroll(second, second_id, "same")
+
+    assert response.status_code == 201
+    assert response.json()["user_id"] == second_id
+    assert len(enrollments) == 2
+
+
+def test_key_reused_for_another_body_is_rejected():
+    create_course()
+    create_course()
+    user_id, headers = create_student()
+
+    assert enroll(headers, user_id, "k", course_id=1).status_code == 201
+    response = enroll(headers, user_id, "k", course_id=2)
+
+    assert response.status_code == 422
+    assert len(enrollments) == 1
+
+
+def test_overlong_key_is_rejected():
+    user_id, headers = create_student()
+
+    assert enroll(headers, user_id, "x" * 256).status_code == 400
+
+
+def test_server_errors_are_not_replayed(monkeypatch):
+    create_course()
+    user_id, headers = create_student()
+
+    async def failing(**kwargs):
+        raise RuntimeError("store unavailable")
+
+    monkeypatch.setattr(AsyncEnrollmentService, "enroll", failing)
+    with pytest.raises(RuntimeError):
+        enroll(headers, user_id, "k")
+    monkeypatch.undo()
+
+    assert enroll(headers, user_id, "k").status_code == 201
+
+
+def test_responses_with_tokens_are_not_kept():
+    user_id, headers = create_student()
+    users.insert({"id": 1000, "name": "Admin", "email": "admin@example.com", "role": "admin"})
+    admin = {"Authorization": f"Bearer {issue_token(1000, 'admin')}", "Idempotency-Key": "k"}
+
+    signup = client.post("/users", json={
+        "name": "Student", "email": "other@example.com", "role": "student"
+    }, headers={"Idempotency-Key": "k"})
+    issued = client.post("/auth/tokens", json={"user_id": user_id}, headers=admin)
+
+    assert signup.status_code == issued.status_code == 201
+    assert signup.headers["Cache-Control"] == issued.headers["Cache-Control"] == "no-store"
+    assert len(idempotency_cache) == 0
+
+
+def test_replays_are_counted(monkeypatch):
+    create_course()
+    user_id, headers = create_student()
+    enroll(headers, user_id, "k")
+    enroll(headers, user_id, "k")
+
+    text = client.get("/metrics").text
+
+    assert 'idempotent_requests_total{outcome="stored"} 1' in text
+    assert 'idempotent_requests_total{outcome="replayed"} 1' in text
+    assert 'http_requests_total{method="POST",route="/enrollments",status="201"} 2' in text
+
+
+# Idempotency Cache
+def test_in_flight_entry_is_reported_until_completed():
+    cache = IdempotencyCache()
+
+    assert cache.claim("k", b"body") is None
+    assert cache.claim("k", b"body").status is None
+
+    cache.complete("k", 201, [], b"{}")
+    assert cache.claim("k", b"body").status == 201
+
+
+def test_abandoned_entry_can_be_claimed_again():
+    cache = IdempotencyCache()
+    cache.claim("k", b"body")
+
+    cache.abandon("k")
+
+    assert cache.claim("k", b"body") is None
+
+
+def test_entries_expire_and_are_bounded():
+    clock = Clock()
+    cache = IdempotencyCache(max_entries=2, ttl=10, clock=clock)
+    for key in ("a", "b"):
+        cache.claim(key, b"")
+        cache.complete(key, 201, [], b"{}")
+
+    clock.now = 5
+    cache.claim("a", b"")
+    cache.claim("c", b"")
+    assert len(cache) == 2
+    assert cache.claim("b", b"") is None
+
+    clock.now = 11
+    assert cache.claim("a", b"") is None
+
+
+def test_sqlite_entries_are_shared_between_workers(tmp_path):
+    # Two backends on one database file, as in two worker processes
+    clock = Clock()
+    first, second = (SQLiteBackend(str(tmp_path / "shared.db"), pool_size=1) for _ in range(2))
+    worker, other = (SQLiteIdempotency(b.pool, max_entries=2, ttl=10, clock=clock) for b in (first, second))
+
+    assert worker.claim(b"k", b"body") is None
+    assert other.claim(b"k", b"body").status is None
+
+    worker.complete(b"k", 201, [(b"content-type", b"application/json")], b"{}", "/enrollments")
+    stored = other.claim(b"k", b"body")
+    assert (stored.status, stored.headers, stored.body, stored.route) == (
+        201, [(b"content-type", b"application/json")], b"{}", "/enrollments"
+    )
+
+    for key in (b"a", b"b"):
+        other.claim(key, b"")
+    assert len(worker) == 2
+    clock.now = 11
+    assert worker.claim(b"a", b"") is None
+    first.close()
+    second.close()
+
+
+def test_sqlite_evicts_expired_then_least_recently_used(tmp_path):
+    clock = Clock()
+    backend = SQLiteBackend(str(tmp_path / "shared.db"), pool_size=1)
+    cache = SQLiteIdempotency(backend.pool, max_entries=3, ttl=100, clock=clock)
+    for key in (b"a", b"b", b"c"):
+        clock.now += 1
+        cache.claim(key, b"")
+
+    # "a" is used again, so "b" is the least recently used
+    clock.now += 1
+    cache.claim(b"a", b"")
+    clock.now += 1
+    cache.claim(b"d", b"")
+    assert len(cache) == 3
+    assert cache.claim(b"a", b"") is not None
+    assert cache.claim(b"b", b"") is None
+
+    # Over the cap, expired entries go first
+    clock.now = 150
+    cache.claim(b"e", b"")
+    assert len(cache) == 1
+    backend.close()
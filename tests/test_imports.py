@@ -0,0 +1,106 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.storage import users, courses
+from app.core.cache import catalog_cache
+
+client = TestClient(app)
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+# User Import
+def test_import_users_json(auth):
+    response = client.post("/users/bulk", json=[
+        {"name": "User One", "email": "one@example.com", "role": "student"},
+        {"name": "User Two", "email": "two@example.com", "role": "admin"},
+    ], headers=auth("admin"))
+
+    assert response.status_code == 201
+    assert response.json() == {"created": 2, "first_id": 1, "last_id": 2}
+    assert users.lookup("email", "two@example.com")["role"] == "admin"
+
+
+def test_import_users_csv(auth):
+    body = "name,email,role\nUser One,one@example.com,student\nUser Two,two@example.com,student\n"
+
+    response = client.post(
+        "/users/bulk",
+        content=body,
+        headers={"Content-Type": "text/csv", **auth("admin")}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["created"] == 2
+    assert users.get(2)["name"] == "User Two"
+
+
+def test_import_users_is_atomic_on_duplicates(auth):
+    client.post("/users", json={
+        "name": "Existing",
+        "email": "taken@example.com",
+        "role": "student"
+    })
+
+    response = client.post("/users/bulk", json=[
+        {"name": "User One", "email": "one@example.com", "role": "student"},
+        {"name": "User Two", "email": "taken@example.com", "role": "student"},
+        {"name": "User Three", "email": "one@example.com", "role": "student"},
+    ], headers=auth("admin"))
+
+    assert response.status_code == 400
+    assert [e["row"] for e in response.json()["detail"]] == [1, 2]
+    assert users.lookup("email", "one@example.com") is None
+
+
+def test_import_users_reports_invalid_rows(auth):
+    response = client.post("/users/bulk", json=[
+        {"name": "User One", "email": "one@example.com", "role": "student"},
+        {"name": "User Two", "email": "not-an-email", "role": "student"},
+    ], headers=auth("admin"))
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["row"] == 1
+    assert users.lookup("email", "one@example.com") is None
+
+
+def test_student_cannot_import_users(auth):
+    response = client.post("/users/bulk", json=[
+        {"name": "User One", "email": "one@example.com", "role": "student"},
+    ], headers=auth("student"))
+
+    assert response.status_code == 403
+
+
+# Course Import
+def test_import_courses_normalizes_and_deduplicates_codes(auth):
+    response = client.post("/courses/bulk", json=[
+        {"title": "Math", "code": "mth101"},
+        {"title": "Math Again", "code": " MTH101 "},
+    ], headers=auth("admin"))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == [{"row": 1, "detail": "Course code must be unique"}]
+    assert len(courses) == 0
+
+
+def test_import_courses_csv(auth):
+    body = "title,code\nMath,mth101\nPhysics,phy101\n"
+
+    response = client.post(
+        "/courses/bulk",
+        content=body,
+        headers={"Content-Type": "text/csv", **auth("admin")}
+    )
+
+    assert response.status_code == 201
+    assert [c["code"] for c in courses.all()] == ["MTH101", "PHY101"]
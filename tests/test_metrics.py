@@ -0,0 +1,105 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.storage import users, courses
+from app.core.cache import catalog_cache
+from app.core.metrics import Counter, Histogram, Registry, registry
+
+client = TestClient(app)
+
+
+# Reset storage and metrics before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    catalog_cache.clear()
+    registry.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def samples():
+    # {"name{labels}": value} for every sample line of /metrics
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    lines = [line for line in response.text.splitlines() if not line.startswith("#")]
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1]) for line in lines}
+
+
+# Endpoint
+def test_metrics_are_served_in_prometheus_text_format():
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "# TYPE http_requests counter" in response.text
+
+
+# Request Metrics
+def test_requests_are_counted_by_route_template_and_status(auth):
+    client.post("/courses", json={"title": "Math", "code": "MTH101"}, headers=auth("admin"))
+    client.get("/courses/1")
+    client.get("/courses/1")
+    client.get("/courses/99")
+
+    values = samples()
+
+    assert values['http_requests_total{method="GET",route="/courses/{course_id}",status="200"}'] == 2
+    assert values['http_requests_total{method="GET",route="/courses/{course_id}",status="404"}'] == 1
+    assert values['http_requests_total{method="POST",route="/courses",status="201"}'] == 1
+    assert values['http_request_duration_seconds_count{method="GET",route="/courses/{course_id}"}'] == 3
+
+
+def test_unmatched_paths_share_one_series():
+    client.get("/nowhere")
+    client.get("/elsewhere")
+
+    assert samples()['http_requests_total{method="GET",route="unmatched",status="404"}'] == 2
+
+
+def test_in_flight_gauge_returns_to_zero():
+    client.get("/courses")
+
+    # The scrape itself is the only request in flight
+    assert samples()["http_requests_in_flight"] == 1
+
+
+# Service and Store Hooks
+def test_service_calls_and_store_operations_are_timed():
+    client.post("/users", json={"name": "Ann", "email": "ann@example.com", "role": "student"})
+    client.get("/users/1")
+
+    values = samples()
+
+    assert values['service_call_duration_seconds_count{service="UserService",method="create_user"}'] == 1
+    assert values['service_call_duration_seconds_count{service="UserService",method="get_user_by_id"}'] == 1
+    assert values['store_operation_duration_seconds_count{table="users",operation="insert"}'] == 1
+    assert values['store_operation_duration_seconds_count{table="users",operation="get"}'] >= 1
+
+
+# Metric Types
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+    target = Registry()
+    target.register(histogram)
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.labels("read").observe(value)
+
+    text = target.render()
+
+    assert 'latency_seconds_bucket{op="read",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{op="read",le="1"} 3' in text
+    assert 'latency_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{op="read"} 4' in text
+    assert 'latency_seconds_sum{op="read"} 5.65' in text
+
+
+def test_label_values_are_escaped():
+    counter = Counter("events", "Events.", ("name",))
+    target = Registry()
+    target.register(counter)
+    counter.labels('say "hi"\n').inc()
+
+    assert 'events_total{name="say \\"hi\\"\\n"} 1' in target.render()
@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.storage import users, courses
+from app.core.cache import catalog_cache
+
+client = TestClient(app)
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_courses():
+    users.clear()
+    courses.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def create_courses(auth, count: int):
+    for i in range(1, count + 1):
+        client.post("/courses", json={
+            "title": f"Course {i}",
+            "code": f"C{i}"
+        }, headers=auth("admin"))
+
+
+def collect_pages(limit: int):
+    ids, params = [], {"limit": limit}
+    while True:
+        response = client.get("/courses", params=params)
+        assert response.status_code == 200
+        ids.append([c["id"] for c in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+        params = {"limit": limit, "after": cursor}
+
+
+# Cursor Pagination
+def test_pages_follow_cursor_until_exhausted(auth):
+    create_courses(auth, 5)
+
+    assert collect_pages(limit=2) == [[1, 2], [3, 4], [5]]
+
+
+def test_exact_final_page_has_no_cursor(auth):
+    create_courses(auth, 4)
+
+    assert collect_pages(limit=2) == [[1, 2], [3, 4]]
+
+
+def test_deleted_rows_are_skipped(auth):
+    create_courses(auth, 5)
+    for course_id in (2, 3):
+        client.delete(f"/courses/{course_id}", headers=auth("admin"))
+
+    assert collect_pages(limit=2) == [[1, 4], [5]]
+
+
+def test_invalid_cursor_rejected():
+    response = client.get("/courses", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def test_limit_out_of_range_rejected():
+    response = client.get("/courses", params={"limit": 0})
+
+    assert response.status_code == 422
@@ -0,0 +1,156 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.cache import catalog_cache
+from app.core.search import search_index
+from app.core.storage import users, courses, enrollments, waitlist
+
+client = TestClient(app)
+
+
+# Reset storage and the search index before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    search_index.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def create_course(auth, title: str, code: str):
+    return client.post("/courses", json={"title": title, "code": code}, headers=auth("admin"))
+
+
+def create_user(email: str, role: str = "student", headers: dict = None):
+    return client.post("/users", json={"name": "User", "email": email, "role": role}, headers=headers)
+
+
+def search_courses(**params):
+    return [c["code"] for c in client.get("/courses", params=params).json()]
+
+
+def search_users(**params):
+    return [u["email"] for u in client.get("/users", params=params).json()]
+
+
+# Course Search
+def test_q_matches_all_title_words_in_any_case(auth):
+    create_course(auth, "Linear Algebra", "MTH201")
+    create_course(auth, "Abstract Algebra", "MTH301")
+    create_course(auth, "Linear Circuits", "EE101")
+
+    assert search_courses(q="algebra") == ["MTH201", "MTH301"]
+    assert search_courses(q="LINEAR algebra") == ["MTH201"]
+    assert search_courses(q="topology") == []
+
+
+def test_q_matches_code_prefix(auth):
+    create_course(auth, "Calculus", "MTH101")
+    create_course(auth, "Mechanics", "PHY101")
+    create_course(auth, "Statistics", "MTH202")
+
+    assert search_courses(q="mth") == ["MTH101", "MTH202"]
+    assert search_courses(q="MTH1") == ["MTH101"]
+
+
+def test_q_results_are_paginated_by_id(auth):
+    for number in range(1, 6):
+        create_course(auth, f"Seminar {number}", f"SEM{number}")
+
+    first = client.get("/courses", params={"q": "seminar", "limit": 2})
+    second = client.get("/courses", params={"q": "seminar", "limit": 2, "after": first.headers["X-Next-Cursor"]})
+
+    assert [c["code"] for c in first.json()] == ["SEM1", "SEM2"]
+    assert [c["code"] for c in second.json()] == ["SEM3", "SEM4"]
+
+
+def test_update_and_delete_keep_course_index_current(auth):
+    create_course(auth, "Linear Algebra", "MTH201")
+    create_course(auth, "Organic Chemistry", "CHM101")
+    assert search_courses(q="algebra") == ["MTH201"]
+
+    client.put("/courses/1", json={"title": "Topology", "code": "MTH210"}, headers=auth("admin"))
+    client.delete("/courses/2", headers=auth("admin"))
+
+    assert search_courses(q="algebra") == []
+    assert search_courses(q="topology") == ["MTH210"]
+    assert search_courses(q="MTH201") == []
+    assert search_courses(q="chemistry") == []
+
+
+def test_imported_courses_are_searchable(auth):
+    create_course(auth, "Calculus", "MTH101")
+    search_courses(q="calculus")
+
+    client.post("/courses/bulk", json=[
+        {"title": "Discrete Mathematics", "code": "MTH150"},
+        {"title": "Ancient History", "code": "HIS100"},
+    ], headers=auth("admin"))
+
+    assert search_courses(q="mth") == ["MTH101", "MTH150"]
+    assert search_courses(q="history") == ["HIS100"]
+
+
+def test_index_is_built_from_rows_already_stored():
+    courses.insert({"id": courses.ids.next(), "title": "Number Theory", "code": "MTH400", "capacity": None})
+
+    assert search_courses(q="number theory") == ["MTH400"]
+
+
+# User Search
+def test_email_prefix_returns_users_in_email_order():
+    for email in ("carol@example.com", "alice@example.com", "alan@example.com", "bob@example.com"):
+        create_user(email)
+
+    assert search_users(email_prefix="al") == ["alan@example.com", "alice@example.com"]
+    assert search_users(email_prefix="AL") == ["alan@example.com", "alice@example.com"]
+    assert search_users(email_prefix="zed") == []
+
+
+def test_role_filter_alone_and_with_prefix(auth):
+    create_user("ann@example.com", "admin", auth("admin"))
+    create_user("amy@example.com", "student")
+    create_user("bea@example.com", "admin", auth("admin"))
+
+    assert search_users(role="admin") == ["admin-caller@example.com", "ann@example.com", "bea@example.com"]
+    assert search_users(role="student", email_prefix="a") == ["amy@example.com"]
+
+
+def test_user_search_pages_follow_email_order():
+    for email in ("d@example.com", "a@example.com", "c@example.com", "b@example.com"):
+        create_user(email)
+
+    first = client.get("/users", params={"email_prefix": "", "role": "student", "limit": 2})
+    second = client.get("/users", params={"role": "student", "limit": 2, "after": first.headers["X-Next-Cursor"]})
+
+    assert [u["email"] for u in first.json()] == ["a@example.com", "b@example.com"]
+    assert [u["email"] for u in second.json()] == ["c@example.com", "d@example.com"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_imported_users_are_searchable(auth):
+    create_user("zoe@example.com")
+    search_users(email_prefix="z")
+
+    client.post("/users/bulk", json=[
+        {"name": "Zed", "email": "zed@example.com", "role": "student"},
+    ], headers=auth("admin"))
+
+    assert search_users(email_prefix="z") == ["zed@example.com", "zoe@example.com"]
+
+
+def test_prefixes_ending_in_the_top_code_point_match_nothing(auth):
+    create_course(auth, "Calculus", "MTH101")
+    create_user("amy@example.com")
+
+    assert client.get("/courses", params={"q": chr(0x10FFFF)}).json() == []
+    assert client.get("/users", params={"email_prefix": "a" + chr(0x10FFFF)}).json() == []
+
+
+def test_invalid_role_filter_is_rejected():
+    assert client.get("/users", params={"role": "teacher"}).status_code == 422
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.api.v1.serialization import adapter, dumps, project
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.storage import users, courses, enrollments, waitlist
+from app.schemas.user_schema import UserResponse
+
+client = TestClient(app)
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def seed(auth):
+    for name in ("Ann", "Zoë"):
+        client.post("/users", json={"name": name, "email": f"{name.lower()}@example.com", "role": "student"})
+    client.post("/courses", json={"title": "Mathématiques", "code": "MTH101"}, headers=auth("admin"))
+    client.post("/enrollments", json={"user_id": 1, "course_id": 1}, headers=auth(user_id=1))
+
+
+def fetch(auth, monkeypatch, fast: bool, url: str):
+    monkeypatch.setattr(settings, "fast_json", fast)
+    catalog_cache.clear()
+    return client.get(url, headers=auth("admin"))
+
+
+# Fast Mode
+@pytest.mark.parametrize("url", [
+    "/users",
+    "/users?limit=1",
+    "/users/2",
+    "/users/1/enrollments",
+    "/courses",
+    "/courses/1",
+    "/courses/1/enrollments",
+    "/enrollments",
+    "/enrollments/export",
+])
+def test_fast_mode_returns_identical_responses(monkeypatch, url, auth):
+    seed(auth)
+
+    standard = fetch(auth, monkeypatch, False, url)
+    fast = fetch(auth, monkeypatch, True, url)
+
+    assert fast.status_code == standard.status_code == 200
+    assert fast.content == standard.content
+    assert fast.headers.get("X-Next-Cursor") == standard.headers.get("X-Next-Cursor")
+    assert fast.headers["content-type"] == standard.headers["content-type"]
+
+
+def test_fast_mode_keeps_errors(monkeypatch):
+    monkeypatch.setattr(settings, "fast_json", True)
+
+    response = client.get("/users/99")
+
+    assert response.status_code == 404
+
+
+# Helpers
+def test_rows_with_extra_columns_are_projected_onto_the_model():
+    row = {"id": 1, "name": "Ann", "email": "ann@example.com", "role": "student", "secret": "x"}
+
+    assert "secret" not in project(row, UserResponse)
+    assert b"secret" not in dumps(project([row], UserResponse))
+
+
+def test_type_adapters_are_cached():
+    assert adapter(UserResponse) is adapter(UserResponse)
@@ -0,0 +1,208 @@
+import pytest
+from app.core.backend import DuplicateKeyError
+from app.core.sqlite import SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "test.db"), pool_size=2)
+    yield backend
+    backend.close()
+
+
+def add_enrollment(backend, user_id, course_id):
+    return backend.enrollments.insert({
+        "id": backend.enrollments.ids.next(),
+        "user_id": user_id,
+        "course_id": course_id
+    })
+
+
+# Connection Setup
+def test_connections_use_wal_mode(backend):
+    with backend.pool.connection() as conn:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()["journal_mode"]
+
+    assert mode == "wal"
+
+
+# Table Interface
+def test_insert_lookup_and_find(backend):
+    add_enrollment(backend, 1, 10)
+    add_enrollment(backend, 2, 10)
+    add_enrollment(backend, 1, 20)
+
+    assert backend.enrollments.lookup("user_course", (1, 20))["id"] == 3
+    assert [e["id"] for e in backend.enrollments.find("course_id", 10)] == [1, 2]
+    assert len(backend.enrollments) == 3
+
+
+def test_unique_violation_names_the_index(backend):
+    add_enrollment(backend, 1, 10)
+
+    with pytest.raises(DuplicateKeyError) as error:
+        add_enrollment(backend, 1, 10)
+
+    assert error.value.index == "user_course"
+
+
+def test_update_and_delete_by(backend):
+    backend.courses.insert({"id": 1, "title": "Math", "code": "MTH101"})
+    add_enrollment(backend, 1, 1)
+    add_enrollment(backend, 2, 1)
+    add_enrollment(backend, 2, 2)
+
+    updated = backend.courses.update(1, title="Algebra")
+    removed = backend.enrollments.delete_by("course_id", 1)
+
+    assert updated == {"id": 1, "title": "Algebra", "code": "MTH101", "capacity": None}
+    assert sorted(e["user_id"] for e in removed) == [1, 2]
+    assert [e["course_id"] for e in backend.enrollments.all()] == [2]
+
+
+# Persistence
+def test_data_and_sequences_survive_reopen(tmp_path):
+    path = str(tmp_path / "test.db")
+    first = SQLiteBackend(path, pool_size=1)
+    first.users.insert({
+        "id": first.users.ids.next(),
+        "name": "Student One",
+        "email": "s@example.com",
+        "role": "student"
+    })
+    first.close()
+
+    second = SQLiteBackend(path, pool_size=1)
+
+    assert second.users.lookup("email", "s@example.com")["id"] == 1
+    assert second.users.ids.next() == 2
+    second.close()
+
+
+def test_insert_many_skips_collisions(backend):
+    add_enrollment(backend, 1, 10)
+
+    results = backend.enrollments.insert_many([
+        {"id": 2, "user_id": 2, "course_id": 10},
+        {"id": 3, "user_id": 1, "course_id": 10},
+    ])
+
+    assert results[0] is None
+    assert results[1].index == "user_course"
+    assert len(backend.enrollments) == 2
+
+
+def test_insert_all_rolls_back_on_collision(backend):
+    add_enrollment(backend, 1, 10)
+
+    with pytest.raises(DuplicateKeyError):
+        backend.enrollments.insert_all([
+            {"id": 2, "user_id": 2, "course_id": 10},
+            {"id": 3, "user_id": 1, "course_id": 10},
+        ])
+
+    assert len(backend.enrollments) == 1
+
+
+def test_lookup_many_returns_existing_keys(backend):
+    for i in range(1, 601):
+        backend.courses.insert({"id": i, "title": f"Course {i}", "code": f"C{i}"})
+
+    found = backend.courses.lookup_many("code", ["C1", "C600", "MISSING"])
+
+    assert sorted(found) == ["C1", "C600"]
+    assert found["C600"]["id"] == 600
+
+
+def test_get_many_keeps_order_and_skips_missing(backend):
+    for i in range(1, 601):
+        backend.courses.insert({"id": i, "title": f"Course {i}", "code": f"C{i}"})
+
+    rows = backend.courses.get_many([600, 999, 1, 300])
+
+    assert [row["id"] for row in rows] == [600, 1, 300]
+
+
+# Search
+def test_title_search_follows_course_writes(backend):
+    backend.courses.insert({"id": 1, "title": "Linear Algebra", "code": "MTH201"})
+    backend.courses.insert({"id": 2, "title": "Abstract Algebra", "code": "MTH301"})
+    backend.courses.update(1, title="Topology")
+    backend.courses.delete(2)
+    backend.courses.insert({"id": 3, "title": "Algebra II", "code": "ALG200"})
+
+    assert [c["id"] for c in backend.search.search_courses("algebra", 10)] == [3]
+    assert [c["id"] for c in backend.search.search_courses("mth", 10)] == [1]
+
+
+def test_prefixes_ending_in_the_top_code_point(backend):
+    top = chr(0x10FFFF)
+    backend.courses.insert({"id": 1, "title": "Top", "code": f"A{top}{top}1"})
+    backend.courses.insert({"id": 2, "title": "Next", "code": "B1"})
+    backend.users.insert({"id": 1, "name": "Top", "email": f"{top}@example.com", "role": "student"})
+    backend.users.insert({"id": 2, "name": "Gap", "email": f"{chr(0xD7FF)}{chr(0xE000)}@example.com", "role": "student"})
+
+    assert [c["id"] for c in backend.search.search_courses(f"A{top}", 10)] == [1]
+    assert backend.search.search_courses(top, 10) == []
+    assert [u["id"] for u in backend.search.search_users(email_prefix=top)] == [1]
+    assert [u["id"] for u in backend.search.search_users(email_prefix=chr(0xD7FF))] == [2]
+
+
+def test_title_search_backfilled_for_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    backend = SQLiteBackend(path, pool_size=1)
+    with backend.pool.connection() as conn:
+        conn.execute("DROP TRIGGER courses_indexed")
+    backend.courses.insert({"id": 1, "title": "Linear Algebra", "code": "MTH201"})
+    backend.close()
+
+    reopened = SQLiteBackend(path, pool_size=1)
+
+    assert [c["id"] for c in reopened.search.search_courses("linear", 10)] == [1]
+    reopened.close()
+
+
+# Counters
+def test_triggers_maintain_enrollment_counts(backend):
+    add_enrollment(backend, 1, 10)
+    add_enrollment(backend, 2, 10)
+    add_enrollment(backend, 1, 20)
+    backend.enrollments.delete(2)
+    backend.enrollments.delete_by("course_id", 20)
+
+    assert backend.stats.course_count(10) == 1
+    assert backend.stats.course_count(20) == 0
+    assert backend.stats.user_count(1) == 1
+    assert backend.stats.top_courses(5) == [(10, 1)]
+    assert backend.stats.total == 1
+
+
+def test_counts_backfilled_for_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    backend = SQLiteBackend(path, pool_size=1)
+    add_enrollment(backend, 1, 10)
+    with backend.pool.connection() as conn:
+        conn.execute("DROP TRIGGER enrollments_counted")
+        conn.execute("DELETE FROM course_counts")
+    backend.close()
+
+    reopened = SQLiteBackend(path, pool_size=1)
+
+    assert reopened.stats.course_count(10) == 1
+    reopened.close()
+
+
+# Course Locks
+def test_course_lock_is_a_transaction(backend):
+    locks = backend.course_locks()
+
+    with pytest.raises(RuntimeError):
+        with locks(10):
+            add_enrollment(backend, 1, 10)
+            raise RuntimeError
+
+    with locks.many([10, 20]):
+        add_enrollment(backend, 2, 20)
+
+    assert backend.enrollments.lookup("user_course", (1, 10)) is None
+    assert backend.enrollments.lookup("user_course", (2, 20)) is not None
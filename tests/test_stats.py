@@ -0,0 +1,154 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.storage import users, courses, enrollments, waitlist
+from app.core.cache import catalog_cache
+from app.core.stats import EnrollmentStats, enrollment_stats
+
+client = TestClient(app)
+
+
+# Reset storage before each test
+@pytest.fixture(autouse=True)
+def clear_storage():
+    users.clear()
+    courses.clear()
+    enrollments.clear()
+    waitlist.clear()
+    catalog_cache.clear()
+    enrollment_stats.clear()
+    principal_cache.clear()
+
+
+# Helper Functions
+def seed(auth, student_count: int, course_count: int, capacity: int = None):
+    for i in range(1, student_count + 1):
+        client.post("/users", json={
+            "name": f"Student {i}",
+            "email": f"s{i}@example.com",
+            "role": "student"
+        })
+    for i in range(1, course_count + 1):
+        client.post("/courses", json={
+            "title": f"Course {i}",
+            "code": f"C{i}",
+            "capacity": capacity
+        }, headers=auth("admin"))
+
+
+def enroll(auth, user_id: int, course_id: int):
+    return client.post("/enrollments", json={
+        "user_id": user_id,
+        "course_id": course_id
+    }, headers=auth(user_id=user_id))
+
+
+def stats(auth, path: str = "", **params):
+    return client.get(f"/stats{path}", params=params, headers=auth("admin"))
+
+
+# Counters
+def test_counts_follow_enroll_and_deregister(auth):
+    seed(auth, student_count=3, course_count=2)
+    for user_id in (1, 2, 3):
+        enroll(auth, user_id, 1)
+    enroll(auth, 1, 2)
+
+    client.request("DELETE", "/enrollments", json={
+        "user_id": 2,
+        "course_id": 1
+    }, headers=auth(user_id=2))
+
+    assert stats(auth, "/courses/1").json() == {"course_id": 1, "enrollments": 2}
+    assert stats(auth, "/courses/2").json() == {"course_id": 2, "enrollments": 1}
+    assert stats(auth, "/users/1").json() == {"user_id": 1, "courses": 2}
+    assert stats(auth, "/users/2").json() == {"user_id": 2, "courses": 0}
+    assert stats(auth).json()["enrollments"] == 3
+
+
+def test_counts_follow_bulk_enroll_and_force_deregister(auth):
+    seed(auth, student_count=2, course_count=1)
+    client.post("/enrollments/bulk", json={
+        "items": [{"user_id": 1, "course_id": 1}, {"user_id": 2, "course_id": 1}]
+    }, headers=auth("admin"))
+
+    client.request("DELETE", "/admin/enrollments", json={
+        "user_id": 1,
+        "course_id": 1
+    }, headers=auth("admin"))
+
+    assert stats(auth, "/courses/1").json()["enrollments"] == 1
+    assert stats(auth, "/users/1").json()["courses"] == 0
+
+
+def test_waitlist_promotion_is_counted(auth):
+    seed(auth, student_count=2, course_count=1, capacity=1)
+    enroll(auth, 1, 1)
+    assert enroll(auth, 2, 1).status_code == 202
+
+    client.request("DELETE", "/enrollments", json={
+        "user_id": 1,
+        "course_id": 1
+    }, headers=auth(user_id=1))
+
+    assert stats(auth, "/courses/1").json()["enrollments"] == 1
+    assert stats(auth, "/users/2").json()["courses"] == 1
+
+
+def test_course_delete_drops_its_counts(auth):
+    seed(auth, student_count=2, course_count=2)
+    enroll(auth, 1, 1)
+    enroll(auth, 2, 1)
+    enroll(auth, 1, 2)
+
+    client.delete("/courses/1", headers=auth("admin"))
+
+    assert stats(auth, "/courses/1").status_code == 404
+    assert stats(auth, "/users/1").json()["courses"] == 1
+    assert stats(auth, "/users/2").json()["courses"] == 0
+    assert stats(auth, "/courses/top").json() == [{"course_id": 2, "enrollments": 1}]
+
+
+# Top Courses
+def test_top_courses_ranked_by_enrollments(auth):
+    seed(auth, student_count=3, course_count=3)
+    for user_id, course_id in [(1, 2), (2, 2), (3, 2), (1, 3), (2, 3), (1, 1)]:
+        enroll(auth, user_id, course_id)
+
+    response = stats(auth, "/courses/top", limit=2)
+
+    assert response.json() == [
+        {"course_id": 2, "enrollments": 3},
+        {"course_id": 3, "enrollments": 2}
+    ]
+
+
+def test_top_courses_match_full_recount():
+    counters = EnrollmentStats()
+    rows = [
+        {"user_id": user_id, "course_id": course_id}
+        for course_id in range(1, 21)
+        for user_id in range(course_id * 7 % 13)
+    ]
+    counters.rebuild(rows)
+    for row in rows[::3]:
+        counters.removed(row["user_id"], row["course_id"])
+
+    remaining = {}
+    for i, row in enumerate(rows):
+        if i % 3:
+            remaining[row["course_id"]] = remaining.get(row["course_id"], 0) + 1
+
+    top = counters.top_courses(len(remaining))
+    assert sorted(top, key=lambda item: item[0]) == sorted(remaining.items())
+    assert [count for _, count in top] == sorted(remaining.values(), reverse=True)
+
+
+# Access Control
+def test_stats_require_admin(auth):
+    seed(auth, student_count=1, course_count=1)
+
+    assert client.get("/stats", headers=auth("student")).status_code == 403
+    assert client.get("/stats/courses/1", headers=auth("student")).status_code == 403
+    assert stats(auth, "/users/99").status_code == 404
@@ -0,0 +1,200 @@
+import threading
+import pytest
+from operator import itemgetter
+from app.core.ids import IdSequence
+from app.core.backend import DuplicateKeyError
+from app.core.memory import Table
+from app.core.entities import entity_class
+
+
+def make_table(entity=None):
+    return Table(
+        unique={"email": itemgetter("email")},
+        multi={"role": itemgetter("role")},
+        entity=entity,
+    )
+
+
+# Primary Key & Secondary Indexes
+def test_insert_and_lookup():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    assert table.get(1)["email"] == "a@example.com"
+    assert table.lookup("email", "a@example.com")["id"] == 1
+    assert [r["id"] for r in table.find("role", "student")] == [1]
+    assert len(table) == 1
+
+
+def test_get_many_keeps_order_and_skips_missing():
+    table = make_table()
+    for row_id in (1, 2, 3):
+        table.insert({"id": row_id, "email": f"{row_id}@example.com", "role": "student"})
+
+    assert [r["id"] for r in table.get_many([3, 9, 1])] == [3, 1]
+
+
+def test_update_reindexes_changed_keys():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    table.update(1, email="b@example.com", role="admin")
+
+    assert table.lookup("email", "a@example.com") is None
+    assert table.lookup("email", "b@example.com")["id"] == 1
+    assert table.find("role", "student") == []
+    assert [r["id"] for r in table.find("role", "admin")] == [1]
+
+
+def test_delete_removes_from_all_indexes():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    table.delete(1)
+
+    assert table.get(1) is None
+    assert table.lookup("email", "a@example.com") is None
+    assert table.find("role", "student") == []
+    assert len(table) == 0
+
+
+# Unique Constraints
+def test_insert_duplicate_unique_key_rejected():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    with pytest.raises(DuplicateKeyError):
+        table.insert({"id": 2, "email": "a@example.com", "role": "student"})
+
+    assert len(table) == 1
+    assert table.find("role", "student")[0]["id"] == 1
+
+
+def test_update_to_duplicate_unique_key_rejected():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+    table.insert({"id": 2, "email": "b@example.com", "role": "student"})
+
+    with pytest.raises(DuplicateKeyError):
+        table.update(2, email="a@example.com")
+
+    assert table.get(2)["email"] == "b@example.com"
+    assert table.lookup("email", "b@example.com")["id"] == 2
+
+
+# Bulk Delete by Index
+def test_delete_by_removes_only_matching_bucket():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+    table.insert({"id": 2, "email": "b@example.com", "role": "admin"})
+    table.insert({"id": 3, "email": "c@example.com", "role": "student"})
+
+    removed = table.delete_by("role", "student")
+
+    assert [r["id"] for r in removed] == [1, 3]
+    assert [r["id"] for r in table.all()] == [2]
+    assert table.lookup("email", "a@example.com") is None
+    assert table.find("role", "student") == []
+
+
+# Id Sequences
+def test_id_sequence_reserve_and_reset():
+    sequence = IdSequence()
+
+    assert sequence.next() == 1
+    assert list(sequence.reserve(3)) == [2, 3, 4]
+    assert sequence.next() == 5
+
+    sequence.reset()
+    assert sequence.next() == 1
+
+
+def test_id_sequence_unique_across_threads():
+    sequence = IdSequence()
+    seen = []
+
+    def allocate():
+        seen.extend(sequence.next() for _ in range(1000))
+
+    threads = [threading.Thread(target=allocate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(seen) == list(range(1, 8001))
+
+
+# Keyset Pagination
+def test_page_skips_tombstones_and_compacts():
+    table = make_table()
+    for i in range(1, 11):
+        table.insert({"id": i, "email": f"{i}@example.com", "role": "student"})
+    for i in range(1, 10, 2):
+        table.delete(i)
+
+    assert [r["id"] for r in table.page(limit=3)] == [2, 4, 6]
+    assert [r["id"] for r in table.page(after=6, limit=3)] == [8, 10]
+
+    table.delete(2)
+
+    assert table._order == [4, 6, 8, 10]
+    assert [r["id"] for r in table.page(after=4, limit=10)] == [6, 8, 10]
+
+
+# Batch Inserts
+def test_insert_many_skips_and_reports_collisions():
+    table = make_table()
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    results = table.insert_many([
+        {"id": 2, "email": "b@example.com", "role": "student"},
+        {"id": 3, "email": "a@example.com", "role": "student"},
+        {"id": 4, "email": "b@example.com", "role": "admin"},
+    ])
+
+    assert results[0] is None
+    assert isinstance(results[1], DuplicateKeyError)
+    assert isinstance(results[2], DuplicateKeyError)
+    assert [r["id"] for r in table.all()] == [1, 2]
+
+
+def test_insert_all_is_all_or_nothing():
+    table = make_table()
+
+    with pytest.raises(DuplicateKeyError):
+        table.insert_all([
+            {"id": 1, "email": "a@example.com", "role": "student"},
+            {"id": 2, "email": "a@example.com", "role": "student"},
+        ])
+
+    assert len(table) == 0
+    assert table.lookup("email", "a@example.com") is None
+
+
+# Entity Rows
+def test_entity_rows_behave_like_dicts():
+    table = make_table(entity_class("User", ("id", "email", "role")))
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    row = table.lookup("email", "a@example.com")
+
+    assert not hasattr(row, "__dict__")
+    assert row == {"id": 1, "email": "a@example.com", "role": "student"}
+    assert dict(row) == {"id": 1, "email": "a@example.com", "role": "student"}
+    assert row.get("name") is None
+    with pytest.raises(KeyError):
+        row["keys"]
+
+
+def test_entity_rows_update_and_reindex():
+    table = make_table(entity_class("User", ("id", "email", "role")))
+    table.insert({"id": 1, "email": "a@example.com", "role": "student"})
+
+    table.update(1, email="b@example.com")
+
+    assert table.lookup("email", "a@example.com") is None
+    assert table.lookup("email", "b@example.com")["id"] == 1
+    with pytest.raises(KeyError):
+        table.update(1, name="Alice")
+    assert table.lookup("email", "b@example.com")["id"] == 1
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.auth import principal_cache
 from app.core.storage import users
 
 client = TestClient(app)
@@ -10,6 +11,7 @@ client = TestClient(app)
 @pytest.fixture(autouse=True)
 def clear_users():
     users.clear()
+    principal_cache.clear()
 
 
 # Create User Tests
@@ -28,17 +30,40 @@ def test_create_student_user_success():
     assert data["id"] == 1
 
 
-def test_create_admin_user_success():
+def test_sign_up_returns_a_token_for_the_new_account():
+    user = client.post("/users", json={
+        "name": "John Doe",
+        "email": "john@example.com",
+        "role": "student"
+    }).json()
+
+    response = client.get(f"/users/{user['id']}/enrollments", headers={
+        "Authorization": f"Bearer {user['access_token']}"
+    })
+
+    assert response.status_code == 200
+
+
+def test_create_admin_user_success(auth):
     response = client.post("/users", json={
         "name": "Admin User",
         "email": "admin@example.com",
         "role": "admin"
-    })
+    }, headers=auth("admin"))
 
     assert response.status_code == 201
     assert response.json()["role"] == "admin"
 
 
+def test_only_admins_create_admins(auth):
+    user = {"name": "Admin User", "email": "admin@example.com", "role": "admin"}
+
+    assert client.post("/users", json=user).status_code == 403
+    assert client.post("/users", json=user, headers=auth("student")).status_code == 403
+    assert client.post("/users", json=user, headers={"Authorization": "Bearer forged"}).status_code == 401
+    assert users.lookup("email", "admin@example.com") is None
+
+
 def test_create_user_invalid_email():
     response = client.post("/users", json={
         "name": "John Doe",
@@ -0,0 +1,158 @@
+import marshal
+import os
+import struct
+import time
+import zlib
+import pytest
+from app.core.memory import MemoryBackend
+from app.core.wal import WALFormatError
+
+
+# Helper Functions
+def open_backend(path, **options):
+    return MemoryBackend(str(path), sync_interval=0.001, **options)
+
+
+def state(backend):
+    return {
+        name: [dict(row) for row in table.all()]
+        for name, table in backend.tables.items()
+    }
+
+
+def write_some(backend):
+    backend.users.insert({"id": backend.users.ids.next(), "name": "Ann", "email": "a@example.com", "role": "student"})
+    backend.users.insert({"id": backend.users.ids.next(), "name": "Bob", "email": "b@example.com", "role": "student"})
+    backend.courses.insert({"id": backend.courses.ids.next(), "title": "Math", "code": "MTH101", "capacity": 2})
+    backend.enrollments.insert_many([
+        {"id": row_id, "user_id": user_id, "course_id": 1}
+        for row_id, user_id in zip(backend.enrollments.ids.reserve(2), (1, 2))
+    ])
+    backend.users.update(2, name="Robert")
+    backend.enrollments.delete(1)
+
+
+# Recovery
+def test_reopen_replays_log(tmp_path):
+    backend = open_backend(tmp_path)
+    write_some(backend)
+    expected = state(backend)
+    backend.close()
+
+    recovered = open_backend(tmp_path)
+
+    assert state(recovered) == expected
+    assert recovered.users.lookup("email", "b@example.com")["name"] == "Robert"
+    assert [e["id"] for e in recovered.enrollments.find("course_id", 1)] == [2]
+    recovered.close()
+
+
+def test_ids_are_not_reused_after_recovery(tmp_path):
+    backend = open_backend(tmp_path)
+    write_some(backend)
+    backend.close()
+
+    recovered = open_backend(tmp_path)
+
+    # Enrollment 1 was deleted before the restart
+    assert recovered.enrollments.ids.next() == 3
+    assert recovered.users.ids.next() == 3
+    recovered.close()
+
+
+def test_delete_by_and_clear_are_replayed(tmp_path):
+    backend = open_backend(tmp_path)
+    write_some(backend)
+    backend.enrollments.delete_by("course_id", 1)
+    backend.users.clear()
+    backend.close()
+
+    recovered = open_backend(tmp_path)
+
+    assert len(recovered.enrollments) == 0
+    assert len(recovered.users) == 0
+    assert len(recovered.courses) == 1
+    recovered.close()
+
+
+# Snapshots
+def test_snapshot_then_log_recovers_and_compacts(tmp_path):
+    backend = open_backend(tmp_path)
+    write_some(backend)
+    backend.wal.snapshot()
+    backend.courses.update(1, title="Algebra")
+    expected = state(backend)
+    backend.close()
+
+    files = sorted(os.listdir(tmp_path))
+    assert [name for name in files if name.startswith("snapshot")] == ["snapshot.00000002.bin"]
+    assert "wal.00000001.log" not in files
+
+    recovered = open_backend(tmp_path)
+
+    assert state(recovered) == expected
+    assert recovered.enrollments.ids.next() == 3
+    recovered.close()
+
+
+def test_snapshot_taken_automatically(tmp_path):
+    backend = open_backend(tmp_path, snapshot_every=3)
+    write_some(backend)
+
+    deadline = time.monotonic() + 5
+    while not any(name.startswith("snapshot") for name in os.listdir(tmp_path)):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    backend.close()
+
+    assert state(open_backend(tmp_path)) == state(backend)
+
+
+# Crash Tolerance
+def test_torn_tail_is_ignored(tmp_path):
+    backend = open_backend(tmp_path)
+    write_some(backend)
+    backend.wal.flush()
+    expected = state(backend)
+    backend.courses.insert({"id": 2, "title": "Physics", "code": "PHY101", "capacity": None})
+    backend.close()
+
+    segment = tmp_path / "wal.00000001.log"
+    segment.write_bytes(segment.read_bytes()[:-3])
+
+    recovered = open_backend(tmp_path)
+
+    assert state(recovered) == expected
+    recovered.courses.insert({"id": 2, "title": "Physics", "code": "PHY101", "capacity": None})
+    recovered.close()
+    assert len(open_backend(tmp_path).courses) == 2
+
+
+# Format
+def test_files_name_their_format(tmp_path):
+    backend = open_backend(tmp_path)
+    write_some(backend)
+    backend.wal.snapshot()
+    backend.close()
+
+    for name in os.listdir(tmp_path):
+        assert (tmp_path / name).read_bytes().startswith(b"enrollment-wal/2\n")
+
+
+def test_foreign_format_is_refused(tmp_path):
+    # A segment from an earlier release: marshal frames, no header
+    data = marshal.dumps([("courses", "c", None)])
+    (tmp_path / "wal.00000001.log").write_bytes(struct.pack("<II", len(data), zlib.crc32(data)) + data)
+
+    with pytest.raises(WALFormatError):
+        open_backend(tmp_path)
+    assert (tmp_path / "wal.00000001.log").stat().st_size == len(data) + 8
+
+
+def test_without_wal_dir_nothing_is_written(tmp_path):
+    backend = MemoryBackend()
+    write_some(backend)
+    backend.close()
+
+    assert backend.wal is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,61 @@
+import multiprocessing
+import pytest
+from app.core.cache import ResponseCache, SharedVersions
+from app.core.sqlite import SQLiteBackend
+
+WORKERS = 4
+STUDENTS_PER_WORKER = 25
+
+
+# Runs in a separate process that inherits the test's environment,
+# like a uvicorn worker
+def worker(first_user: int):
+    from app.services.course_service import CourseService
+    from app.services.enrollment_service import EnrollmentService
+
+    for user_id in range(first_user, first_user + STUDENTS_PER_WORKER):
+        EnrollmentService.enroll(user_id, 1, "student")
+    CourseService.update_course(1, "Mathematics", None, "admin")
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "shared.db")
+    backend = SQLiteBackend(path, pool_size=1)
+    backend.users.insert_all([
+        {"id": i, "name": f"Student {i}", "email": f"s{i}@example.com", "role": "student"}
+        for i in range(1, WORKERS * STUDENTS_PER_WORKER + 1)
+    ])
+    backend.courses.insert({"id": 1, "title": "Math", "code": "MTH101", "capacity": 10})
+    backend.close()
+    return path
+
+
+# Shared State Across Processes
+def test_workers_share_one_store(path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", path)
+    cache = ResponseCache(versions=SharedVersions(path + "-versions"))
+    cache.put("courses:item", 1, b"stale", {}, cache.version("courses:item", 1))
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=worker, args=(n * STUDENTS_PER_WORKER + 1,))
+        for n in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert [process.exitcode for process in processes] == [0] * WORKERS
+
+    backend = SQLiteBackend(path, pool_size=1)
+    assert len(backend.enrollments) == 10
+    assert len(backend.waitlist) == WORKERS * STUDENTS_PER_WORKER - 10
+    assert backend.stats.course_count(1) == 10
+    assert backend.courses.get(1)["title"] == "Mathematics"
+    backend.close()
+
+    # Another worker's update invalidated this process's cached course
+    assert cache.get("courses:item", 1) is None